@@ -10,12 +10,165 @@ a fixed number of items per question. It handles:
 """
 import os
 import re
-import uuid
-import base64
-from typing import Optional, List, Dict, Any, Tuple
-from bs4 import BeautifulSoup, Tag
+import hashlib
+import secrets
+import shutil
+import binascii
+import zipfile
+import posixpath
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, List, Dict, Any, Set, Tuple
+import lxml.html
+from lxml import etree
+from lxml.html import HtmlElement
 import mammoth
 
+from .question_types import detect_question_type
+
+
+# Short questions that are clearly questions (specific patterns)
+_SHORT_Q_PATTERNS = (
+    r'^zip files are',
+    r'^simplify\s*:',
+    r'^calculate\s*:',
+    r'^solve\s*:',
+    r'^evaluate\s*:',
+    r'^find\s+the\s+value',
+    r'^what\s+is\s+',
+    r'^\.+\s+are\s+',  # "... are" patterns like "Zip files are"
+)
+_SHORT_Q_RE = re.compile('|'.join(f'(?:{p})' for p in _SHORT_Q_PATTERNS))
+# First characters any of the short question patterns can start with
+_SHORT_Q_FIRST_CHARS = frozenset('zscefw.')
+
+# Options that START with answer-like words are likely options
+_OPTION_START_PATTERNS = (
+    r'^only\s+\d',  # "Only 1", "Only 2"
+    r'^\d+\s+and\s+\d+',  # "1 and 2"
+    r'^all\s+of\s+the\s+above',
+    r'^none\s+of\s+the',
+    r'^both\s+\(',
+    r'^\(\w\)\s+and\s+\(\w\)',  # (A) and (B)
+    r'^[A-D]\s+and\s+[A-D]',
+    r'^always[,\s]',  # "Always, ..." is an option
+    r'^never[,\s]',   # "Never, ..." is an option
+    r'^sometimes[,\s]',
+    r'^when\s+sending',  # "When sending a message..." as option
+    r'^to\s+[a-z]+\s+',  # "To improve..." as option
+    r'^by\s+[a-z]+',  # "By using..." as option
+)
+_OPTION_START_RE = re.compile('|'.join(f'(?:{p})' for p in _OPTION_START_PATTERNS))
+
+# Question indicators (strong signals)
+_QUESTION_KEYWORDS = (
+    'which of the following', 'what is the', 'who is the', 'who was the',
+    'where is', 'when was', 'when did', 'why is', 'how many', 'how much',
+    'consider the following', 'select the', 'choose the', 'identify the',
+    'find the', 'match the', 'arrange the',
+    'with reference to', 'with respect to', 'regarding the',
+    'in the context of', 'in relation to',
+    'statement', 'assertion', 'reason',
+    'following is not', 'following is true', 'following is false',
+    'correct statement', 'incorrect statement',
+    'full form of', 'stands for', 'abbreviation of',
+    'rank of', 'position of', 'capital of',
+    # Hindi keywords
+    'निम्नलिखित', 'कौन सा', 'क्या है', 'किसका', 'कहाँ है', 'कब हुआ',
+)
+
+
+def _keyword_trie_pattern(keywords) -> str:
+    """
+    Build a regex that matches any of the keywords, with common prefixes
+    factored out, e.g. ('who is', 'who was') -> 'who (?:is|was)'.
+    The regex engine then tries each shared prefix once per text position
+    instead of once per keyword. A keyword that is complete makes longer
+    keywords with the same prefix redundant, since any hit is enough.
+    """
+    trie = {}
+    for kw in keywords:
+        node = trie
+        for ch in kw:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+    
+    def build(node):
+        if '' in node:
+            return ''
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items())]
+        if len(branches) == 1:
+            return branches[0]
+        return '(?:' + '|'.join(branches) + ')'
+    
+    return build(trie)
+
+
+_QUESTION_KW_RE = re.compile(_keyword_trie_pattern(_QUESTION_KEYWORDS))
+
+# Question types this parser assigns, in its own priority order: statements
+# rank above how-many, and there is no figure-based type
+_QTYPE_KEYWORDS = (
+    ('assertion-reason', ('assertion', 'reason')),
+    ('matching', ('match',)),
+    ('statement-based', ('statement', 'कथन')),
+    ('how-many', ('how many', 'कितने')),
+)
+
+
+# Compiled XPath lookups used for every list item
+_ALL_LIS = etree.XPath('.//li')
+_LI_IMGS = etree.XPath('.//img')
+_LI_TABLES = etree.XPath('.//table')
+_TABLE_ROWS = etree.XPath('.//tr')
+_ROW_CELLS = etree.XPath('.//td|.//th')
+
+# WordprocessingML namespaces for reading document.xml directly
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_RELS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+_DOCX_NS = {
+    'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main',
+    'm': 'http://schemas.openxmlformats.org/officeDocument/2006/math',
+    'a': 'http://schemas.openxmlformats.org/drawingml/2006/main',
+    'v': 'urn:schemas-microsoft-com:vml',
+    'r': 'http://schemas.openxmlformats.org/officeDocument/2006/relationships',
+    'mc': 'http://schemas.openxmlformats.org/markup-compatibility/2006',
+}
+# Content to leave out: mc:Fallback repeats its mc:Choice, and text boxes
+# are not part of the paragraph flow
+_SKIPPED = 'ancestor::mc:Fallback or ancestor::w:txbxContent'
+# Body paragraphs outside skipped content
+_BODY_PARAS = etree.XPath(f'//w:p[not({_SKIPPED})]', namespaces=_DOCX_NS)
+# Regular and Math (OMML) runs of a paragraph, and the bookmarks between them
+_PARA_RUNS = etree.XPath(f'(.//w:r|.//m:r|.//w:bookmarkStart)[not({_SKIPPED})]', namespaces=_DOCX_NS)
+_M = '{http://schemas.openxmlformats.org/officeDocument/2006/math}'
+# Direct run properties that mammoth renders as elements (<strong>, <em>,
+# <s>, <sup>/<sub>); its text nodes break wherever these change
+_RUN_FORMATS = (f'{_W}b', f'{_W}i', f'{_W}strike', f'{_W}vertAlign')
+_OFF_VALUES = frozenset(['0', 'false', 'none', 'baseline'])
+# Relationship IDs of embedded pictures (DrawingML and legacy VML)
+_PARA_IMAGE_RELS = etree.XPath(
+    f'(.//a:blip/@r:embed|.//v:imagedata/@r:id)[not({_SKIPPED})]', namespaces=_DOCX_NS
+)
+_HAS_TABLES = etree.XPath('boolean(//w:tbl)', namespaces=_DOCX_NS)
+
+# File extensions for embedded image content types
+_EXT_MAP = {
+    'image/png': 'png',
+    'image/jpeg': 'jpg',
+    'image/gif': 'gif',
+    'image/webp': 'webp',
+}
+
+# Content types for copied media parts, by extension
+_CONTENT_TYPES = {ext: ct for ct, ext in _EXT_MAP.items()}
+
+# Base64 characters decoded per write; a multiple of 4 so chunks decode independently
+_B64_CHUNK = 64 * 1024
+_WHITESPACE_RE = re.compile(r'\s')
+
+# Below this many list items, worker process startup costs more than it saves
+PARALLEL_MIN_ITEMS = 2000
+
 
 def is_likely_question(text: str, has_img: bool = False) -> bool:
     """
@@ -29,107 +182,55 @@ def is_likely_question(text: str, has_img: bool = False) -> bool:
     - Don't start with single short answers
     """
     text = text.strip()
+    length = len(text)
     
     if not text and not has_img:
         return False
     
     # If it's just an image with no text, likely an option
-    if has_img and len(text) < 10:
+    if has_img and length < 10:
         return False
     
-    text_lower = text.lower()
-    
-    # Check for fill-in-the-blank patterns first
-    has_blank = '_____' in text or '______' in text or '___' in text
+    # Check for fill-in-the-blank patterns first ('___' also covers longer runs)
+    has_blank = '___' in text
     
     # Fill-in-the-blank patterns are questions regardless of length
-    if has_blank and len(text) > 20:
+    if has_blank and length > 20:
         return True
     
-    # Short questions that are clearly questions (specific patterns)
-    short_question_patterns = [
-        r'^zip files are',
-        r'^simplify\s*:',
-        r'^calculate\s*:',
-        r'^solve\s*:',
-        r'^evaluate\s*:',
-        r'^find\s+the\s+value',
-        r'^what\s+is\s+',
-        r'^\.+\s+are\s+',  # "... are" patterns like "Zip files are"
-    ]
-    
-    for pattern in short_question_patterns:
-        if re.match(pattern, text_lower):
-            return True
-    
-    # Very short text is likely an option
-    if len(text) < 15 and not has_blank:
-        return False
-    
-    # Options that START with answer-like words are likely options
-    option_start_patterns = [
-        r'^only\s+\d',  # "Only 1", "Only 2"
-        r'^\d+\s+and\s+\d+',  # "1 and 2"
-        r'^all\s+of\s+the\s+above',
-        r'^none\s+of\s+the',
-        r'^both\s+\(',
-        r'^\(\w\)\s+and\s+\(\w\)',  # (A) and (B)
-        r'^[A-D]\s+and\s+[A-D]',
-        r'^always[,\s]',  # "Always, ..." is an option
-        r'^never[,\s]',   # "Never, ..." is an option
-        r'^sometimes[,\s]',
-        r'^when\s+sending',  # "When sending a message..." as option
-        r'^to\s+[a-z]+\s+',  # "To improve..." as option
-        r'^by\s+[a-z]+',  # "By using..." as option
-    ]
-    
-    for pattern in option_start_patterns:
-        if re.match(pattern, text_lower):
+    # Very short text is likely an option, unless it is one of the short
+    # question forms - skip lowercasing when it cannot start one
+    if length < 15 and not has_blank:
+        if text[0].lower() not in _SHORT_Q_FIRST_CHARS:
             return False
+        text_lower = text.lower()
+        return _SHORT_Q_RE.match(text_lower) is not None
     
-    # Question indicators (strong signals)
-    question_keywords = [
-        'which of the following', 'what is the', 'who is the', 'who was the',
-        'where is', 'when was', 'when did', 'why is', 'how many', 'how much',
-        'consider the following', 'select the', 'choose the', 'identify the',
-        'find the', 'match the', 'arrange the',
-        'with reference to', 'with respect to', 'regarding the',
-        'in the context of', 'in relation to',
-        'statement', 'assertion', 'reason',
-        'following is not', 'following is true', 'following is false',
-        'correct statement', 'incorrect statement',
-        'full form of', 'stands for', 'abbreviation of',
-        'rank of', 'position of', 'capital of',
-        # Hindi keywords
-        'निम्नलिखित', 'कौन सा', 'क्या है', 'किसका', 'कहाँ है', 'कब हुआ',
-    ]
-    
-    # Check for question indicators
-    has_question_phrase = any(kw in text_lower for kw in question_keywords)
-    ends_with_question = text.rstrip().endswith('?')
-    ends_with_colon = text.rstrip().endswith(':')
-    is_long = len(text) > 60
-    
-    # Strong indicators
-    if has_question_phrase:
+    text_lower = text.lower()
+    
+    if _SHORT_Q_RE.match(text_lower):
         return True
     
-    if ends_with_question:
+    if _OPTION_START_RE.match(text_lower):
+        return False
+    
+    # Strong indicators that need no regex: a trailing '?', a medium-length
+    # text ending with colon, very long text (but not if it starts with an
+    # option pattern) or a blank to fill
+    if text.endswith('?'):
         return True
     
-    # Medium-length text ending with colon
-    if ends_with_colon and len(text) > 25:
+    if text.endswith(':') and length > 25:
         return True
     
-    # Very long text is likely a question (but not if starts with option patterns)
-    if len(text) > 100:
+    if length > 100:
         return True
     
-    # Contains blank to fill - likely question
     if has_blank:
         return True
     
-    return False
+    # Otherwise only a question phrase makes it a question
+    return _QUESTION_KW_RE.search(text_lower) is not None
 
 
 def is_likely_option(text: str, has_img: bool = False) -> bool:
@@ -153,40 +254,63 @@ def is_likely_option(text: str, has_img: bool = False) -> bool:
     return False
 
 
-def extract_images_from_element(element: Tag, job_id: str, upload_dir: str) -> List[Dict]:
-    """Extract images from an element and save them."""
+def get_element_text(element: HtmlElement) -> str:
+    """Concatenate the stripped text nodes of an element (like get_text(strip=True))."""
+    return ''.join(s.strip() for s in element.itertext())
+
+
+def write_base64_to_file(data: str, path: str) -> None:
+    """
+    Decode a base64 payload straight into a file, one chunk at a time,
+    so peak memory stays at the chunk size rather than the image size.
+    """
+    if _WHITESPACE_RE.search(data):
+        data = ''.join(data.split())
+    
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        for start in range(0, len(data), _B64_CHUNK):
+            os.write(fd, binascii.a2b_base64(data[start:start + _B64_CHUNK]))
+    finally:
+        os.close(fd)
+
+
+def extract_images_from_element(element: HtmlElement, img_dir: str,
+                                written: Optional[Set[str]] = None) -> Tuple[List[Dict], bool]:
+    """
+    Extract images from an element and save them into img_dir (which must exist).
+    Images are named by content hash, so a repeated image is written only once;
+    `written` tracks paths already saved during this job.
+    Returns (saved_images, element_has_img) from a single traversal.
+    """
+    if written is None:
+        written = set()
     images = []
+    img_elements = _LI_IMGS(element)
     
-    for img in element.find_all('img'):
+    for img in img_elements:
         src = img.get('src', '')
         
         if src.startswith('data:'):
             # Base64 encoded image
             try:
-                # Parse data URL
-                match = re.match(r'data:([^;]+);base64,(.+)', src)
-                if match:
-                    content_type = match.group(1)
-                    data = match.group(2)
+                # Parse data URL: data:<content type>;base64,<payload>
+                semi = src.find(';base64,', 5)
+                if semi > 5 and ';' not in src[5:semi] and len(src) > semi + 8:
+                    content_type = src[5:semi]
+                    data = src[semi + 8:]
                     
                     # Determine extension
-                    ext_map = {
-                        'image/png': 'png',
-                        'image/jpeg': 'jpg',
-                        'image/gif': 'gif',
-                        'image/webp': 'webp',
-                    }
-                    ext = ext_map.get(content_type, 'png')
+                    ext = _EXT_MAP.get(content_type, 'png')
                     
-                    # Save image
-                    img_id = str(uuid.uuid4())[:8]
+                    # Save image, unless identical content was already saved
+                    img_id = hashlib.blake2b(data.encode('ascii'), digest_size=8).hexdigest()
                     filename = f"img_{img_id}.{ext}"
-                    img_dir = os.path.join(upload_dir, job_id, "images")
-                    os.makedirs(img_dir, exist_ok=True)
-                    
                     img_path = os.path.join(img_dir, filename)
-                    with open(img_path, 'wb') as f:
-                        f.write(base64.b64decode(data))
+                    if img_path not in written:
+                        if not os.path.exists(img_path):
+                            write_base64_to_file(data, img_path)
+                        written.add(img_path)
                     
                     images.append({
                         'id': img_id,
@@ -198,7 +322,256 @@ def extract_images_from_element(element: Tag, job_id: str, upload_dir: str) -> L
             except Exception as e:
                 print(f"Error extracting image: {e}")
     
-    return images
+    return images, bool(img_elements)
+
+
+def classify_list_item(text: str, images: List[Dict], has_img: bool) -> Dict:
+    """Build the item record for one list entry: question/option and question type."""
+    item = {
+        'text': text,
+        'images': images,
+        'is_question': is_likely_question(text, has_img),
+        'question_type': 'single',
+        'tables': []
+    }
+    
+    if item['is_question']:
+        item['question_type'] = detect_question_type(text, keywords=_QTYPE_KEYWORDS)
+    
+    return item
+
+
+def scan_list_item(li: HtmlElement, img_dir: str, written: Optional[Set[str]] = None) -> Dict:
+    """
+    Extract text, images and tables from one <li> and classify it.
+    Independent of every other item, so it can run in a worker process.
+    """
+    text = get_element_text(li)
+    images, has_img = extract_images_from_element(li, img_dir, written)
+    item = classify_list_item(text, images, has_img)
+    
+    if item['is_question']:
+        # Extract tables
+        for table in _LI_TABLES(li):
+            rows = _TABLE_ROWS(table)
+            item['tables'].append({
+                'id': secrets.token_hex(4),
+                'html': lxml.html.tostring(table, encoding='unicode', with_tail=False),
+                'rows': len(rows),
+                'cols': len(_ROW_CELLS(rows[0])) if rows else 0
+            })
+    
+    return item
+
+
+def _scan_list_item_chunk(li_htmls: List[str], img_dir: str) -> List[Dict]:
+    """Worker entry point: re-parse serialized <li> elements and scan them."""
+    written = set()
+    return [scan_list_item(lxml.html.fragment_fromstring(h), img_dir, written) for h in li_htmls]
+
+
+def scan_list_items(all_lis: List[HtmlElement], img_dir: str) -> List[Dict]:
+    """
+    Scan all <li> elements, in document order.
+    Large documents are split into chunks and scanned in worker processes.
+    """
+    workers = os.cpu_count() or 1
+    if len(all_lis) < PARALLEL_MIN_ITEMS or workers < 2:
+        written = set()
+        return [scan_list_item(li, img_dir, written) for li in all_lis]
+    
+    li_htmls = [lxml.html.tostring(li, encoding='unicode', with_tail=False) for li in all_lis]
+    chunk_size = -(-len(li_htmls) // workers)
+    chunks = [li_htmls[i:i + chunk_size] for i in range(0, len(li_htmls), chunk_size)]
+    
+    items = []
+    with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+        for chunk_items in pool.map(_scan_list_item_chunk, chunks, [img_dir] * len(chunks)):
+            items.extend(chunk_items)
+    return items
+
+
+def _numbered_style_ids(styles_root) -> set:
+    """Return IDs of paragraph styles that carry list numbering (directly or via basedOn)."""
+    own_numbering = {}
+    based_on = {}
+    for style in styles_root.iter(f'{_W}style'):
+        style_id = style.get(f'{_W}styleId')
+        num_id = style.find(f'{_W}pPr/{_W}numPr/{_W}numId')
+        if num_id is not None:
+            own_numbering[style_id] = num_id.get(f'{_W}val') != '0'
+        parent = style.find(f'{_W}basedOn')
+        if parent is not None:
+            based_on[style_id] = parent.get(f'{_W}val')
+    
+    numbered = set()
+    for style_id in set(own_numbering) | set(based_on):
+        current, seen = style_id, set()
+        while current is not None and current not in own_numbering and current not in seen:
+            seen.add(current)
+            current = based_on.get(current)
+        if own_numbering.get(current, False):
+            numbered.add(style_id)
+    return numbered
+
+
+def _is_list_paragraph(para, numbered_styles: set) -> bool:
+    """A paragraph is a list item if it has numbering, directly or from its style."""
+    num_id = para.find(f'{_W}pPr/{_W}numPr/{_W}numId')
+    if num_id is not None:
+        return num_id.get(f'{_W}val') != '0'
+    style = para.find(f'{_W}pPr/{_W}pStyle')
+    return style is not None and style.get(f'{_W}val') in numbered_styles
+
+
+def _run_key(run) -> tuple:
+    """
+    The formatting and hyperlink of a w:r. Consecutive runs with equal keys
+    become a single text node in mammoth's HTML.
+    """
+    key = []
+    rpr = run.find(f'{_W}rPr')
+    if rpr is not None:
+        for tag in _RUN_FORMATS:
+            prop = rpr.find(tag)
+            if prop is not None:
+                val = prop.get(f'{_W}val')
+                if val not in _OFF_VALUES:
+                    key.append(val if tag == f'{_W}vertAlign' else tag)
+    parent = run.getparent()
+    while parent is not None and parent.tag != f'{_W}p':
+        if parent.tag == f'{_W}hyperlink':
+            key.append(parent)
+            break
+        parent = parent.getparent()
+    return tuple(key)
+
+
+def _paragraph_text(para) -> str:
+    """
+    Text of a paragraph as get_element_text gives it for mammoth's HTML.
+    Runs are grouped into the text nodes mammoth would produce (split by
+    formatting changes, hyperlinks, line breaks and bookmark anchors), and
+    each group is stripped before the groups are joined.
+    """
+    groups = []
+    group_key = None  # None: the next text starts a new group
+    for el in _PARA_RUNS(para):
+        if el.tag == f'{_W}bookmarkStart':
+            if el.get(f'{_W}name') != '_GoBack':
+                group_key = None
+            continue
+        
+        key = _run_key(el) if el.tag == f'{_W}r' else ('math',)
+        for child in el:
+            tag = child.tag
+            if tag == f'{_W}t' or tag == f'{_M}t':
+                text = child.text or ''
+            elif tag == f'{_W}tab':
+                text = '\t'
+            elif tag == f'{_W}br' or tag == f'{_W}cr':
+                group_key = None
+                continue
+            else:
+                continue
+            
+            if group_key is not None and key == group_key:
+                groups[-1].append(text)
+            else:
+                groups.append([text])
+                group_key = key
+    
+    return ''.join(''.join(group).strip() for group in groups)
+
+
+def read_docx_list_items(file_path: str, img_dir: str) -> List[Dict]:
+    """
+    Read numbered paragraphs straight from word/document.xml, without mammoth.
+    
+    Only text and images are needed here, so the DOCX is read as a zip:
+    list paragraphs become items and referenced word/media parts are copied
+    to img_dir as-is (no base64 round-trip). A media part referenced several
+    times is copied once. Text boxes and mc:Fallback copies are skipped.
+    
+    Returns no items for a document with tables: table capture works on
+    mammoth's HTML, so such documents are left to read_mammoth_list_items.
+    """
+    items = []
+    saved_media = {}
+    
+    with zipfile.ZipFile(file_path) as z:
+        document = etree.parse(z.open('word/document.xml'))
+        if _HAS_TABLES(document):
+            return items
+        
+        numbered_styles = set()
+        if 'word/styles.xml' in z.namelist():
+            numbered_styles = _numbered_style_ids(etree.parse(z.open('word/styles.xml')))
+        
+        image_targets = {}
+        if 'word/_rels/document.xml.rels' in z.namelist():
+            rels = etree.parse(z.open('word/_rels/document.xml.rels'))
+            for rel in rels.iter(f'{_RELS}Relationship'):
+                if rel.get('Type', '').endswith('/image') and rel.get('TargetMode') != 'External':
+                    image_targets[rel.get('Id')] = posixpath.normpath(
+                        posixpath.join('word', rel.get('Target', ''))
+                    )
+        
+        for para in _BODY_PARAS(document):
+            if not _is_list_paragraph(para, numbered_styles):
+                continue
+            
+            text = _paragraph_text(para)
+            
+            images = []
+            rel_ids = _PARA_IMAGE_RELS(para)
+            for rel_id in rel_ids:
+                part = image_targets.get(rel_id)
+                if part is None:
+                    continue
+                if part not in saved_media:
+                    try:
+                        saved_media[part] = _copy_media_part(z, part, img_dir)
+                    except Exception as e:
+                        print(f"Error extracting image: {e}")
+                        saved_media[part] = None
+                if saved_media[part] is not None:
+                    images.append(dict(saved_media[part]))
+            
+            items.append(classify_list_item(text, images, bool(rel_ids)))
+    
+    return items
+
+
+def _copy_media_part(z: zipfile.ZipFile, part: str, img_dir: str) -> Dict:
+    """Copy one word/media part into img_dir and return its image record."""
+    ext = posixpath.splitext(part)[1].lstrip('.').lower() or 'png'
+    if ext == 'jpeg':
+        ext = 'jpg'
+    content_type = _CONTENT_TYPES.get(ext, f'image/{ext}')
+    
+    img_id = secrets.token_hex(4)
+    filename = f"img_{img_id}.{ext}"
+    img_path = os.path.join(img_dir, filename)
+    with z.open(part) as src, open(img_path, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    
+    return {
+        'id': img_id,
+        'filename': filename,
+        'path': img_path,
+        'content_type': content_type
+    }
+
+
+def read_mammoth_list_items(file_path: str, img_dir: str) -> List[Dict]:
+    """Convert the DOCX to HTML with mammoth and scan every <li>."""
+    with open(file_path, "rb") as f:
+        result = mammoth.convert_to_html(f)
+        html = result.value
+    
+    root = lxml.html.fragment_fromstring(html, create_parent='div')
+    return scan_list_items(_ALL_LIS(root), img_dir)
 
 
 def parse_docx_adaptive(file_path: str, job_id: str, upload_dir: str) -> List[Dict]:
@@ -206,63 +579,44 @@ def parse_docx_adaptive(file_path: str, job_id: str, upload_dir: str) -> List[Di
     Parse a DOCX file using adaptive question detection.
     
     Instead of assuming 5 items per question, this parser:
-    1. Identifies question boundaries by content analysis
+    1. Identifies question boundaries by content analysis of list items
     2. Collects all options until the next question
     3. Handles variable numbers of options
     4. Extracts embedded images
     """
-    with open(file_path, "rb") as f:
-        result = mammoth.convert_to_html(f)
-        html = result.value
-    
-    soup = BeautifulSoup(html, 'html.parser')
-    all_lis = soup.find_all('li')
+    img_dir = os.path.join(upload_dir, job_id, "images")
+    os.makedirs(img_dir, exist_ok=True)
+    
+    # Read list items straight from the DOCX XML; fall back to mammoth if the
+    # package can't be read that way, has tables or has no numbered paragraphs
+    try:
+        items = read_docx_list_items(file_path, img_dir)
+    except (KeyError, zipfile.BadZipFile, etree.XMLSyntaxError) as e:
+        print(f"Direct DOCX read failed: {e}, falling back to mammoth")
+        items = []
+    if not items:
+        items = read_mammoth_list_items(file_path, img_dir)
     
     questions = []
     current_question = None
     option_labels = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H']
     
-    for i, li in enumerate(all_lis):
-        text = li.get_text(strip=True)
-        has_img = len(li.find_all('img')) > 0
-        images = extract_images_from_element(li, job_id, upload_dir)
-        
+    # Grouping items into questions is stateful, so it stays sequential
+    for item in items:
         # Determine if this is a question or option
-        if is_likely_question(text, has_img):
+        if item['is_question']:
             # Save previous question if exists
             if current_question:
                 questions.append(current_question)
             
-            # Detect question type
-            question_type = 'single'
-            text_lower = text.lower()
-            if 'assertion' in text_lower or 'reason' in text_lower:
-                question_type = 'assertion-reason'
-            elif 'match' in text_lower:
-                question_type = 'matching'
-            elif any(x in text_lower for x in ['statement', 'कथन']):
-                question_type = 'statement-based'
-            elif 'how many' in text_lower or 'कितने' in text:
-                question_type = 'how-many'
-            
-            # Extract tables
-            tables = []
-            for table in li.find_all('table'):
-                tables.append({
-                    'id': str(uuid.uuid4())[:8],
-                    'html': str(table),
-                    'rows': len(table.find_all('tr')),
-                    'cols': len(table.find('tr').find_all(['td', 'th'])) if table.find('tr') else 0
-                })
-            
             current_question = {
                 'id': len(questions) + 1,
-                'english_text': text,
+                'english_text': item['text'],
                 'hindi_text': '',
-                'question_type': question_type,
+                'question_type': item['question_type'],
                 'options': [],
-                'tables': tables,
-                'images': images,
+                'tables': item['tables'],
+                'images': item['images'],
                 'answer': '',
                 'solution_english': '',
                 'solution_hindi': '',
@@ -280,10 +634,10 @@ def parse_docx_adaptive(file_path: str, job_id: str, upload_dir: str) -> List[Di
                 
                 current_question['options'].append({
                     'label': label,
-                    'english_text': text,
+                    'english_text': item['text'],
                     'hindi_text': '',
                     'is_correct': False,
-                    'images': images
+                    'images': item['images']
                 })
     
     # Don't forget the last question
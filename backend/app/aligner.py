@@ -8,6 +8,11 @@ from .models import (
 )
 
 
+# Option labels in display order
+OPTION_LABELS = ('A', 'B', 'C', 'D', 'E', 'F', 'G', 'H')
+_OPTION_LABEL_SET = frozenset(OPTION_LABELS)
+
+
 class QuestionAligner:
     """
     Aligns English and Hindi questions, creating merged bilingual questions.
@@ -140,7 +145,8 @@ class QuestionAligner:
                 elif pf == 'options_need_images' and QuestionFlag.OPTIONS_NEED_IMAGES not in flags:
                     flags.append(QuestionFlag.OPTIONS_NEED_IMAGES)
         
-        return Question(
+        # Every field is built (and typed) above, so skip re-validation
+        return Question.model_construct(
             id=question_id,
             english_text=english_text,
             hindi_text=hindi_text,
@@ -166,31 +172,33 @@ class QuestionAligner:
         """
         merged = []
         
-        # Build lookup by label
+        # Build lookup by label: label -> (text, needs_image)
         # smart_parser uses 'english_text' for option text
         en_by_label = {}
-        en_needs_image = {}
         for opt in en_options:
-            label = opt.get('label', '')
-            text = opt.get('english_text', opt.get('text', ''))
-            en_by_label[label] = text
-            en_needs_image[label] = opt.get('needs_image', False)
+            en_by_label[opt.get('label', '')] = (
+                opt.get('english_text', opt.get('text', '')),
+                opt.get('needs_image', False)
+            )
         
         hi_by_label = {}
         for opt in hi_options:
-            label = opt.get('label', '')
-            text = opt.get('english_text', opt.get('text', ''))  # Hindi text stored here
-            hi_by_label[label] = text
+            # Hindi text stored in 'english_text'
+            hi_by_label[opt.get('label', '')] = opt.get('english_text', opt.get('text', ''))
         
-        # Get all labels, sorted A, B, C, D
-        all_labels = sorted(set(en_by_label.keys()) | set(hi_by_label.keys()))
+        # Labels are normally A-H, so walk them in order; only fall back to
+        # sorting when a parser produced some other label
+        if all(l in _OPTION_LABEL_SET for l in en_by_label) and \
+                all(l in _OPTION_LABEL_SET for l in hi_by_label):
+            all_labels = [l for l in OPTION_LABELS if l in en_by_label or l in hi_by_label]
+        else:
+            all_labels = sorted(en_by_label.keys() | hi_by_label.keys())
         
         for label in all_labels:
-            en_text = en_by_label.get(label, '')
+            en_text, needs_image = en_by_label.get(label, ('', False))
             hi_text = hi_by_label.get(label, '')
-            needs_image = en_needs_image.get(label, False)
             
-            merged.append(Option(
+            merged.append(Option.model_construct(
                 label=label,
                 english_text=en_text,
                 hindi_text=hi_text,
@@ -217,7 +225,7 @@ class QuestionAligner:
             if t.get('is_complex'):
                 flags.append(QuestionFlag.COMPLEX_TABLE)
             
-            tables.append(TableData(
+            tables.append(TableData.model_construct(
                 id=t['id'],
                 html=t['html'],
                 is_complex=t.get('is_complex', False),
@@ -231,7 +239,7 @@ class QuestionAligner:
                 if t.get('is_complex'):
                     flags.append(QuestionFlag.COMPLEX_TABLE)
                 
-                tables.append(TableData(
+                tables.append(TableData.model_construct(
                     id=t['id'],
                     html=t['html'],
                     is_complex=t.get('is_complex', False),
@@ -255,7 +263,7 @@ class QuestionAligner:
         for img in en_images + hi_images:
             if img['id'] not in seen_ids:
                 seen_ids.add(img['id'])
-                images.append(ImageData(
+                images.append(ImageData.model_construct(
                     id=img['id'],
                     filename=img['filename'],
                     path=img['path'],
@@ -2,18 +2,110 @@
 Assets Module - Handle image and table extraction/processing.
 """
 import os
-import uuid
+import struct
+import asyncio
+import secrets
 import subprocess
-from typing import Optional
+from typing import Optional, Tuple
 from PIL import Image
 from io import BytesIO
 
 
+# Page boilerplate wrapped around a table before rendering it to an image
+_TABLE_HTML_PREFIX = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <style>
+        body { font-family: Arial, sans-serif; margin: 10px; }
+        table { border-collapse: collapse; width: 100%; }
+        td, th {
+            border: 1px solid #333;
+            padding: 8px;
+            text-align: left;
+        }
+        th { background-color: #f0f0f0; font-weight: bold; }
+    </style>
+</head>
+<body>
+"""
+_TABLE_HTML_SUFFIX = """
+</body>
+</html>
+"""
+
+
+def _peek_dimensions(filepath: str) -> Optional[Tuple[int, int]]:
+    """
+    Read (width, height) from a PNG, GIF or JPEG header without PIL.
+    Returns None for other formats or unreadable headers.
+    """
+    try:
+        with open(filepath, "rb") as f:
+            head = f.read(26)
+            if head[:8] == b"\x89PNG\r\n\x1a\n" and head[12:16] == b"IHDR":
+                return struct.unpack(">II", head[16:24])
+            if head[:6] in (b"GIF87a", b"GIF89a"):
+                return struct.unpack("<HH", head[6:10])
+            if head[:2] != b"\xff\xd8":
+                return None
+            
+            # JPEG: walk the marker segments until a start-of-frame marker
+            f.seek(2)
+            while True:
+                marker = f.read(2)
+                if len(marker) < 2 or marker[0] != 0xFF:
+                    return None
+                code = marker[1]
+                if code == 0xFF:
+                    # Fill byte before a marker
+                    f.seek(-1, os.SEEK_CUR)
+                    continue
+                if code in (0x01, 0xD8) or 0xD0 <= code <= 0xD7:
+                    # Markers without a length field
+                    continue
+                length_bytes = f.read(2)
+                if len(length_bytes) < 2:
+                    return None
+                length = struct.unpack(">H", length_bytes)[0]
+                if 0xC0 <= code <= 0xCF and code not in (0xC4, 0xC8, 0xCC):
+                    frame = f.read(5)
+                    if len(frame) < 5:
+                        return None
+                    height, width = struct.unpack(">HH", frame[1:5])
+                    return width, height
+                f.seek(length - 2, os.SEEK_CUR)
+    except OSError:
+        return None
+
+
+def _render_with_wkhtmltoimage(full_html: str, img_path: str) -> Optional[str]:
+    """Render a page to PNG with wkhtmltoimage. Returns img_path, or None on failure."""
+    # Feed the page on stdin instead of a temp file
+    try:
+        result = subprocess.run(
+            ["wkhtmltoimage", "--quality", "90", "-", img_path],
+            input=full_html.encode("utf-8"),
+            capture_output=True,
+            timeout=30
+        )
+        if result.returncode == 0 and os.path.exists(img_path):
+            return img_path
+    except (subprocess.SubprocessError, FileNotFoundError):
+        pass
+    
+    # None indicates the table should be rebuilt
+    return None
+
+
 class ImageProcessor:
     """Process and manage images extracted from documents."""
     
     def __init__(self, base_dir: str = "/tmp/qs-formatter"):
         self.base_dir = base_dir
+        self._created_dirs: set[str] = set()
+        # Paths of image files known to be on disk, so callers can skip a stat
+        self.known_paths: set[str] = set()
     
     def save_image(self, image_data: bytes, job_id: str, filename: str = None) -> str:
         """
@@ -21,27 +113,57 @@ class ImageProcessor:
         Returns the file path.
         """
         if filename is None:
-            filename = f"img_{uuid.uuid4().hex[:8]}.png"
+            filename = f"img_{secrets.token_hex(4)}.png"
         
         image_dir = os.path.join(self.base_dir, job_id, "images")
-        os.makedirs(image_dir, exist_ok=True)
+        if image_dir not in self._created_dirs:
+            os.makedirs(image_dir, exist_ok=True)
+            self._created_dirs.add(image_dir)
         
         filepath = os.path.join(image_dir, filename)
         
         with open(filepath, "wb") as f:
             f.write(image_data)
         
+        self.known_paths.add(filepath)
         return filepath
     
+    def exists(self, filepath: str) -> bool:
+        """Check an image path, stat-ing the file only the first time it's seen."""
+        if filepath in self.known_paths:
+            return True
+        if os.path.exists(filepath):
+            self.known_paths.add(filepath)
+            return True
+        return False
+    
+    def forget_job(self, job_id: str):
+        """Drop cached paths and directories for a job whose files were deleted."""
+        job_dir = os.path.join(self.base_dir, job_id) + os.sep
+        # Updated in place - exporters share the known_paths set. The sets are
+        # filtered through a list() snapshot, taken in one step under the GIL,
+        # because an export in a worker thread may add to them meanwhile
+        self.known_paths.difference_update([p for p in list(self.known_paths) if p.startswith(job_dir)])
+        self._created_dirs.difference_update([d for d in list(self._created_dirs) if d.startswith(job_dir)])
+    
     def resize_image(self, filepath: str, max_width: int = 600, max_height: int = 400) -> str:
         """
         Resize image if too large.
         Returns path to resized image.
         """
+        # Most extracted images are already small - check the header first
+        size = _peek_dimensions(filepath)
+        if size is not None and size[0] <= max_width and size[1] <= max_height:
+            return filepath
+        
         try:
             with Image.open(filepath) as img:
                 if img.width > max_width or img.height > max_height:
-                    img.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
+                    if img.format == "JPEG":
+                        # Let libjpeg downscale during decode
+                        img.draft("RGB", (max_width, max_height))
+                    # Preview-sized output - bilinear is indistinguishable from Lanczos here
+                    img.thumbnail((max_width, max_height), Image.Resampling.BILINEAR)
                     img.save(filepath)
         except Exception as e:
             print(f"Error resizing image {filepath}: {e}")
@@ -64,84 +186,101 @@ class TableProcessor:
     
     def __init__(self, base_dir: str = "/tmp/qs-formatter"):
         self.base_dir = base_dir
+        # Headless browser shared by all renders, started on first use
+        self._playwright = None
+        self._browser = None
+        self._browser_unavailable = False
+        self._browser_lock = asyncio.Lock()
     
-    def render_table_to_image(self, html: str, job_id: str) -> Optional[str]:
+    async def _get_browser(self):
         """
-        Render HTML table to PNG image using wkhtmltoimage or fallback.
+        Return the long-lived headless Chromium, launching it on first use.
+        Returns None if Playwright is not installed or cannot start a browser.
+        """
+        async with self._browser_lock:
+            if self._browser is not None or self._browser_unavailable:
+                return self._browser
+            
+            try:
+                from playwright.async_api import async_playwright
+                self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch()
+            except Exception as e:
+                print(f"Headless browser unavailable, using wkhtmltoimage: {e}")
+                self._browser_unavailable = True
+                if self._playwright is not None:
+                    await self._playwright.stop()
+                    self._playwright = None
+            
+            return self._browser
+    
+    async def close(self):
+        """Shut down the shared headless browser, if one was started."""
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+    
+    async def render_table_to_image(self, html: str, job_id: str) -> Optional[str]:
+        """
+        Render HTML table to PNG image using a shared headless browser,
+        falling back to wkhtmltoimage.
         Returns path to image file or None.
         """
-        table_id = uuid.uuid4().hex[:8]
+        table_id = secrets.token_hex(4)
         output_dir = os.path.join(self.base_dir, job_id, "tables")
         os.makedirs(output_dir, exist_ok=True)
         
-        html_path = os.path.join(output_dir, f"table_{table_id}.html")
         img_path = os.path.join(output_dir, f"table_{table_id}.png")
         
-        # Create full HTML document
-        full_html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 10px; }}
-                table {{ border-collapse: collapse; width: 100%; }}
-                td, th {{ 
-                    border: 1px solid #333; 
-                    padding: 8px; 
-                    text-align: left;
-                }}
-                th {{ background-color: #f0f0f0; font-weight: bold; }}
-            </style>
-        </head>
-        <body>
-            {html}
-        </body>
-        </html>
-        """
-        
-        with open(html_path, "w", encoding="utf-8") as f:
-            f.write(full_html)
+        # Wrap the table in the shared page boilerplate
+        full_html = _TABLE_HTML_PREFIX + html + _TABLE_HTML_SUFFIX
         
-        # Try wkhtmltoimage
-        try:
-            result = subprocess.run(
-                ["wkhtmltoimage", "--quality", "90", html_path, img_path],
-                capture_output=True,
-                timeout=30
-            )
-            if result.returncode == 0 and os.path.exists(img_path):
+        # Try the shared headless browser first - no per-table process startup
+        browser = await self._get_browser()
+        if browser is not None:
+            page = None
+            try:
+                page = await browser.new_page()
+                await page.set_content(full_html)
+                await page.locator('table').first.screenshot(path=img_path)
                 return img_path
-        except (subprocess.SubprocessError, FileNotFoundError):
-            pass
+            except Exception as e:
+                print(f"Error rendering table in headless browser: {e}")
+            finally:
+                if page is not None:
+                    await page.close()
         
-        # Fallback: Try with chromium/puppeteer if available
-        # For now, return None to indicate table should be rebuilt
-        return None
+        # Fall back to wkhtmltoimage, without blocking the event loop
+        return await asyncio.to_thread(_render_with_wkhtmltoimage, full_html, img_path)
     
     def is_complex_table(self, html: str) -> bool:
         """Determine if table is complex and needs image rendering."""
-        from bs4 import BeautifulSoup
+        import lxml.html
+        from lxml import etree
         
-        soup = BeautifulSoup(html, 'lxml')
-        table = soup.find('table')
-        
-        if not table:
+        try:
+            root = lxml.html.fromstring(html)
+        except (etree.ParserError, ValueError):
             return False
         
-        # Check for colspan/rowspan
-        if table.find(attrs={'colspan': True}) or table.find(attrs={'rowspan': True}):
-            return True
-        
-        # Check for nested tables
-        if len(table.find_all('table')) > 0:
-            return True
+        table = next(root.iter('table'), None)
+        if table is None:
+            return False
         
-        # Check row consistency
-        rows = table.find_all('tr')
-        if rows:
-            cell_counts = [len(row.find_all(['td', 'th'])) for row in rows]
-            if len(set(cell_counts)) > 1:
+        # Single walk over the table, stopping at the first complexity signal:
+        # colspan/rowspan, a nested table, or rows with differing cell counts
+        cell_counts = set()
+        for el in table.iterdescendants(etree.Element):
+            if el.get('colspan') is not None or el.get('rowspan') is not None:
+                return True
+            if el.tag == 'table':
                 return True
+            if el.tag == 'tr':
+                cell_counts.add(sum(1 for _ in el.iter('td', 'th')))
+                if len(cell_counts) > 1:
+                    return True
         
         return False
@@ -2,11 +2,119 @@
 Final DOCX Parser - Handles the specific format of the test documents.
 """
 import re
-import uuid
+import secrets
+import shutil
 import os
 from typing import List, Dict, Any, Optional, Tuple
 import mammoth
-from bs4 import BeautifulSoup, NavigableString, Tag
+import lxml.html
+from lxml import etree
+from lxml.html import HtmlElement
+
+
+# Question indicators, matched case-insensitively against the lowercased text.
+# Each pattern group below is fused into one alternation so a text is scanned once.
+# Gaps between keyword pairs are lazy so a match stops at the first closing keyword.
+_QUESTION_RE = re.compile('|'.join(f'(?:{p})' for p in (
+    r'(?:consider|विचार).+?(?:following|निम्नलिखित)',
+    r'(?:which|कौन).+?(?:of the|में से)',
+    r'(?:select|चुनिए|चयन).+?(?:correct|सही)',
+    r'(?:choose|चुनिए)',
+    r'(?:with reference|के संदर्भ)',
+    r'(?:given below|नीचे दिए)',
+    r'(?:match|मिलान)',
+    r'(?:assertion|अभिकथन)',
+    r'(?:statement|कथन)',
+    r'(?:following pairs|निम्नलिखित युग्मों)',
+    r'(?:correct(?:ly)? (?:paired|matched)|सही.*?(?:जोड़|मिला))',
+)), re.IGNORECASE)
+
+# Every _QUESTION_RE branch begins with one of these literals, so a text
+# containing none of them cannot match. 'ı' and 'ſ' are listed because the
+# case-insensitive regex also matches them as 'i' and 's'.
+_QUESTION_HINTS = (
+    'consider', 'which', 'select', 'choose', 'with reference', 'given below',
+    'match', 'assertion', 'statement', 'following pairs', 'correct',
+    'विचार', 'कौन', 'चुनिए', 'चयन', 'के संदर्भ', 'नीचे दिए', 'मिलान',
+    'अभिकथन', 'कथन', 'निम्नलिखित युग्मों', 'सही',
+    'ı', 'ſ',
+)
+
+# Standard option patterns that are short (option label plus content)
+_PURE_OPTION_RE = re.compile('|'.join(f'(?:{p})' for p in (
+    r'^\s*[\(\[]?\s*[A-Da-d]\s*[\)\]\.]\s*.+$',
+    r'^\s*[1-4]\s*[\)\]\.]\s*.+$',
+    r'^\s*(?:only|केवल)\s+[0-9]',
+    r'^\s*[0-9]+\s*(?:and|और)\s*[0-9]+',
+    r'^\s*(?:Both|Neither|दोनों|न तो)',
+    r'^\s*(?:All|None|सभी|कोई नहीं)',
+)), re.IGNORECASE)
+
+# Option starts of any length
+_OPTION_PATTERNS = (
+    r'^\s*[\(\[]?\s*[A-Da-d]\s*[\)\]\.]\s*',
+    r'^\s*[1-4]\s*[\)\]\.]\s*',
+    r'^(?:only|केवल)\s+[0-9]',
+    r'^[0-9]+\s*(?:and|और)\s*[0-9]+\s*(?:only|केवल)?',
+    r'^(?:Both|Neither|All|None)',
+    r'^(?:दोनों|न तो|सभी|कोई नहीं)',
+    r'^[A-D]-[0-9]',  # Match patterns like A-3, B-1
+)
+_OPTION_RE = re.compile('|'.join(f'(?:{p})' for p in _OPTION_PATTERNS), re.IGNORECASE)
+
+# Continuation patterns
+_CONTINUATION_PATTERNS = (
+    r'^\s*[1-9]\s+\w',  # Numbered statements like "1 statement text" or "2. statement text"
+    r'^(?:Assertion|Reason|अभिकथन|कारण)',
+    r'^(?:Statement|कथन)',
+)
+_CONTINUATION_RE = re.compile('|'.join(f'(?:{p})' for p in _CONTINUATION_PATTERNS), re.IGNORECASE)
+
+# Options and continuations in one scan, for block classification. The option
+# group is tried first, so it wins when a text matches both.
+_OPTION_OR_CONTINUATION_RE = re.compile(
+    '(?P<option>' + '|'.join(f'(?:{p})' for p in _OPTION_PATTERNS) + ')'
+    '|(?P<continuation>' + '|'.join(f'(?:{p})' for p in _CONTINUATION_PATTERNS) + ')',
+    re.IGNORECASE
+)
+
+# Characters a (stripped) text can start with for the option or continuation
+# patterns above to match; anything else skips the regex entirely
+_OPTION_FIRST_CHARS = frozenset('([ABCDabcd0123456789OoNnकदनस')
+_CONTINUATION_FIRST_CHARS = frozenset('123456789AaRrSsſअक')  # ſ case-folds to s
+_BLOCK_FIRST_CHARS = _OPTION_FIRST_CHARS | _CONTINUATION_FIRST_CHARS
+
+_QUESTION_PREFIX_RE = re.compile(r'^\s*Q\.?\s*\d+[\.\):]?\s*')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Option label extraction: (label, content) groups
+_OPTION_LABEL_PATTERNS = [re.compile(p, re.DOTALL | re.IGNORECASE) for p in (
+    r'^\s*[\(\[]?\s*([A-Da-d])\s*[\)\]\.:\-]\s*(.+)$',
+    r'^\s*([1-4])\s*[\)\]\.:\-]\s*(.+)$',
+    r'^([A-D])-(\d+,?\s*[A-D]-\d+.*)$',  # Match patterns like A-3, B-1...
+)]
+_ONLY_OPTION_RE = re.compile(r'^(?:only|केवल)\s*(.+)$', re.IGNORECASE)
+_BOTH_OPTION_RE = re.compile(r'^(Both|Neither|All|None|दोनों|न तो|सभी|कोई नहीं)\s*(.*)$', re.IGNORECASE)
+_NUMBERS_OPTION_RE = re.compile(r'^(\d+)\s*(?:and|और|,)\s*(\d+.*)')
+
+# Block classes used when grouping blocks into questions
+_BLOCK_OTHER, _BLOCK_QUESTION, _BLOCK_TABLE, _BLOCK_OPTION, _BLOCK_CONTINUATION = range(5)
+
+# Normalized option order: options left without a label sort before A
+_OPTION_ORDER = ('?', 'A', 'B', 'C', 'D', 'E', 'F')
+
+_HEADING_TAGS = frozenset(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
+
+# Compiled XPath lookups for table complexity checks
+_SPAN_CELLS = etree.XPath('.//*[@colspan or @rowspan]')
+_NESTED_TABLES = etree.XPath('.//table')
+_TABLE_ROWS = etree.XPath('.//tr')
+_ROW_CELLS = etree.XPath('.//td|.//th')
+
+
+def _element_text(elem: HtmlElement) -> str:
+    """Stripped text pieces of an element joined by single spaces (bs4's get_text(' ', strip=True))."""
+    return ' '.join(filter(None, map(str.strip, elem.itertext())))
 
 
 class DocumentParser:
@@ -37,30 +145,32 @@ class DocumentParser:
         os.makedirs(image_dir, exist_ok=True)
         
         def handle_image(image):
-            with image.open() as img_stream:
-                img_data = img_stream.read()
-                img_id = str(uuid.uuid4())[:8]
-                ext = "png" if "png" in image.content_type else "jpg"
-                
-                filename = f"img_{img_id}.{ext}"
-                filepath = os.path.join(image_dir, filename)
-                
-                with open(filepath, "wb") as f:
-                    f.write(img_data)
-                
-                images.append({
-                    "id": img_id,
-                    "filename": filename,
-                    "path": filepath,
-                    "content_type": image.content_type
-                })
-                
-                return {"src": f"__IMAGE__{img_id}__"}
+            img_id = secrets.token_hex(4)
+            ext = "png" if "png" in image.content_type else "jpg"
+            
+            filename = f"img_{img_id}.{ext}"
+            filepath = os.path.join(image_dir, filename)
+            
+            # Stream to disk in 64 KiB chunks instead of holding the whole image
+            with image.open() as img_stream, open(filepath, "wb") as f:
+                shutil.copyfileobj(img_stream, f, 64 * 1024)
+            
+            images.append({
+                "id": img_id,
+                "filename": filename,
+                "path": filepath,
+                "content_type": image.content_type
+            })
+            
+            return {"src": f"__IMAGE__{img_id}__"}
         
+        # Uploaded Word files never carry a mammoth-embedded style map, so skip
+        # the extra pass over the zip that looks for one
         with open(file_path, "rb") as f:
             result = mammoth.convert_to_html(
                 f,
-                convert_image=mammoth.images.img_element(handle_image)
+                convert_image=mammoth.images.img_element(handle_image),
+                include_embedded_style_map=False
             )
         
         return result.value, images
@@ -74,48 +184,52 @@ class DocumentParser:
         3. Group content between question starts
         4. Extract options from each group
         """
-        soup = BeautifulSoup(html, 'lxml')
+        root = lxml.html.fragment_fromstring(html, create_parent='div')
         
         # Flatten content
-        blocks = self._flatten_content(soup)
+        blocks = self._flatten_content(root)
         
         # Group into questions
         questions = self._group_into_questions(blocks)
         
         return questions
     
-    def _flatten_content(self, soup: BeautifulSoup) -> List[Dict]:
+    def _flatten_content(self, root: HtmlElement) -> List[Dict]:
         """Flatten HTML into linear blocks of text/tables."""
         blocks = []
         
-        body = soup.body if soup.body else soup
+        def add_loose_text(text: Optional[str]):
+            # Bare text between top-level elements
+            if text and text.strip():
+                blocks.append({'type': 'text', 'content': text.strip()})
         
-        for elem in body.children:
-            if isinstance(elem, NavigableString):
-                text = str(elem).strip()
-                if text:
-                    blocks.append({'type': 'text', 'content': text})
-            elif elem.name == 'table':
+        add_loose_text(root.text)
+        
+        for elem in root.iterchildren():
+            tag = elem.tag
+            if tag == 'table':
                 blocks.append({
                     'type': 'table',
-                    'content': elem.get_text(' ', strip=True),
-                    'html': str(elem),
+                    'content': _element_text(elem),
+                    'html': lxml.html.tostring(elem, encoding='unicode', with_tail=False),
                     'is_complex': self._is_complex_table(elem)
                 })
-            elif elem.name in ['ol', 'ul']:
+            elif tag == 'ol' or tag == 'ul':
                 # Each list item becomes a separate block
-                for li in elem.find_all('li', recursive=False):
-                    text = li.get_text(' ', strip=True)
+                for li in elem.iterchildren('li'):
+                    text = _element_text(li)
                     if text:
                         blocks.append({'type': 'list_item', 'content': text})
-            elif elem.name == 'p':
-                text = elem.get_text(' ', strip=True)
+            elif tag == 'p':
+                text = _element_text(elem)
                 if text:
                     blocks.append({'type': 'paragraph', 'content': text})
-            elif elem.name in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
-                text = elem.get_text(' ', strip=True)
+            elif tag in _HEADING_TAGS:
+                text = _element_text(elem)
                 if text:
                     blocks.append({'type': 'heading', 'content': text})
+            
+            add_loose_text(elem.tail)
         
         return blocks
     
@@ -123,83 +237,104 @@ class DocumentParser:
         """Group blocks into questions."""
         questions = []
         current_q = None
+        text_parts = []  # current question text and continuations, joined on save
         q_num = 0
         
-        i = 0
-        while i < len(blocks):
-            block = blocks[i]
+        # Classify every block once up front. Option strings like "Both 1 and 2"
+        # repeat throughout a question bank, so each distinct block is classified
+        # only once per document.
+        classified = {}
+        codes = []
+        for block in blocks:
+            key = (block['content'], block['type'])
+            code = classified.get(key)
+            if code is None:
+                code = classified[key] = self._classify_block(block['content'], block['type'])
+            codes.append(code)
+        
+        # Single forward pass: current_q is None until the first question start
+        for block, code in zip(blocks, codes):
             text = block['content']
-            block_type = block['type']
             
             # Check if this starts a new question
-            if self._is_question_start(text, block_type):
+            if code == _BLOCK_QUESTION:
                 # Save current question
                 if current_q:
+                    current_q['text'] = ' '.join(text_parts)
                     current_q['options'] = self._normalize_options(current_q['options'])
                     questions.append(current_q)
                 
                 q_num += 1
-                q_text = self._clean_question_text(text)
-                
+                text_parts = [self._clean_question_text(text)]
                 current_q = {
                     'number': q_num,
-                    'text': q_text,
+                    'text': '',
                     'options': [],
                     'tables': [],
                     'images': []
                 }
-                
-                # Look ahead to collect question content
-                i += 1
-                while i < len(blocks):
-                    next_block = blocks[i]
-                    next_text = next_block['content']
-                    next_type = next_block['type']
-                    
-                    # If next block is a new question, stop
-                    if self._is_question_start(next_text, next_type):
-                        break
-                    
-                    # Handle table
-                    if next_type == 'table':
-                        current_q['tables'].append({
-                            'id': str(uuid.uuid4())[:8],
-                            'html': next_block.get('html', ''),
-                            'is_complex': next_block.get('is_complex', False)
-                        })
-                        i += 1
-                        continue
-                    
-                    # Check if it's an option
-                    if self._is_option_text(next_text):
-                        opt = self._parse_option(next_text)
-                        if opt:
-                            current_q['options'].append(opt)
-                    else:
-                        # Append to question text (might be continuation or statement)
-                        if self._is_continuation_text(next_text):
-                            current_q['text'] += ' ' + next_text
-                    
-                    i += 1
-                
+            
+            elif current_q is None:
+                # Content before the first question
                 continue
             
-            i += 1
+            elif code == _BLOCK_TABLE:
+                current_q['tables'].append({
+                    'id': secrets.token_hex(4),
+                    'html': block.get('html', ''),
+                    'is_complex': block.get('is_complex', False)
+                })
+            
+            elif code == _BLOCK_OPTION:
+                opt = self._parse_option(text)
+                if opt:
+                    current_q['options'].append(opt)
+            
+            elif code == _BLOCK_CONTINUATION:
+                # Append to question text (might be continuation or statement)
+                text_parts.append(text)
         
         # Don't forget last question
         if current_q:
+            current_q['text'] = ' '.join(text_parts)
             current_q['options'] = self._normalize_options(current_q['options'])
             questions.append(current_q)
         
         return questions
     
-    def _is_question_start(self, text: str, block_type: str) -> bool:
+    def _classify_block(self, text: str, block_type: str) -> int:
+        """
+        Classify a block for grouping, in priority order: question start,
+        table, option, continuation, anything else.
+        """
+        # One scan answers both the option and the continuation check
+        stripped = text.strip()
+        start_kind = None
+        if stripped and stripped[0] in _BLOCK_FIRST_CHARS:
+            match = _OPTION_OR_CONTINUATION_RE.match(stripped)
+            if match:
+                start_kind = match.lastgroup
+        
+        is_option = start_kind == 'option'
+        if self._is_question_start(text, block_type, is_option):
+            return _BLOCK_QUESTION
+        if block_type == 'table':
+            return _BLOCK_TABLE
+        if is_option:
+            return _BLOCK_OPTION
+        if start_kind == 'continuation':
+            return _BLOCK_CONTINUATION
+        return _BLOCK_OTHER
+    
+    def _is_question_start(self, text: str, block_type: str,
+                           is_option: Optional[bool] = None) -> bool:
         """
         Determine if this text starts a new question.
         Questions typically:
         - Are longer than options
         - Contain question indicators
         - End with ? or ask for selection
+        is_option may carry an already computed _is_option_text(text).
         """
         text = text.strip()
         
@@ -211,29 +346,23 @@ class DocumentParser:
         if self._is_pure_option(text):
             return False
         
-        # Question patterns
-        question_patterns = [
-            r'(?:consider|विचार).+(?:following|निम्नलिखित)',
-            r'(?:which|कौन).+(?:of the|में से)',
-            r'(?:select|चुनिए|चयन).+(?:correct|सही)',
-            r'(?:choose|चुनिए)',
-            r'(?:with reference|के संदर्भ)',
-            r'(?:given below|नीचे दिए)',
-            r'(?:match|मिलान)',
-            r'(?:assertion|अभिकथन)',
-            r'(?:statement|कथन)',
-            r'\?$',  # Ends with ?
-            r'(?:following pairs|निम्नलिखित युग्मों)',
-            r'(?:correct(?:ly)? (?:paired|matched)|सही.*(?:जोड़|मिला))',
-        ]
+        # Ends with ? (text is stripped, so no per-position regex branch is needed)
+        if text.endswith('?'):
+            return True
         
         text_lower = text.lower()
-        for pattern in question_patterns:
-            if re.search(pattern, text_lower, re.IGNORECASE):
-                return True
+        has_hint = any(hint in text_lower for hint in _QUESTION_HINTS)
+        if has_hint and _QUESTION_RE.search(text_lower):
+            return True
+        
+        # Short text without a question indicator cannot qualify below
+        if len(text) <= 50:
+            return False
         
         # Long text that's not an option is likely a question
-        if len(text) > 50 and not self._is_option_text(text):
+        if is_option is None:
+            is_option = len(text) > 50 and self._is_option_text(text)
+        if len(text) > 50 and not is_option:
             # Additional checks
             if block_type == 'list_item':
                 # In list context, only if contains question indicators
@@ -248,18 +377,8 @@ class DocumentParser:
         text = text.strip()
         
         # Standard option patterns that are short
-        if len(text) < 80:
-            patterns = [
-                r'^\s*[\(\[]?\s*[A-Da-d]\s*[\)\]\.]\s*.+$',
-                r'^\s*[1-4]\s*[\)\]\.]\s*.+$',
-                r'^\s*(?:only|केवल)\s+[0-9]',
-                r'^\s*[0-9]+\s*(?:and|और)\s*[0-9]+',
-                r'^\s*(?:Both|Neither|दोनों|न तो)',
-                r'^\s*(?:All|None|सभी|कोई नहीं)',
-            ]
-            for pattern in patterns:
-                if re.match(pattern, text, re.IGNORECASE):
-                    return True
+        if len(text) < 80 and text and text[0] in _OPTION_FIRST_CHARS:
+            return _PURE_OPTION_RE.match(text) is not None
         
         return False
     
@@ -267,48 +386,25 @@ class DocumentParser:
         """Check if text looks like an option."""
         text = text.strip()
         
-        patterns = [
-            r'^\s*[\(\[]?\s*[A-Da-d]\s*[\)\]\.]\s*',
-            r'^\s*[1-4]\s*[\)\]\.]\s*',
-            r'^(?:only|केवल)\s+[0-9]',
-            r'^[0-9]+\s*(?:and|और)\s*[0-9]+\s*(?:only|केवल)?',
-            r'^(?:Both|Neither|All|None)',
-            r'^(?:दोनों|न तो|सभी|कोई नहीं)',
-            r'^[A-D]-[0-9]',  # Match patterns like A-3, B-1
-        ]
-        
-        for pattern in patterns:
-            if re.match(pattern, text, re.IGNORECASE):
-                return True
-        
-        return False
+        if not text or text[0] not in _OPTION_FIRST_CHARS:
+            return False
+        return _OPTION_RE.match(text) is not None
     
     def _is_continuation_text(self, text: str) -> bool:
         """Check if text is a continuation of the question (like numbered statements)."""
         text = text.strip()
         
-        # Numbered statements like "1 statement text" or "2. statement text"
-        if re.match(r'^\s*[1-9]\s+\w', text):
-            return True
-        
-        # Continuation patterns
-        patterns = [
-            r'^(?:Assertion|Reason|अभिकथन|कारण)',
-            r'^(?:Statement|कथन)',
-        ]
-        
-        for pattern in patterns:
-            if re.match(pattern, text, re.IGNORECASE):
-                return True
-        
-        return False
+        if not text or text[0] not in _CONTINUATION_FIRST_CHARS:
+            return False
+        # Numbered statements or Assertion/Reason/Statement lines
+        return _CONTINUATION_RE.match(text) is not None
     
     def _clean_question_text(self, text: str) -> str:
         """Clean up question text."""
         text = text.strip()
         # Remove leading question patterns if present
-        text = re.sub(r'^\s*Q\.?\s*\d+[\.\):]?\s*', '', text)
-        text = re.sub(r'\s+', ' ', text)
+        text = _QUESTION_PREFIX_RE.sub('', text)
+        text = _WHITESPACE_RE.sub(' ', text)
         return text.strip()
     
     def _parse_option(self, text: str) -> Optional[Dict]:
@@ -316,14 +412,8 @@ class DocumentParser:
         text = text.strip()
         
         # Try to extract label
-        patterns = [
-            r'^\s*[\(\[]?\s*([A-Da-d])\s*[\)\]\.:\-]\s*(.+)$',
-            r'^\s*([1-4])\s*[\)\]\.:\-]\s*(.+)$',
-            r'^([A-D])-(\d+,?\s*[A-D]-\d+.*)$',  # Match patterns like A-3, B-1...
-        ]
-        
-        for pattern in patterns:
-            match = re.match(pattern, text, re.DOTALL | re.IGNORECASE)
+        for pattern in _OPTION_LABEL_PATTERNS:
+            match = pattern.match(text)
             if match:
                 label = match.group(1).upper()
                 if label.isdigit():
@@ -334,7 +424,7 @@ class DocumentParser:
                 }
         
         # Handle "only X and Y" style options
-        only_match = re.match(r'^(?:only|केवल)\s*(.+)$', text, re.IGNORECASE)
+        only_match = _ONLY_OPTION_RE.match(text)
         if only_match:
             return {
                 'label': '?',  # Will be assigned later
@@ -342,7 +432,7 @@ class DocumentParser:
             }
         
         # Handle "Both X and Y" style
-        both_match = re.match(r'^(Both|Neither|All|None|दोनों|न तो|सभी|कोई नहीं)\s*(.*)$', text, re.IGNORECASE)
+        both_match = _BOTH_OPTION_RE.match(text)
         if both_match:
             return {
                 'label': '?',
@@ -350,7 +440,7 @@ class DocumentParser:
             }
         
         # Numbered options without prefix
-        num_match = re.match(r'^(\d+)\s*(?:and|और|,)\s*(\d+.*)', text)
+        num_match = _NUMBERS_OPTION_RE.match(text)
         if num_match:
             return {
                 'label': '?',
@@ -364,34 +454,38 @@ class DocumentParser:
         if not options:
             return []
         
-        # First, handle options that already have labels
-        labeled = [o for o in options if o.get('label') != '?']
-        unlabeled = [o for o in options if o.get('label') == '?']
-        
-        # Assign labels to unlabeled options
-        used_labels = set(o['label'] for o in labeled)
-        available_labels = [l for l in ['A', 'B', 'C', 'D', 'E', 'F'] if l not in used_labels]
-        
-        for i, opt in enumerate(unlabeled):
-            if i < len(available_labels):
-                opt['label'] = available_labels[i]
-        
-        # Combine and sort
-        all_options = labeled + unlabeled
-        all_options.sort(key=lambda x: x.get('label', 'Z'))
+        # First, handle options that already have labels (always A-D):
+        # record them in a bitmask, bit 0 = 'A'
+        labeled = []
+        unlabeled = []
+        used = 0
+        for o in options:
+            if o.get('label') == '?':
+                unlabeled.append(o)
+            else:
+                labeled.append(o)
+                used |= 1 << (ord(o['label']) - 65)
+        
+        # Assign the free labels among A-F, in order, to unlabeled options
+        free = (b for b in range(6) if not used >> b & 1)
+        for opt, b in zip(unlabeled, free):
+            opt['label'] = chr(65 + b)
+        
+        # Order by label without sorting: options still unlabeled ('?') first,
+        # then A-F, keeping labeled before unlabeled within a label
+        by_label = {label: [] for label in _OPTION_ORDER}
+        for o in labeled:
+            by_label[o['label']].append(o)
+        for o in unlabeled:
+            by_label[o['label']].append(o)
+        all_options = [o for label in _OPTION_ORDER for o in by_label[label]]
         
         # Keep only first 4-6 options
         return all_options[:6]
     
-    def _is_complex_table(self, table: Tag) -> bool:
+    def _is_complex_table(self, table: HtmlElement) -> bool:
         """Check if table is complex."""
-        if table.find(attrs={'colspan': True}) or table.find(attrs={'rowspan': True}):
-            return True
-        if len(table.find_all('table')) > 0:
+        if _SPAN_CELLS(table) or _NESTED_TABLES(table):
             return True
-        rows = table.find_all('tr')
-        if rows:
-            cell_counts = [len(row.find_all(['td', 'th'])) for row in rows]
-            if len(set(cell_counts)) > 1:
-                return True
-        return False
+        cell_counts = {len(_ROW_CELLS(row)) for row in _TABLE_ROWS(table)}
+        return len(cell_counts) > 1
@@ -15,44 +15,38 @@ import uuid
 import base64
 from typing import Optional, List, Dict, Any, Tuple
 from docx import Document
-from docx.oxml.ns import qn
-import mammoth
-from bs4 import BeautifulSoup, Tag
+from lxml import etree
 
+from .question_types import detect_question_type
 
-def check_needs_image(text: str) -> bool:
-    """Check if text contains (Image) marker indicating manual image insertion needed."""
-    return '(Image)' in text or '(image)' in text.lower()
 
+# Word and Math (OMML) namespaces
+_NS = {
+    'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main',
+    'm': 'http://schemas.openxmlformats.org/officeDocument/2006/math',
+}
 
-def detect_question_type(text: str) -> str:
-    """Detect question type from text patterns."""
-    text_lower = text.lower()
-    if 'assertion' in text_lower or 'reason' in text_lower:
-        return 'assertion-reason'
-    elif 'match' in text_lower or 'matching' in text_lower:
-        return 'matching'
-    elif 'how many' in text_lower or 'कितने' in text:
-        return 'how-many'
-    elif any(x in text_lower for x in ['statement', 'statements', 'कथन', 'कथनों']):
-        return 'statement-based'
-    elif 'figure' in text_lower or 'image' in text_lower or 'diagram' in text_lower:
-        return 'figure-based'
-    return 'single'
+# Compiled XPath lookups, evaluated once per paragraph
+_PARA_TEXTS = etree.XPath('.//w:t/text()|.//m:t/text()', namespaces=_NS)
+_PARA_NUMID = etree.XPath('./w:pPr/w:numPr/w:numId/@w:val', namespaces=_NS)
+
+
+def check_needs_image(text: str, text_lower: Optional[str] = None) -> bool:
+    """
+    Check if text contains (Image) marker indicating manual image insertion needed.
+    Pass text_lower when the caller has already lowercased the text.
+    """
+    if '(Image)' in text:
+        return True
+    if text_lower is None:
+        text_lower = text.lower()
+    return '(image)' in text_lower
 
 
 def get_para_numid(para) -> Optional[int]:
     """Get the numId (list numbering ID) of a paragraph, if any."""
-    pPr = para._element.pPr
-    if pPr is None:
-        return None
-    numPr = pPr.numPr
-    if numPr is None:
-        return None
-    numId = numPr.numId
-    if numId is None:
-        return None
-    return numId.val
+    vals = _PARA_NUMID(para._element)
+    return int(vals[0]) if vals else None
 
 
 def get_para_text(para) -> str:
@@ -60,26 +54,8 @@ def get_para_text(para) -> str:
     Get all text from a paragraph, including Math (OMML) elements.
     python-docx's para.text doesn't include text from <m:t> math elements.
     """
-    from lxml import etree
-    
-    text_parts = []
-    
-    # Namespace for math
-    MATH_NS = "http://schemas.openxmlformats.org/officeDocument/2006/math"
-    WORD_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
-    
-    # Walk through all elements in the paragraph
-    for elem in para._element.iter():
-        # Regular text runs
-        if elem.tag == qn('w:t'):
-            if elem.text:
-                text_parts.append(elem.text)
-        # Math text elements
-        elif elem.tag == f'{{{MATH_NS}}}t':
-            if elem.text:
-                text_parts.append(elem.text)
-    
-    return ''.join(text_parts).strip()
+    # Regular text runs and Math text elements, in document order
+    return ''.join(_PARA_TEXTS(para._element)).strip()
 
 
 def extract_images_from_docx(doc, job_id: str, upload_dir: str) -> Dict[str, List[Dict]]:
@@ -104,10 +80,12 @@ def parse_docx_with_numbering(file_path: str, job_id: str, upload_dir: str) -> L
     """
     doc = Document(file_path)
     
-    # First pass: analyze numId distribution
+    # Single pass over the paragraphs: (text, numId) for each
+    rows = [(get_para_text(para), get_para_numid(para)) for para in doc.paragraphs]
+    
+    # Analyze numId distribution (over all paragraphs, including empty ones)
     numid_counts = {}
-    for para in doc.paragraphs:
-        numid = get_para_numid(para)
+    for _, numid in rows:
         if numid is not None:
             numid_counts[numid] = numid_counts.get(numid, 0) + 1
     
@@ -115,6 +93,9 @@ def parse_docx_with_numbering(file_path: str, job_id: str, upload_dir: str) -> L
         print("Warning: No numbered lists found in document")
         return []
     
+    # Only paragraphs with text take part in question building
+    rows = [row for row in rows if row[0]]
+    
     # Detect document style
     max_numid = max(numid_counts, key=numid_counts.get)
     max_count = numid_counts[max_numid]
@@ -125,15 +106,19 @@ def parse_docx_with_numbering(file_path: str, job_id: str, upload_dir: str) -> L
         # Hindi style: questions have their own numId
         question_numid = max_numid
         print(f"Hindi style: question numId={question_numid} with {max_count} items")
-        return parse_hindi_style(doc, question_numid, job_id, upload_dir)
+        return parse_hindi_style(rows, question_numid, job_id, upload_dir)
     else:
         # English style: questions are plain paragraphs, all numIds are options
         print(f"English style: all numIds have 4 items (options only)")
-        return parse_english_style(doc, numid_counts, job_id, upload_dir)
+        return parse_english_style(rows, numid_counts, job_id, upload_dir)
 
 
-def parse_hindi_style(doc, question_numid: int, job_id: str, upload_dir: str) -> List[Dict]:
-    """Parse Hindi-style document where questions have their own numId."""
+def parse_hindi_style(rows: List[Tuple[str, Optional[int]]], question_numid: int,
+                      job_id: str, upload_dir: str) -> List[Dict]:
+    """
+    Parse Hindi-style document where questions have their own numId.
+    rows holds (text, numId) for each non-empty paragraph, in document order.
+    """
     questions = []
     current_question = None
     current_options = []
@@ -141,13 +126,7 @@ def parse_hindi_style(doc, question_numid: int, job_id: str, upload_dir: str) ->
     supplementary_text = []
     q_id = 1
     
-    for para in doc.paragraphs:
-        text = get_para_text(para)
-        if not text:
-            continue
-            
-        numid = get_para_numid(para)
-        
+    for text, numid in rows:
         if numid == question_numid:
             # This is a question paragraph - save previous question first
             if current_question is not None:
@@ -190,10 +169,12 @@ def parse_hindi_style(doc, question_numid: int, job_id: str, upload_dir: str) ->
     return questions
 
 
-def parse_english_style(doc, numid_counts: Dict, job_id: str, upload_dir: str) -> List[Dict]:
+def parse_english_style(rows: List[Tuple[str, Optional[int]]], numid_counts: Dict,
+                        job_id: str, upload_dir: str) -> List[Dict]:
     """
     Parse English-style document where questions are plain paragraphs
     and options are numbered with (a), (b), (c), (d).
+    rows holds (text, numId) for each non-empty paragraph, in document order.
     
     Pattern:
     [Plain paragraphs] = Q1 question text
@@ -210,13 +191,7 @@ def parse_english_style(doc, numid_counts: Dict, job_id: str, upload_dir: str) -
     current_options = []
     q_id = 1
     
-    for para in doc.paragraphs:
-        text = get_para_text(para)
-        if not text:
-            continue
-            
-        numid = get_para_numid(para)
-        
+    for text, numid in rows:
         if numid is not None and numid != 0:  # Skip numId=0 (headers/footers)
             # This is an option
             current_options.append({
@@ -266,9 +241,7 @@ def finalize_question(q_id: int, question_text: str, supplementary: List[str],
     """Create a finalized question dictionary."""
     
     # Combine question text with supplementary paragraphs
-    full_question = question_text
-    if supplementary:
-        full_question += "\n" + "\n".join(supplementary)
+    full_question = "\n".join([question_text] + supplementary) if supplementary else question_text
     
     # Build options with labels
     option_labels = ['A', 'B', 'C', 'D']
@@ -284,7 +257,9 @@ def finalize_question(q_id: int, question_text: str, supplementary: List[str],
         })
     
     # Check flags
-    q_needs_image = check_needs_image(full_question)
+    # Lowercase once for both the image marker and the type checks
+    full_question_lower = full_question.lower()
+    q_needs_image = check_needs_image(full_question, full_question_lower)
     flags = []
     if q_needs_image:
         flags.append('needs_image')
@@ -295,7 +270,7 @@ def finalize_question(q_id: int, question_text: str, supplementary: List[str],
         'id': q_id,
         'english_text': full_question,
         'hindi_text': '',
-        'question_type': detect_question_type(full_question),
+        'question_type': detect_question_type(full_question, full_question_lower),
         'options': formatted_options,
         'answer': '',
         'solution_english': '',
@@ -319,8 +294,8 @@ def parse_document(file_path: str, job_id: str, upload_dir: str) -> List[Dict]:
         print(f"NumId-based parsing failed: {e}, falling back to mammoth parser")
     
     # Fall back to original mammoth-based parser
-    from . import smart_parser
-    return smart_parser.parse_docx_smart(file_path, job_id, upload_dir)
+    from .smart_parser import parse_docx_smart
+    return parse_docx_smart(file_path, job_id, upload_dir)
 
 
 # Test
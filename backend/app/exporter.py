@@ -2,39 +2,357 @@
 Exporter Module - Generates final DOCX in the required format.
 """
 import os
-from typing import List
+import re
+from copy import deepcopy
+from io import BytesIO
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+from xml.sax.saxutils import escape
 from docx import Document
-from docx.shared import Pt, Inches, Cm
+from docx.shared import Pt, Inches, Cm, Emu
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.style import WD_STYLE_TYPE
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
-from bs4 import BeautifulSoup
+from docx.oxml.ns import qn, nsdecls
+from docx.oxml import OxmlElement, parse_xml
+import lxml.html
+from lxml import etree
 
 from .models import Question, TableData, ImageData, TableRenderMode
 
 
+# Run properties for SimpleExporter paragraphs: Arial 11pt, plus the
+# complex-script (Devanagari) font for runs containing Hindi
+_ARIAL_RPR = '<w:rPr><w:rFonts w:ascii="Arial" w:hAnsi="Arial"/><w:sz w:val="22"/></w:rPr>'
+_ARIAL_HINDI_RPR = ('<w:rPr><w:rFonts w:ascii="Arial" w:hAnsi="Arial" w:cs="Noto Sans Devanagari"/>'
+                    '<w:sz w:val="22"/></w:rPr>')
+_BLANK_PARAGRAPH = '<w:p/>'
+
+# Single-run paragraph templates, keyed by "contains Hindi"
+_PARAGRAPH_TEMPLATES = {
+    False: '<w:p><w:r>' + _ARIAL_RPR + '{}</w:r></w:p>',
+    True: '<w:p><w:r>' + _ARIAL_HINDI_RPR + '{}</w:r></w:p>',
+}
+
+# Tabs and line breaks become their own run elements
+_RUN_BREAKS_RE = re.compile(r'([\t\r\n])')
+
+
+def _run_content_xml(text: str) -> str:
+    """
+    Serialize run content as python-docx's run.text setter would produce it:
+    tabs become <w:tab/>, newlines <w:br/>, and text with leading/trailing
+    whitespace keeps xml:space="preserve".
+    """
+    if '\t' not in text and '\n' not in text and '\r' not in text:
+        # Common case: a single <w:t>
+        if not text:
+            return ''
+        if text.strip() != text:
+            return f'<w:t xml:space="preserve">{escape(text)}</w:t>'
+        return f'<w:t>{escape(text)}</w:t>'
+    
+    content = []
+    for piece in _RUN_BREAKS_RE.split(text):
+        if piece == '\t':
+            content.append('<w:tab/>')
+        elif piece in ('\r', '\n'):
+            content.append('<w:br/>')
+        elif piece:
+            if piece.strip() != piece:
+                content.append(f'<w:t xml:space="preserve">{escape(piece)}</w:t>')
+            else:
+                content.append(f'<w:t>{escape(piece)}</w:t>')
+    return ''.join(content)
+
+
+def _paragraph_xml(text: str, hindi: bool = False) -> str:
+    """Serialize a single-run paragraph as add_paragraph().add_run(text) would."""
+    return _PARAGRAPH_TEMPLATES[hindi].format(_run_content_xml(text))
+
+
+def _lines_paragraph_xml(lines: List[Tuple[str, bool]]) -> str:
+    """
+    Serialize (text, hindi) lines as one paragraph: a run per line, each
+    followed by a line break except the last.
+    """
+    runs = []
+    last = len(lines) - 1
+    for i, (text, hindi) in enumerate(lines):
+        rpr = _ARIAL_HINDI_RPR if hindi else _ARIAL_RPR
+        br = '<w:br/>' if i < last else ''
+        runs.append(f'<w:r>{rpr}{_run_content_xml(text)}{br}</w:r>')
+    return f'<w:p>{"".join(runs)}</w:p>'
+
+
+def _flush_paragraphs(doc: Document, parts: List[str]):
+    """
+    Parse the pending paragraph XML in one go and append it to the document
+    body (ahead of the final section properties), then clear parts.
+    """
+    if not parts:
+        return
+    fragment = parse_xml(f'<w:body {nsdecls("w")}>{"".join(parts)}</w:body>')
+    body = doc.element.body
+    end = len(body) - 1 if body.sectPr is not None else len(body)
+    body[end:end] = list(fragment)
+    parts.clear()
+
+
+# Table properties as python-docx's add_table writes them; {style} is the
+# tblStyle element for the table style
+_TBL_PR = ('<w:tblPr>{style}<w:tblW w:type="auto" w:w="0"/>'
+           '<w:tblLook w:firstColumn="1" w:firstRow="1" w:lastColumn="0" w:lastRow="0"'
+           ' w:noHBand="0" w:noVBand="1" w:val="04A0"/></w:tblPr>')
+
+
+# Compiled XPath lookups for reading HTML tables
+_TABLE_ROWS = etree.XPath('.//tr')
+_ROW_CELLS = etree.XPath('.//td|.//th')
+
+# Fast path for plain tables: attribute-free tags only
+_SIMPLE_TAG_RE = re.compile(r'<(/?)([a-z][a-z0-9]*)(/?)>')
+# Entities, comments, stray markup and control characters need the real parser
+_NOT_SIMPLE_RE = re.compile(r'[&<>\x00-\x08\x0b-\x1f]')
+_ROW_GROUP_TAGS = frozenset(('thead', 'tbody', 'tfoot'))
+_CELL_INLINE_TAGS = frozenset(('span', 'strong', 'b', 'em', 'i', 'u', 'sub', 'sup'))
+
+
+def _simple_table_cells(html: str) -> Optional[Tuple[Tuple[Tuple[str, bool], ...], ...]]:
+    """
+    Read a plain table - one <table> of rows and cells, attribute-free inline
+    markup inside cells, no entities - with a tag scan instead of a parse.
+    Returns the same rows as _html_table_cells, or None if html is not plain.
+    """
+    stack = []
+    rows = []
+    cells = None
+    cell_text = None
+    cell_bold = False
+    seen_table = False
+    pos = 0
+    
+    for match in _SIMPLE_TAG_RE.finditer(html):
+        text = html[pos:match.start()]
+        pos = match.end()
+        if _NOT_SIMPLE_RE.search(text):
+            return None
+        if cell_text is not None:
+            text = text.strip()
+            if text:
+                cell_text.append(text)
+        elif stack and not text.isspace() and text:
+            # Text between table rows/cells
+            return None
+        
+        closing, tag, self_closing = match.groups()
+        parent = stack[-1] if stack else None
+        
+        if closing:
+            if tag != parent or self_closing:
+                return None
+            stack.pop()
+            if tag == 'tr':
+                rows.append(tuple(cells))
+                cells = None
+            elif tag in ('td', 'th'):
+                cells.append((' '.join(cell_text), cell_bold))
+                cell_text = None
+            continue
+        
+        if tag == 'br' and cell_text is not None:
+            # Only splits the cell text
+            continue
+        if self_closing:
+            return None
+        
+        if tag == 'table':
+            if seen_table or stack:
+                return None
+            seen_table = True
+        elif tag in _ROW_GROUP_TAGS:
+            if parent != 'table':
+                return None
+        elif tag == 'tr':
+            if parent != 'table' and parent not in _ROW_GROUP_TAGS:
+                return None
+            cells = []
+        elif tag in ('td', 'th'):
+            if parent != 'tr':
+                return None
+            cell_text = []
+            cell_bold = tag == 'th'
+        elif tag == 'p':
+            # The HTML parser restructures paragraphs anywhere but directly in a cell
+            if parent not in ('td', 'th'):
+                return None
+        elif tag in _CELL_INLINE_TAGS and cell_text is not None:
+            if tag == 'strong':
+                cell_bold = True
+        else:
+            return None
+        stack.append(tag)
+    
+    if stack or not seen_table or _NOT_SIMPLE_RE.search(html, pos):
+        return None
+    return tuple(rows)
+
+
+@lru_cache(maxsize=512)
+def _html_table_cells(html: str) -> Tuple[Tuple[Tuple[str, bool], ...], ...]:
+    """
+    Read the first <table> in html as rows of (cell text, bold) pairs.
+    Header cells and cells containing <strong> are bold.
+    Returns an empty tuple when there is no table.
+    
+    Cached by HTML, so re-exporting a job (or repeating a table) skips parsing;
+    the result is immutable because it is shared between callers.
+    """
+    simple = _simple_table_cells(html)
+    if simple is not None:
+        return simple
+    
+    root = lxml.html.fragment_fromstring(html, create_parent='div')
+    html_table = next(root.iter('table'), None)
+    if html_table is None:
+        return ()
+    
+    rows = []
+    for row in _TABLE_ROWS(html_table):
+        cells = []
+        for cell in _ROW_CELLS(row):
+            # Stripped text pieces joined by single spaces
+            text = ' '.join(piece for piece in (s.strip() for s in cell.itertext()) if piece)
+            cells.append((text, cell.tag == 'th' or cell.find('.//strong') is not None))
+        rows.append(tuple(cells))
+    return tuple(rows)
+
+
+@lru_cache(maxsize=None)
+def _rpr_template(font_name: str, cs_font: Optional[str] = None):
+    """
+    Prebuilt <w:rPr> for an 11pt run in font_name, with cs_font as the
+    complex-script (Devanagari) font when given. Deep-copy before use.
+    """
+    fonts = {qn('w:ascii'): font_name, qn('w:hAnsi'): font_name}
+    if cs_font:
+        fonts[qn('w:cs')] = cs_font
+    rPr = OxmlElement('w:rPr')
+    rPr.append(OxmlElement('w:rFonts', fonts))
+    rPr.append(OxmlElement('w:sz', {qn('w:val'): '22'}))
+    return rPr
+
+
+def _set_run_font(run, font_name: str, cs_font: Optional[str] = None):
+    """Give a freshly added run its font properties from the cached template."""
+    run._r.insert(0, deepcopy(_rpr_template(font_name, cs_font)))
+
+
+def _file_exists(path: str, known_paths: Set[str]) -> bool:
+    """Check a file, stat-ing it only if it isn't already in known_paths."""
+    if path in known_paths:
+        return True
+    if os.path.exists(path):
+        known_paths.add(path)
+        return True
+    return False
+
+
+def _add_picture(doc: Document, path: str, width: int, pictures: Dict[Tuple[str, int], object]):
+    """
+    doc.add_picture(path, width), reusing the drawing of an earlier picture
+    of the same file and width from pictures (per document). A repeat only
+    needs a new shape id - the image part, relationship and scaled size are
+    the same - so the file isn't read, hashed and measured again.
+    """
+    key = (path, width)
+    inline = pictures.get(key)
+    if inline is None:
+        pictures[key] = doc.add_picture(path, width=width)._inline
+        return
+    
+    inline = deepcopy(inline)
+    shape_id = doc.part.next_id
+    inline.docPr.id = shape_id
+    inline.docPr.name = f"Picture {shape_id}"
+    doc.add_paragraph().add_run()._r.add_drawing(inline)
+
+
+def _append_table(doc: Document, rows: Tuple[Tuple[Tuple[str, bool], ...], ...],
+                  style_id: Optional[str]):
+    """
+    Append rows of (cell text, bold) pairs to doc as a table in style_id
+    (the document's 'Table Grid' style).
+    The whole w:tbl is written as one XML string (grid, cell widths and cell
+    runs included), parsed once and inserted, instead of creating empty cells
+    and then replacing their content through the Table/_Cell proxies.
+    """
+    max_cols = max(len(cells) for cells in rows)
+    if max_cols == 0:
+        return
+    
+    # Width split evenly between columns, as add_table does
+    col_twips = Emu(doc._block_width // max_cols).twips
+    tc_pr = f'<w:tcPr><w:tcW w:type="dxa" w:w="{col_twips}"/></w:tcPr>'
+    empty_cell = f'<w:tc>{tc_pr}<w:p/></w:tc>'
+    
+    style = f'<w:tblStyle w:val="{escape(style_id)}"/>' if style_id else ''
+    
+    parts = [f'<w:tbl {nsdecls("w")}>', _TBL_PR.format(style=style), '<w:tblGrid>']
+    parts.append(f'<w:gridCol w:w="{col_twips}"/>' * max_cols)
+    parts.append('</w:tblGrid>')
+    for cells in rows:
+        parts.append('<w:tr>')
+        for text, bold in cells:
+            rpr = '<w:rPr><w:b/></w:rPr>' if bold else ''
+            parts.append(f'<w:tc>{tc_pr}<w:p><w:r>{rpr}{_run_content_xml(text)}</w:r></w:p></w:tc>')
+        # Short rows are padded with empty cells
+        parts.append(empty_cell * (max_cols - len(cells)))
+        parts.append('</w:tr>')
+    parts.append('</w:tbl>')
+    
+    doc.element.body._insert_tbl(parse_xml(''.join(parts)))
+
+
 class DOCXExporter:
     """
     Exports questions to DOCX in the strict required format.
     """
     
-    def __init__(self, output_dir: str = "/tmp/qs-formatter"):
+    # Styled blank document, saved once per process by _new_document, and the
+    # id of its 'Table Grid' style (the same for every document made from it)
+    _template_bytes: Optional[bytes] = None
+    _table_style_id: Optional[str] = None
+    
+    def __init__(self, output_dir: str = "/tmp/qs-formatter", known_paths: Optional[Set[str]] = None):
         self.output_dir = output_dir
+        # Image/table files already known to exist (e.g. ImageProcessor.known_paths)
+        self.known_paths = known_paths if known_paths is not None else set()
         os.makedirs(output_dir, exist_ok=True)
     
+    def _new_document(self) -> Document:
+        """Open a new document from the styled template, building it on first use."""
+        cls = type(self)
+        if cls._template_bytes is None:
+            doc = Document()
+            # Set up document styles
+            self._setup_styles(doc)
+            cls._table_style_id = doc.part.get_style_id('Table Grid', WD_STYLE_TYPE.TABLE)
+            buffer = BytesIO()
+            doc.save(buffer)
+            cls._template_bytes = buffer.getvalue()
+        return Document(BytesIO(cls._template_bytes))
+    
     def export(self, questions: List[Question], job_id: str) -> str:
         """
         Export questions to DOCX file.
         Returns the path to the exported file.
         """
-        doc = Document()
-        
-        # Set up document styles
-        self._setup_styles(doc)
+        doc = self._new_document()
         
+        # Pictures already placed, by (path, width)
+        pictures = {}
         for i, question in enumerate(questions):
-            self._add_question(doc, question)
+            self._add_question(doc, question, pictures)
             
             # Add two blank lines after each question (except the last)
             if i < len(questions) - 1:
@@ -61,31 +379,27 @@ class DOCXExporter:
         rFonts = rPr.get_or_add_rFonts()
         rFonts.set(qn('w:cs'), 'Noto Sans Devanagari')
     
-    def _add_question(self, doc: Document, question: Question):
+    def _add_question(self, doc: Document, question: Question, pictures: Dict):
         """Add a single question to the document."""
         # Q{n}. English question text?
         q_para = doc.add_paragraph()
         q_run = q_para.add_run(f"Q{question.id}. {question.english_text}")
-        q_run.font.name = 'Noto Sans'
-        q_run.font.size = Pt(11)
+        self._apply_font(q_run, 'Noto Sans')
         
         # Hindi question (indented with 4 spaces)
         if question.hindi_text:
             hi_para = doc.add_paragraph()
             hi_run = hi_para.add_run(f"    ({question.hindi_text})")
-            hi_run.font.name = 'Noto Sans Devanagari'
-            hi_run.font.size = Pt(11)
-            self._set_hindi_font(hi_run)
+            self._apply_font(hi_run, 'Noto Sans Devanagari', hindi=True)
         
         # Add tables if present (before Type line for questions with tables in content)
         for table_data in question.tables:
-            self._add_table(doc, table_data)
+            self._add_table(doc, table_data, pictures)
         
         # Type: line
         type_para = doc.add_paragraph()
         type_run = type_para.add_run(f"Type: {question.question_type.value}")
-        type_run.font.name = 'Noto Sans'
-        type_run.font.size = Pt(11)
+        self._apply_font(type_run, 'Noto Sans')
         
         # Options
         for option in question.options:
@@ -101,23 +415,19 @@ class DOCXExporter:
                 opt_text = f"({option.label}) {en_text}"
             
             opt_run = opt_para.add_run(opt_text)
-            opt_run.font.name = 'Noto Sans'
-            opt_run.font.size = Pt(11)
             
             # Apply Hindi font to the Hindi portion
-            if hi_text:
-                self._set_hindi_font(opt_run)
+            self._apply_font(opt_run, 'Noto Sans', hindi=bool(hi_text))
         
         # Add images if present
         for image_data in question.images:
-            self._add_image(doc, image_data)
+            self._add_image(doc, image_data, pictures)
         
         # Answer line (always show, even if empty)
         ans_para = doc.add_paragraph()
         ans_text = f"Ans. {question.answer}" if question.answer else "Ans."
         ans_run = ans_para.add_run(ans_text)
-        ans_run.font.name = 'Noto Sans'
-        ans_run.font.size = Pt(11)
+        self._apply_font(ans_run, 'Noto Sans')
         
         # Solution line (always show, even if empty)
         sol_para = doc.add_paragraph()
@@ -128,78 +438,39 @@ class DOCXExporter:
         else:
             sol_text = "Sol:"
         sol_run = sol_para.add_run(sol_text)
-        sol_run.font.name = 'Noto Sans'
-        sol_run.font.size = Pt(11)
-        if question.solution_hindi:
-            self._set_hindi_font(sol_run)
+        self._apply_font(sol_run, 'Noto Sans', hindi=bool(question.solution_hindi))
         
         # Grading line (always show, even if empty)
         grade_para = doc.add_paragraph()
         grade_text = f"Grading: {question.grading}" if question.grading else "Grading:"
         grade_run = grade_para.add_run(grade_text)
-        grade_run.font.name = 'Noto Sans'
-        grade_run.font.size = Pt(11)
+        self._apply_font(grade_run, 'Noto Sans')
     
-    def _set_hindi_font(self, run):
-        """Set Hindi/Devanagari font for a run."""
-        rPr = run._r.get_or_add_rPr()
-        rFonts = rPr.get_or_add_rFonts()
-        rFonts.set(qn('w:cs'), 'Noto Sans Devanagari')
+    def _apply_font(self, run, font_name: str, hindi: bool = False):
+        """Apply font (11pt) to a run, with the Hindi/Devanagari font if hindi."""
+        _set_run_font(run, font_name, 'Noto Sans Devanagari' if hindi else None)
     
-    def _add_table(self, doc: Document, table_data: TableData):
+    def _add_table(self, doc: Document, table_data: TableData, pictures: Dict):
         """Add a table to the document."""
         if table_data.render_mode == TableRenderMode.IMAGE and table_data.image_path:
             # Add as image
-            if os.path.exists(table_data.image_path):
-                doc.add_picture(table_data.image_path, width=Inches(5.5))
+            if _file_exists(table_data.image_path, self.known_paths):
+                _add_picture(doc, table_data.image_path, Inches(5.5), pictures)
         else:
             # Parse HTML table and recreate
             self._recreate_table_from_html(doc, table_data.html)
     
     def _recreate_table_from_html(self, doc: Document, html: str):
         """Recreate a table from HTML."""
-        soup = BeautifulSoup(html, 'lxml')
-        html_table = soup.find('table')
-        
-        if not html_table:
-            return
-        
-        rows = html_table.find_all('tr')
-        if not rows:
-            return
-        
-        # Determine table dimensions
-        max_cols = 0
-        for row in rows:
-            cells = row.find_all(['td', 'th'])
-            max_cols = max(max_cols, len(cells))
-        
-        if max_cols == 0:
-            return
-        
-        # Create table
-        table = doc.add_table(rows=len(rows), cols=max_cols)
-        table.style = 'Table Grid'
-        
-        # Populate table
-        for i, row in enumerate(rows):
-            cells = row.find_all(['td', 'th'])
-            for j, cell in enumerate(cells):
-                if j < max_cols:
-                    text = cell.get_text(' ', strip=True)
-                    table.rows[i].cells[j].text = text
-                    
-                    # Bold for header cells
-                    if cell.name == 'th' or cell.find('strong'):
-                        for paragraph in table.rows[i].cells[j].paragraphs:
-                            for run in paragraph.runs:
-                                run.bold = True
+        rows = _html_table_cells(html)
+        if rows:
+            _append_table(doc, rows, self._table_style_id)
     
-    def _add_image(self, doc: Document, image_data: ImageData):
+    def _add_image(self, doc: Document, image_data: ImageData, pictures: Dict):
         """Add an image to the document."""
-        if os.path.exists(image_data.path):
+        if _file_exists(image_data.path, self.known_paths):
             try:
-                doc.add_picture(image_data.path, width=Inches(4))
+                _add_picture(doc, image_data.path, Inches(4), pictures)
             except Exception as e:
                 # Log error but continue
                 print(f"Error adding image {image_data.path}: {e}")
@@ -222,80 +493,94 @@ class SimpleExporter:
     [blank line]
     """
     
-    def __init__(self, output_dir: str = "/tmp/qs-formatter"):
+    # Blank document with fonts and spacing set up, saved once per process,
+    # and the id of its 'Table Grid' style
+    _template_bytes: Optional[bytes] = None
+    _table_style_id: Optional[str] = None
+    
+    def __init__(self, output_dir: str = "/tmp/qs-formatter", known_paths: Optional[Set[str]] = None):
         self.output_dir = output_dir
+        # Image/table files already known to exist (e.g. ImageProcessor.known_paths)
+        self.known_paths = known_paths if known_paths is not None else set()
         os.makedirs(output_dir, exist_ok=True)
     
+    def _new_document(self) -> Document:
+        """Open a new document from the set-up template, building it on first use."""
+        cls = type(self)
+        if cls._template_bytes is None:
+            doc = Document()
+            # Setup fonts
+            self._setup_document(doc)
+            cls._table_style_id = doc.part.get_style_id('Table Grid', WD_STYLE_TYPE.TABLE)
+            buffer = BytesIO()
+            doc.save(buffer)
+            cls._template_bytes = buffer.getvalue()
+        return Document(BytesIO(cls._template_bytes))
+    
     def export(self, questions: List[Question], job_id: str) -> str:
         """Export questions to DOCX in strict format."""
-        doc = Document()
+        doc = self._new_document()
         
-        # Setup fonts
-        self._setup_document(doc)
-        
-        for i, q in enumerate(questions):
+        # Paragraphs are collected as XML and parsed in batches; tables and
+        # images still go through python-docx, so pending text is flushed first
+        parts = []
+        # Pictures already placed, by (path, width)
+        pictures = {}
+        english_option = _PARAGRAPH_TEMPLATES[False]
+        hindi_option = _PARAGRAPH_TEMPLATES[True]
+        for q in questions:
             # Q{n}. English text
-            p1 = doc.add_paragraph()
-            run1 = p1.add_run(f"Q{q.id}. {q.english_text}")
-            self._apply_font(run1)
+            parts.append(_paragraph_xml(f"Q{q.id}. {q.english_text}"))
             
             # (Hindi text) - indented
             if q.hindi_text:
-                p2 = doc.add_paragraph()
-                run2 = p2.add_run(f"    ({q.hindi_text})")
-                self._apply_font(run2, hindi=True)
+                parts.append(_paragraph_xml(f"    ({q.hindi_text})", hindi=True))
             
             # Tables (if any, add before Type)
-            for table in q.tables:
-                self._add_table(doc, table)
+            if q.tables:
+                _flush_paragraphs(doc, parts)
+                for table in q.tables:
+                    self._add_table(doc, table, pictures)
             
             # Type: multiple_choice
-            p3 = doc.add_paragraph()
-            run3 = p3.add_run(f"Type: {q.question_type.value}")
-            self._apply_font(run3)
+            parts.append(_paragraph_xml(f"Type: {q.question_type.value}"))
             
             # Options: (A) English (Hindi)
-            for opt in q.options:
-                p_opt = doc.add_paragraph()
-                
-                if opt.hindi_text:
-                    opt_text = f"({opt.label}) {opt.english_text} ({opt.hindi_text})"
-                else:
-                    opt_text = f"({opt.label}) {opt.english_text}"
-                
-                run_opt = p_opt.add_run(opt_text)
-                self._apply_font(run_opt, hindi=bool(opt.hindi_text))
+            parts.extend(
+                hindi_option.format(_run_content_xml(f"({opt.label}) {opt.english_text} ({opt.hindi_text})"))
+                if opt.hindi_text else
+                english_option.format(_run_content_xml(f"({opt.label}) {opt.english_text}"))
+                for opt in q.options
+            )
             
             # Images (if any)
-            for img in q.images:
-                self._add_image(doc, img)
+            if q.images:
+                _flush_paragraphs(doc, parts)
+                for img in q.images:
+                    self._add_image(doc, img, pictures)
             
-            # Answer line (always show)
-            p_ans = doc.add_paragraph()
+            # Answer, solution and grading lines (always show), as one
+            # paragraph with line breaks - paragraphs have no spacing, so
+            # this renders the same as three paragraphs
             ans_text = f"Ans. {q.answer}" if q.answer else "Ans."
-            run_ans = p_ans.add_run(ans_text)
-            self._apply_font(run_ans)
-            
-            # Solution line (always show)
-            p_sol = doc.add_paragraph()
             if q.solution_english or q.solution_hindi:
                 sol_text = f"Sol: {q.solution_english or ''}"
                 if q.solution_hindi:
                     sol_text += f"\n({q.solution_hindi})"
             else:
                 sol_text = "Sol:"
-            run_sol = p_sol.add_run(sol_text)
-            self._apply_font(run_sol, hindi=bool(q.solution_hindi))
-            
-            # Grading line (always show)
-            p_grade = doc.add_paragraph()
             grade_text = f"Grading: {q.grading}" if q.grading else "Grading:"
-            run_grade = p_grade.add_run(grade_text)
-            self._apply_font(run_grade)
+            parts.append(_lines_paragraph_xml([
+                (ans_text, False),
+                (sol_text, bool(q.solution_hindi)),
+                (grade_text, False),
+            ]))
             
             # Two blank lines after each question
-            doc.add_paragraph()
-            doc.add_paragraph()
+            parts.append(_BLANK_PARAGRAPH)
+            parts.append(_BLANK_PARAGRAPH)
+        
+        _flush_paragraphs(doc, parts)
         
         # Save
         output_dir = os.path.join(self.output_dir, job_id)
@@ -317,58 +602,22 @@ class SimpleExporter:
         style.paragraph_format.space_before = Pt(0)
         style.paragraph_format.line_spacing = 1.15
     
-    def _apply_font(self, run, hindi: bool = False):
-        """Apply font settings to a run."""
-        run.font.name = 'Arial'
-        run.font.size = Pt(11)
-        
-        if hindi:
-            # Set complex script font for Hindi
-            rPr = run._r.get_or_add_rPr()
-            rFonts = rPr.get_or_add_rFonts()
-            rFonts.set(qn('w:cs'), 'Noto Sans Devanagari')
-    
-    def _add_table(self, doc: Document, table_data: TableData):
+    def _add_table(self, doc: Document, table_data: TableData, pictures: Dict):
         """Add table to document."""
         if table_data.render_mode == TableRenderMode.IMAGE and table_data.image_path:
-            if os.path.exists(table_data.image_path):
-                doc.add_picture(table_data.image_path, width=Inches(5.5))
+            if _file_exists(table_data.image_path, self.known_paths):
+                _add_picture(doc, table_data.image_path, Inches(5.5), pictures)
             return
         
         # Parse and recreate table
-        soup = BeautifulSoup(table_data.html, 'lxml')
-        html_table = soup.find('table')
-        
-        if not html_table:
-            return
-        
-        rows = html_table.find_all('tr')
-        if not rows:
-            return
-        
-        max_cols = max(len(row.find_all(['td', 'th'])) for row in rows)
-        if max_cols == 0:
-            return
-        
-        table = doc.add_table(rows=len(rows), cols=max_cols)
-        table.style = 'Table Grid'
-        
-        for i, row in enumerate(rows):
-            cells = row.find_all(['td', 'th'])
-            for j, cell in enumerate(cells):
-                if j < max_cols:
-                    text = cell.get_text(' ', strip=True)
-                    table.rows[i].cells[j].text = text
-                    
-                    if cell.name == 'th' or cell.find('strong'):
-                        for para in table.rows[i].cells[j].paragraphs:
-                            for run in para.runs:
-                                run.bold = True
+        rows = _html_table_cells(table_data.html)
+        if rows:
+            _append_table(doc, rows, self._table_style_id)
     
-    def _add_image(self, doc: Document, image_data: ImageData):
+    def _add_image(self, doc: Document, image_data: ImageData, pictures: Dict):
         """Add image to document."""
-        if os.path.exists(image_data.path):
+        if _file_exists(image_data.path, self.known_paths):
             try:
-                doc.add_picture(image_data.path, width=Inches(4))
+                _add_picture(doc, image_data.path, Inches(4), pictures)
             except Exception as e:
                 print(f"Error adding image: {e}")
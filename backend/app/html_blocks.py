@@ -0,0 +1,73 @@
+"""
+HTML Blocks Module - lxml helpers for walking the HTML mammoth produces.
+"""
+from typing import Iterator, Optional, Tuple
+import lxml.html
+from lxml import etree
+from lxml.html import HtmlElement
+
+
+HEADING_TAGS = frozenset(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
+LIST_TAGS = frozenset(['ol', 'ul'])
+
+# Compiled XPath lookups for table complexity checks
+_SPANS_OR_NESTED_TABLES = etree.XPath('boolean(.//*[@colspan or @rowspan] | .//table)')
+_ROW_CELLS = etree.XPath('.//td|.//th')
+
+
+def parse_body(html: str) -> HtmlElement:
+    """
+    Parse HTML (with libxml2, the parser bs4's 'lxml' mode uses) and return
+    the element holding its top-level blocks.
+    """
+    if not html.strip():
+        html = '<body></body>'
+    root = lxml.html.document_fromstring(html)
+    body = root.find('body')
+    return body if body is not None else root
+
+
+def element_text(elem: HtmlElement) -> str:
+    """Stripped text pieces of an element joined by single spaces (bs4's get_text(' ', strip=True))."""
+    return ' '.join(filter(None, map(str.strip, elem.itertext())))
+
+
+def element_html(elem: HtmlElement) -> str:
+    """Serialize an element without its trailing text."""
+    return lxml.html.tostring(elem, encoding='unicode', with_tail=False)
+
+
+def iter_blocks(body: HtmlElement) -> Iterator[Tuple[str, HtmlElement, Optional[str]]]:
+    """
+    Stream the top-level blocks of a body as (kind, element, text), where kind
+    is 'list', 'table', 'p' or 'heading'. Lists have no text of their own (their
+    items are read by the caller); paragraphs and headings without text are
+    skipped. Everything else at the top level is ignored.
+    """
+    for elem in body:
+        tag = elem.tag
+        if tag in LIST_TAGS:
+            yield 'list', elem, None
+        elif tag == 'table':
+            yield 'table', elem, element_text(elem)
+        elif tag == 'p' or tag in HEADING_TAGS:
+            text = element_text(elem)
+            if text:
+                yield ('p' if tag == 'p' else 'heading'), elem, text
+
+
+def is_complex_table(table: HtmlElement) -> bool:
+    """Check if a table is complex (merged cells, nested tables, irregular rows)."""
+    if _SPANS_OR_NESTED_TABLES(table):
+        return True
+
+    # Irregular row lengths, stopping at the first mismatch
+    first_count = None
+    for row in table.iter('tr'):
+        count = len(_ROW_CELLS(row))
+        if first_count is None:
+            first_count = count
+        elif count != first_count:
+            return True
+
+    return False
@@ -0,0 +1,107 @@
+"""
+Job Store Module - Size-capped in-memory job cache with on-disk spill.
+"""
+import os
+from collections import OrderedDict
+from typing import Dict, Iterator
+
+from .models import Job
+
+
+# Fields of a job listed by summaries(); spilled jobs keep them in memory
+_SUMMARY_FIELDS = ("id", "status", "english_count", "hindi_count", "created_at")
+
+
+def _job_summary(job: Job) -> dict:
+    """The listing fields of a job."""
+    return {field: getattr(job, field) for field in _SUMMARY_FIELDS}
+
+
+class JobStore:
+    """
+    Dict-like store for jobs.
+
+    At most max_jobs jobs are kept in memory, in least-recently-used order.
+    Evicted jobs are written to {base_dir}/{job_id}/job.json and loaded back
+    lazily the next time they are looked up. A small summary of each spilled
+    job stays in memory, so listing jobs needs no disk reads.
+    """
+
+    def __init__(self, base_dir: str, max_jobs: int = 200):
+        self.base_dir = base_dir
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        # Spilled job id -> _job_summary()
+        self._spilled: Dict[str, dict] = {}
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.base_dir, job_id, "job.json")
+
+    def _spill(self, job: Job):
+        """Write an evicted job to its job directory."""
+        path = self._path(job.id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(job.model_dump_json())
+        self._spilled[job.id] = _job_summary(job)
+
+    def _load(self, job_id: str) -> Job:
+        """Read a spilled job back from disk."""
+        with open(self._path(job_id), "r", encoding="utf-8") as f:
+            return Job.model_validate_json(f.read())
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._jobs or job_id in self._spilled
+
+    def __getitem__(self, job_id: str) -> Job:
+        job = self._jobs.get(job_id)
+        if job is not None:
+            self._jobs.move_to_end(job_id)
+            return job
+
+        if job_id not in self._spilled:
+            raise KeyError(job_id)
+
+        # Bring the spilled job back into memory
+        job = self._load(job_id)
+        del self._spilled[job_id]
+        self[job_id] = job
+        return job
+
+    def __setitem__(self, job_id: str, job: Job):
+        self._jobs[job_id] = job
+        self._jobs.move_to_end(job_id)
+        self._spilled.pop(job_id, None)
+
+        while len(self._jobs) > self.max_jobs:
+            _, evicted = self._jobs.popitem(last=False)
+            self._spill(evicted)
+
+    def __delitem__(self, job_id: str):
+        if job_id in self._jobs:
+            del self._jobs[job_id]
+        elif job_id in self._spilled:
+            del self._spilled[job_id]
+            path = self._path(job_id)
+            if os.path.exists(path):
+                os.remove(path)
+        else:
+            raise KeyError(job_id)
+
+    def __len__(self) -> int:
+        return len(self._jobs) + len(self._spilled)
+
+    def values(self) -> Iterator[Job]:
+        """
+        Iterate over all jobs; spilled jobs are read without caching them.
+        This reads every spilled job from disk: use summaries() for listings.
+        """
+        yield from list(self._jobs.values())
+        for job_id in list(self._spilled):
+            yield self._load(job_id)
+
+    def summaries(self) -> Iterator[dict]:
+        """Iterate over the _job_summary() of every job, without any disk reads."""
+        for job in list(self._jobs.values()):
+            yield _job_summary(job)
+        yield from list(self._spilled.values())
@@ -4,15 +4,21 @@ Main FastAPI Application for QS-Formatter.
 import os
 import uuid
 import json
+import time
 import shutil
-from datetime import datetime
-from typing import Optional
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Optional, Type, TypeVar
 from pathlib import Path
 
-from fastapi import FastAPI, UploadFile, File, HTTPException, BackgroundTasks
+from fastapi import FastAPI, UploadFile, File, HTTPException, BackgroundTasks, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
+from pydantic import BaseModel, ValidationError
 
 from .models import (
     Job, JobStatus, Question, UploadResponse, PreviewResponse,
@@ -22,25 +28,42 @@ from .docx_parser import parse_document
 from .aligner import QuestionAligner
 from .exporter import SimpleExporter
 from .assets import ImageProcessor, TableProcessor
+from .job_store import JobStore
 
 # Configuration
 UPLOAD_DIR = os.environ.get("UPLOAD_DIR", "/tmp/qs-formatter")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-# In-memory job storage (in production, use Redis or database)
-jobs: dict[str, Job] = {}
+# Job storage: most recently used jobs in memory, older ones spilled to
+# {UPLOAD_DIR}/{job_id}/job.json (in production, use Redis or database)
+MAX_JOBS_IN_MEMORY = int(os.environ.get("MAX_JOBS_IN_MEMORY", "200"))
+jobs = JobStore(UPLOAD_DIR, MAX_JOBS_IN_MEMORY)
 
 # Initialize components
 aligner = QuestionAligner()
-exporter = SimpleExporter(UPLOAD_DIR)
 image_processor = ImageProcessor(UPLOAD_DIR)
 table_processor = TableProcessor(UPLOAD_DIR)
+exporter = SimpleExporter(UPLOAD_DIR, known_paths=image_processor.known_paths)
+
+# Document parsing runs in worker processes so it doesn't stall the event
+# loop (and the two uploaded files parse in parallel)
+worker_pool = ProcessPoolExecutor(max_workers=min(4, os.cpu_count() or 1))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Stop the table-rendering browser and the parsing workers on shutdown."""
+    yield
+    await table_processor.close()
+    worker_pool.shutdown(wait=False, cancel_futures=True)
+
 
 # Create FastAPI app
 app = FastAPI(
     title="QS-Formatter API",
     description="API for formatting bilingual MCQ documents",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS configuration - Allow all origins for Codespaces compatibility
@@ -54,6 +77,61 @@ app.add_middleware(
 )
 
 
+async def save_upload(upload: UploadFile, path: str, chunk_size: int = 1 << 20):
+    """Write an uploaded file to disk in chunks, so only one chunk is held in memory."""
+    with open(path, "wb") as f:
+        while chunk := await upload.read(chunk_size):
+            f.write(chunk)
+
+
+# (second, ISO string) of the last timestamp handed out
+_last_timestamp = (0, "")
+
+
+def utc_now_iso() -> str:
+    """Current UTC time as an ISO string, to the second; formatted once per second."""
+    global _last_timestamp
+    second = int(time.time())
+    if second != _last_timestamp[0]:
+        # Formatted without a +00:00 suffix, like existing job timestamps
+        utc = datetime.fromtimestamp(second, timezone.utc).replace(tzinfo=None)
+        _last_timestamp = (second, utc.isoformat())
+    return _last_timestamp[1]
+
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def json_body_schema(model: Type[BaseModel]) -> dict:
+    """
+    OpenAPI requestBody for endpoints that read their body with parse_json_body.
+    Nested models are referenced from the components already in the schema.
+    """
+    schema = model.model_json_schema(ref_template="#/components/schemas/{model}")
+    schema.pop("$defs", None)
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": schema}},
+        }
+    }
+
+
+async def parse_json_body(request: Request, model: Type[ModelT]) -> ModelT:
+    """
+    Validate the raw request body against model in one pass.
+    pydantic-core parses the JSON bytes directly, skipping the intermediate
+    dict FastAPI would build with json.loads for a large List[Question].
+    """
+    try:
+        return model.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError([
+            {**error, "loc": ("body", *error["loc"])}
+            for error in e.errors(include_url=False)
+        ])
+
+
 def get_job(job_id: str) -> Job:
     """Get job by ID or raise 404."""
     if job_id not in jobs:
@@ -93,16 +171,11 @@ async def upload_files(
     en_path = os.path.join(job_dir, "english.docx")
     hi_path = os.path.join(job_dir, "hindi.docx")
     
-    with open(en_path, "wb") as f:
-        content = await english_file.read()
-        f.write(content)
-    
-    with open(hi_path, "wb") as f:
-        content = await hindi_file.read()
-        f.write(content)
+    await save_upload(english_file, en_path)
+    await save_upload(hindi_file, hi_path)
     
     # Create job record
-    now = datetime.utcnow().isoformat()
+    now = utc_now_iso()
     job = Job(
         id=job_id,
         status=JobStatus.PROCESSING,
@@ -115,7 +188,7 @@ async def upload_files(
     
     # Process files
     try:
-        process_job(job_id)
+        await process_job(job_id)
     except Exception as e:
         job.status = JobStatus.FAILED
         job.error = str(e)
@@ -127,16 +200,17 @@ async def upload_files(
     )
 
 
-def process_job(job_id: str):
+async def process_job(job_id: str):
     """Process uploaded files and extract questions."""
     job = jobs[job_id]
     
     try:
-        # Parse English file using robust parser
-        en_questions = parse_document(job.english_file, job_id, UPLOAD_DIR)
-        
-        # Parse Hindi file
-        hi_questions = parse_document(job.hindi_file, job_id, UPLOAD_DIR)
+        # Parse the English and Hindi files in parallel worker processes
+        loop = asyncio.get_running_loop()
+        en_questions, hi_questions = await asyncio.gather(
+            loop.run_in_executor(worker_pool, parse_document, job.english_file, job_id, UPLOAD_DIR),
+            loop.run_in_executor(worker_pool, parse_document, job.hindi_file, job_id, UPLOAD_DIR),
+        )
         
         job.english_count = len(en_questions)
         job.hindi_count = len(hi_questions)
@@ -146,11 +220,15 @@ def process_job(job_id: str):
         
         job.questions = merged_questions
         job.status = JobStatus.READY
-        job.updated_at = datetime.utcnow().isoformat()
+        job.updated_at = utc_now_iso()
+        
+        # Re-store in case the job was evicted while the files were parsed
+        jobs[job_id] = job
         
     except Exception as e:
         job.status = JobStatus.FAILED
         job.error = str(e)
+        jobs[job_id] = job
         raise
 
 
@@ -161,7 +239,7 @@ async def get_preview(job_id: str):
     """
     job = get_job(job_id)
     
-    return PreviewResponse(
+    preview = PreviewResponse(
         job_id=job_id,
         status=job.status,
         questions=job.questions,
@@ -169,6 +247,9 @@ async def get_preview(job_id: str):
         hindi_count=job.hindi_count,
         error=job.error
     )
+    
+    # Serialize the full question list straight to JSON bytes in pydantic-core
+    return Response(content=preview.model_dump_json(), media_type="application/json")
 
 
 @app.put("/jobs/{job_id}/questions/{question_id}")
@@ -179,49 +260,45 @@ async def update_question(job_id: str, question_id: int, update: QuestionUpdate)
     job = get_job(job_id)
     
     # Find question
-    for i, q in enumerate(job.questions):
-        if q.id == question_id:
-            # Update fields
-            if update.english_text is not None:
-                job.questions[i].english_text = update.english_text
-            if update.hindi_text is not None:
-                job.questions[i].hindi_text = update.hindi_text
-            if update.question_type is not None:
-                job.questions[i].question_type = update.question_type
-            if update.options is not None:
-                job.questions[i].options = update.options
-            if update.answer is not None:
-                job.questions[i].answer = update.answer
-            if update.solution_english is not None:
-                job.questions[i].solution_english = update.solution_english
-            if update.solution_hindi is not None:
-                job.questions[i].solution_hindi = update.solution_hindi
-            if update.grading is not None:
-                job.questions[i].grading = update.grading
-            
-            job.updated_at = datetime.utcnow().isoformat()
-            return {"status": "updated", "question_id": question_id}
-    
-    raise HTTPException(status_code=404, detail=f"Question {question_id} not found")
-
-
-@app.post("/jobs/{job_id}/finalize", response_model=ExportResponse)
-async def finalize_job(job_id: str, request: FinalizeRequest):
+    question = job.find_question(question_id)
+    if question is None:
+        raise HTTPException(status_code=404, detail=f"Question {question_id} not found")
+    
+    # Update provided fields (already validated as part of QuestionUpdate)
+    for field, value in update:
+        if value is not None:
+            setattr(question, field, value)
+    
+    job.updated_at = utc_now_iso()
+    return {"status": "updated", "question_id": question_id}
+
+
+@app.post(
+    "/jobs/{job_id}/finalize",
+    response_model=ExportResponse,
+    openapi_extra=json_body_schema(FinalizeRequest),
+)
+async def finalize_job(job_id: str, raw_request: Request):
     """
     Finalize and export the document.
     """
+    request = await parse_json_body(raw_request, FinalizeRequest)
     job = get_job(job_id)
     
     # Update questions from request
     job.questions = request.questions
     
     try:
-        # Export to DOCX
-        output_path = exporter.export(job.questions, job_id)
+        # Export to DOCX in a worker thread. A thread shares the exporter and
+        # its known_paths set, which a worker process would get a copy of
+        output_path = await asyncio.to_thread(exporter.export, job.questions, job_id)
         
         job.output_file = output_path
         job.status = JobStatus.EXPORTED
-        job.updated_at = datetime.utcnow().isoformat()
+        job.updated_at = utc_now_iso()
+        
+        # Re-store in case the job was evicted while the export ran
+        jobs[job_id] = job
         
         filename = os.path.basename(output_path)
         
@@ -234,6 +311,7 @@ async def finalize_job(job_id: str, request: FinalizeRequest):
     except Exception as e:
         job.status = JobStatus.FAILED
         job.error = str(e)
+        jobs[job_id] = job
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -265,7 +343,7 @@ async def get_image(job_id: str, image_id: str):
     for q in job.questions:
         for img in q.images:
             if img.id == image_id:
-                if os.path.exists(img.path):
+                if image_processor.exists(img.path):
                     return FileResponse(img.path, media_type=img.content_type)
     
     raise HTTPException(status_code=404, detail="Image not found")
@@ -300,9 +378,8 @@ async def upload_image(job_id: str, file: UploadFile = File(...)):
     file_path = os.path.join(images_dir, filename)
     
     # Save file
-    with open(file_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
+    await save_upload(file, file_path)
+    image_processor.known_paths.add(file_path)
     
     # Return image data
     return {
@@ -325,6 +402,7 @@ async def delete_job(job_id: str):
     job_dir = os.path.join(UPLOAD_DIR, job_id)
     if os.path.exists(job_dir):
         shutil.rmtree(job_dir)
+    image_processor.forget_job(job_id)
     
     # Remove from memory
     del jobs[job_id]
@@ -337,18 +415,7 @@ async def list_jobs():
     """
     List all jobs.
     """
-    return {
-        "jobs": [
-            {
-                "id": j.id,
-                "status": j.status,
-                "english_count": j.english_count,
-                "hindi_count": j.hindi_count,
-                "created_at": j.created_at
-            }
-            for j in jobs.values()
-        ]
-    }
+    return {"jobs": list(jobs.summaries())}
 
 
 # Demo endpoint using test files
@@ -375,7 +442,7 @@ async def demo_parse():
     shutil.copy(en_file, en_path)
     shutil.copy(hi_file, hi_path)
     
-    now = datetime.utcnow().isoformat()
+    now = utc_now_iso()
     job = Job(
         id=job_id,
         status=JobStatus.PROCESSING,
@@ -387,7 +454,7 @@ async def demo_parse():
     jobs[job_id] = job
     
     # Process
-    process_job(job_id)
+    await process_job(job_id)
     
     return {
         "job_id": job_id,
@@ -2,7 +2,7 @@
 Pydantic models for the QS-Formatter API.
 """
 from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from enum import Enum
 
 
@@ -98,6 +98,27 @@ class Job(BaseModel):
     output_file: Optional[str] = None
     created_at: str = ""
     updated_at: str = ""
+    
+    # Question id -> position, built lazily for the current questions list
+    _question_index: Dict[int, int] = PrivateAttr(default_factory=dict)
+    _indexed_questions: Optional[List[Question]] = PrivateAttr(default=None)
+    
+    def find_question(self, question_id: int) -> Optional[Question]:
+        """Get the first question with the given id, or None."""
+        questions = self.questions
+        if self._indexed_questions is questions:
+            i = self._question_index.get(question_id)
+            if i is not None and i < len(questions) and questions[i].id == question_id:
+                return questions[i]
+        
+        # Questions were replaced or reordered since the index was built
+        index = {}
+        for i, q in enumerate(questions):
+            index.setdefault(q.id, i)
+        self._question_index = index
+        self._indexed_questions = questions
+        i = index.get(question_id)
+        return questions[i] if i is not None else None
 
 
 class UploadResponse(BaseModel):
@@ -0,0 +1,24 @@
+"""
+Parallel Module - Run independent parser calls in worker processes.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def map_in_processes(fn: Callable[..., T], *iterables: Iterable,
+                     max_workers: Optional[int] = None) -> List[T]:
+    """
+    Call fn with one argument from each iterable, like map(), returning results
+    in input order. With more than one call the calls run in worker processes,
+    so fn must be a module-level function; a single call runs in-process.
+    """
+    calls = list(zip(*iterables))
+    workers = min(len(calls), max_workers or os.cpu_count() or 1)
+    if workers < 2:
+        return [fn(*args) for args in calls]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(fn, *zip(*calls)))
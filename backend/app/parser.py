@@ -2,45 +2,193 @@
 DOCX Parser Module - Converts DOCX to HTML and extracts question blocks.
 """
 import re
-import uuid
+import secrets
 import os
+import shutil
 import base64
-from typing import List, Tuple, Optional, Dict, Any
+from functools import lru_cache
+from itertools import accumulate, repeat
+from typing import List, Tuple, Optional, Dict, Any, Union
 from io import BytesIO
 import mammoth
-from bs4 import BeautifulSoup, NavigableString
+import lxml.html
+from lxml import etree
+from lxml.html import HtmlElement
 from PIL import Image
 
 from .models import (
     Question, Option, TableData, ImageData, QuestionFlag, 
     QuestionType, TableRenderMode
 )
+from .parallel import map_in_processes
 
 
-class DOCXParser:
-    """Parser for DOCX files - extracts questions, options, tables, images."""
-    
-    # Patterns for question detection
-    QUESTION_PATTERNS = [
-        # Q1. or Q1) or Q.1 or Q 1
-        r'^\s*(?:Q\.?\s*)?(\d{1,3})[\.\)]\s*',
-        # 1. or 1) at start of line
-        r'^\s*(\d{1,3})[\.\)]\s+',
-        # Question 1: or Question 1.
-        r'^\s*(?:Question|प्रश्न)\s*(\d{1,3})[\.:]\s*',
+# Question number prefixes, matched in one scan
+_QUESTION_NUMBER_BRANCHES = (
+    # Q1. or Q1) or Q.1 or Q 1, and plain 1. or 1)
+    r'(?:Q\.?\s*)?(?P<num>\d{1,3})[\.\)]',
+    # Question 1: or Question 1.
+    r'(?:Question|प्रश्न)\s*(?P<word_num>\d{1,3})[\.:]',
+)
+_QUESTION_NUMBER_RE = re.compile(
+    '|'.join(r'^\s*' + branch for branch in _QUESTION_NUMBER_BRANCHES),
+    re.IGNORECASE
+)
+
+# The same question numbers at the start of any of several stripped block
+# texts joined by NUL. Parsed HTML text never contains NUL and \s does not
+# match it, so a match cannot run from one block into the next.
+_BLOCK_QUESTION_NUMBER_RE = re.compile(
+    r'(?:^|(?<=\0))(?:' + '|'.join(_QUESTION_NUMBER_BRANCHES) + ')',
+    re.IGNORECASE
+)
+
+# Option lines: (label, content) groups
+_OPTION_LETTER_RE = re.compile(r'^\s*[\(\[]?\s*([A-Da-d])\s*[\)\]\.]\s*(.+)$')
+_OPTION_NUMBER_RE = re.compile(r'^\s*([1-4])\s*[\)\]\.]\s*(.+)$')
+_OPTION_RE = re.compile(r'^\s*[\(\[]?\s*([A-Da-d1-4])\s*[\)\]\.]\s*(.+)$')
+_OPTION_START_RE = re.compile(r'^\s*[\(\[]?\s*[A-Da-d1-4]\s*[\)\]\.]\s*.+')
+
+# Position of each option label in normalized A, B, C, D order
+_OPTION_SLOTS = {'A': 0, 'B': 1, 'C': 2, 'D': 3, '1': 0, '2': 1, '3': 2, '4': 3}
+
+# Options written on one line: A. x B. y C. z D. w. Each label is followed by
+# a run of content without option letters or brackets, which must end at the
+# next label or at the end of the text.
+_INLINE_OPTION_LABEL_RE = re.compile(r'(?:[\(\[]\s*)?([A-Da-d])\s*[\)\]\.]')
+_INLINE_OPTION_CONTENT_RE = re.compile(r'[^A-Da-d\(\[\]\)]+')
+
+# Paragraph that opens a numbered question: (number, text) groups
+_NUMBERED_QUESTION_RE = re.compile(r'^\s*(?:Q\.?\s*)?(\d{1,3})[\.\)]\s*(.+)')
+
+# Question start heuristics for QuestionExtractor, fused into one alternation
+_QUESTION_START_RE = re.compile('|'.join(f'(?:{p})' for p in (
+    r'^(?:Q\.?\s*)?\d{1,3}[\.\)]\s*.+',
+    r'^(?:Question|प्रश्न)\s*\d+',
+    r'^.+\?$',  # Ends with question mark
+    r'^.+(?:consider|which|what|who|when|where|how|why|select|choose)',
+    # Common question indicators, anywhere in the text
+    r'consider the following|निम्नलिखित|which of the|select the correct'
+    r'|choose the|with reference to|के संदर्भ में',
+)), re.IGNORECASE)
+
+_BLANK_LINES_RE = re.compile(r'\n\s*\n')
+
+# Image placeholders written by parse_docx: __IMAGE__<id>__
+_IMAGE_MARKER_RE = re.compile(r'__IMAGE__([0-9a-f]+)__')
+
+# File extensions for embedded image content types; anything else is saved as png
+_EXT_MAP = {
+    'image/jpeg': 'jpg',
+    'image/jpg': 'jpg',
+    'image/gif': 'gif',
+}
+
+_LIST_TAGS = frozenset(['ol', 'ul'])
+
+# Compiled XPath lookups for table complexity checks
+_SPANS_OR_NESTED_TABLES = etree.XPath('boolean(.//*[@colspan or @rowspan] | .//table)')
+_ROW_CELLS = etree.XPath('.//td|.//th')
+
+# Table complexity by serialized table HTML; cleared when it grows past the cap
+_COMPLEX_TABLES: Dict[str, bool] = {}
+_COMPLEX_TABLES_MAX = 1024
+
+
+def _parse_html(html: str) -> HtmlElement:
+    """
+    Parse HTML into a document tree (libxml2, the parser bs4's 'lxml' mode uses).
+    mammoth returns str, which lxml hands to libxml2 as already decoded text, so
+    no encoding detection runs and encoding to bytes first would gain nothing.
+    """
+    if not html.strip():
+        html = '<body></body>'
+    return lxml.html.document_fromstring(html)
+
+
+@lru_cache(maxsize=8)
+def _parse_html_cached(html: str) -> HtmlElement:
+    """
+    _parse_html for callers that only read the tree.
+    Extracting from the same HTML again reuses its parsed document.
+    """
+    return _parse_html(html)
+
+
+def _body(root: HtmlElement) -> HtmlElement:
+    """The element holding the top-level blocks of a parsed document."""
+    body = root.find('body')
+    return body if body is not None else root
+
+
+def _element_text(elem: HtmlElement) -> str:
+    """Stripped text pieces of an element joined by single spaces (bs4's get_text(' ', strip=True))."""
+    return ' '.join(filter(None, map(str.strip, elem.itertext())))
+
+
+def _element_html(elem: HtmlElement) -> str:
+    """Serialize an element without its trailing text."""
+    return lxml.html.tostring(elem, encoding='unicode', with_tail=False)
+
+
+def _block_html(block: Dict[str, Any]) -> str:
+    """A block's HTML; element blocks are serialized on first use."""
+    html = block.get('html')
+    if html is None:
+        element = block.get('element')
+        html = block['html'] = _element_html(element) if element is not None else ''
+    return html
+
+
+def _block_image_ids(block: Dict[str, Any]) -> List[str]:
+    """Ids of the images a block references, read from its <img> sources."""
+    element = block.get('element')
+    if element is None:
+        return _IMAGE_MARKER_RE.findall(block.get('html', ''))
+    return [
+        img_id
+        for img in element.iter('img')
+        for img_id in _IMAGE_MARKER_RE.findall(img.get('src', ''))
     ]
+
+
+def _is_complex_table(table: HtmlElement, html: str) -> bool:
+    """
+    Determine if a table is complex (merged cells, nested tables, irregular rows).
+    html is the table's serialized HTML, which callers already hold; tables that
+    repeat across questions are only checked once.
+    """
+    is_complex = _COMPLEX_TABLES.get(html)
+    if is_complex is not None:
+        return is_complex
     
-    # Option patterns
-    OPTION_PATTERNS = [
-        # (A), (a), A), a), A., a.
-        r'^\s*[\(\[]?\s*([A-Da-d1-4])\s*[\)\]\.]\s*',
-        # Options inline: A. x B. y C. z D. w
-        r'([A-Da-d])\s*[\.\)]\s*([^A-D]+?)(?=\s*[A-D]\s*[\.\)]|$)',
-    ]
+    # Check for colspan/rowspan and nested tables in one query
+    is_complex = bool(_SPANS_OR_NESTED_TABLES(table))
+    
+    # Check for irregular row lengths, stopping at the first mismatch
+    if not is_complex:
+        first_count = None
+        for row in table.iter('tr'):
+            count = len(_ROW_CELLS(row))
+            if first_count is None:
+                first_count = count
+            elif count != first_count:
+                is_complex = True
+                break
+    
+    if len(_COMPLEX_TABLES) >= _COMPLEX_TABLES_MAX:
+        _COMPLEX_TABLES.clear()
+    _COMPLEX_TABLES[html] = is_complex
+    return is_complex
+
+
+class DOCXParser:
+    """Parser for DOCX files - extracts questions, options, tables, images."""
     
     def __init__(self, upload_dir: str = "/tmp/qs-formatter"):
         self.upload_dir = upload_dir
         os.makedirs(upload_dir, exist_ok=True)
+        self._created_dirs: set[str] = {upload_dir}
     
     def parse_docx(self, file_path: str, job_id: str) -> Tuple[str, List[Dict[str, Any]]]:
         """
@@ -49,36 +197,33 @@ class DOCXParser:
         """
         images = []
         image_dir = os.path.join(self.upload_dir, job_id, "images")
-        os.makedirs(image_dir, exist_ok=True)
+        if image_dir not in self._created_dirs:
+            os.makedirs(image_dir, exist_ok=True)
+            self._created_dirs.add(image_dir)
         
         def handle_image(image):
             """Custom image handler for mammoth."""
-            with image.open() as img_stream:
-                img_data = img_stream.read()
-                img_id = str(uuid.uuid4())[:8]
-                
-                # Determine extension
-                content_type = image.content_type
-                ext = "png"
-                if "jpeg" in content_type or "jpg" in content_type:
-                    ext = "jpg"
-                elif "gif" in content_type:
-                    ext = "gif"
-                
-                filename = f"img_{img_id}.{ext}"
-                filepath = os.path.join(image_dir, filename)
-                
-                with open(filepath, "wb") as f:
-                    f.write(img_data)
-                
-                images.append({
-                    "id": img_id,
-                    "filename": filename,
-                    "path": filepath,
-                    "content_type": content_type
-                })
-                
-                return {"src": f"__IMAGE__{img_id}__"}
+            img_id = secrets.token_hex(4)
+            
+            # Determine extension
+            content_type = image.content_type
+            ext = _EXT_MAP.get(content_type, "png")
+            
+            filename = f"img_{img_id}.{ext}"
+            filepath = os.path.join(image_dir, filename)
+            
+            # Stream to disk in 64 KiB chunks instead of holding the whole image
+            with image.open() as img_stream, open(filepath, "wb") as f:
+                shutil.copyfileobj(img_stream, f, 64 * 1024)
+            
+            images.append({
+                "id": img_id,
+                "filename": filename,
+                "path": filepath,
+                "content_type": content_type
+            })
+            
+            return {"src": f"__IMAGE__{img_id}__"}
         
         with open(file_path, "rb") as f:
             result = mammoth.convert_to_html(
@@ -92,39 +237,50 @@ class DOCXParser:
         """
         Normalize HTML: remove headers/footers, clean whitespace, etc.
         """
-        soup = BeautifulSoup(html, 'lxml')
-        
-        # Remove script and style elements
-        for tag in soup(['script', 'style', 'header', 'footer']):
-            tag.decompose()
+        root = self._normalize_tree(_parse_html(html))
         
         # Get text content and normalize whitespace
-        html_str = str(soup)
+        html_str = lxml.html.tostring(root, encoding='unicode')
         
         # Clean up excessive whitespace but preserve structure
-        html_str = re.sub(r'\n\s*\n', '\n', html_str)
+        html_str = _BLANK_LINES_RE.sub('\n', html_str)
         
         return html_str
     
-    def detect_questions(self, html: str) -> List[Dict[str, Any]]:
+    def _normalize_tree(self, root: HtmlElement) -> HtmlElement:
+        """Remove script, style, header and footer elements in place."""
+        for tag in list(root.iter('script', 'style', 'header', 'footer')):
+            tag.drop_tree()
+        return root
+    
+    def detect_questions(self, html: Union[str, HtmlElement]) -> List[Dict[str, Any]]:
         """
         Detect question boundaries in HTML and extract question blocks.
+        html may be an already parsed document tree.
         Returns list of question dictionaries.
         """
-        soup = BeautifulSoup(html, 'lxml')
+        root = _parse_html(html) if isinstance(html, str) else html
         questions = []
         current_question = None
         current_content = []
         
         # Flatten content into processable blocks
-        blocks = self._extract_blocks(soup)
+        blocks = self._extract_blocks(root)
+        texts = [block.get('text', '').strip() for block in blocks]
+        
+        # Find every question start in one scan over all block texts
+        block_index = {start: i for i, start in enumerate(accumulate(
+            (len(text) + 1 for text in texts), initial=0))}
+        question_numbers = {
+            block_index[match.start()]: int(match.group('num') or match.group('word_num'))
+            for match in _BLOCK_QUESTION_NUMBER_RE.finditer('\0'.join(texts))
+        }
         
-        for block in blocks:
-            text = block.get('text', '').strip()
-            html_content = block.get('html', '')
+        for i, block in enumerate(blocks):
+            text = texts[i]
             
             # Check if this starts a new question
-            q_num = self._extract_question_number(text)
+            q_num = question_numbers.get(i)
             
             if q_num is not None:
                 # Save previous question
@@ -136,7 +292,7 @@ class DOCXParser:
                 current_question = {
                     'number': q_num,
                     'raw_text': text,
-                    'raw_html': html_content
+                    'raw_html': _block_html(block)
                 }
                 current_content = [block]
             elif current_question is not None:
@@ -149,51 +305,58 @@ class DOCXParser:
         
         return questions
     
-    def _extract_blocks(self, soup: BeautifulSoup) -> List[Dict[str, Any]]:
-        """Extract text blocks from soup, preserving tables and images."""
+    def _extract_blocks(self, root: HtmlElement) -> List[Dict[str, Any]]:
+        """Extract text blocks from a parsed document, preserving tables and images."""
         blocks = []
         
-        for element in soup.body.children if soup.body else soup.children:
-            if isinstance(element, NavigableString):
-                text = str(element).strip()
+        def add_loose_text(text: Optional[str]):
+            # Bare text between top-level elements
+            if text:
+                text = text.strip()
                 if text:
                     blocks.append({'type': 'text', 'text': text, 'html': text})
-            elif element.name == 'table':
+        
+        body = _body(root)
+        add_loose_text(body.text)
+        
+        for element in body:
+            tag = element.tag
+            # Only tables are serialized here; other blocks keep their
+            # element and are serialized on demand by _block_html
+            if tag == 'table':
                 # Keep table as-is
                 blocks.append({
                     'type': 'table',
-                    'text': element.get_text(' ', strip=True),
-                    'html': str(element)
+                    'text': _element_text(element),
+                    'html': _element_html(element),
+                    'element': element
                 })
-            elif element.name in ['ol', 'ul']:
+            elif tag in _LIST_TAGS:
                 # Process list items individually
-                for li in element.find_all('li', recursive=False):
-                    text = li.get_text(' ', strip=True)
+                for li in element.iterchildren('li'):
                     blocks.append({
                         'type': 'list_item',
-                        'text': text,
-                        'html': str(li)
+                        'text': _element_text(li),
+                        'element': li
                     })
-            elif element.name:
-                text = element.get_text(' ', strip=True)
+            elif isinstance(tag, str):
+                text = _element_text(element)
                 if text:
                     blocks.append({
-                        'type': element.name,
+                        'type': tag,
                         'text': text,
-                        'html': str(element)
+                        'element': element
                     })
+            
+            add_loose_text(element.tail)
         
         return blocks
     
     def _extract_question_number(self, text: str) -> Optional[int]:
         """Extract question number from text if it starts a question."""
-        for pattern in self.QUESTION_PATTERNS:
-            match = re.match(pattern, text, re.IGNORECASE)
-            if match:
-                try:
-                    return int(match.group(1))
-                except (ValueError, IndexError):
-                    continue
+        match = _QUESTION_NUMBER_RE.match(text)
+        if match:
+            return int(match.group('num') or match.group('word_num'))
         return None
     
     def extract_question_content(
@@ -213,14 +376,18 @@ class DOCXParser:
         tables = []
         question_images = []
         
+        # Images by id, for the marker lookups below
+        images_by_id = {img_info['id']: img_info for img_info in images}
+        seen_images = set()
+        
         for block in content_blocks:
             block_type = block.get('type')
             text = block.get('text', '')
-            html = block.get('html', '')
             
             if block_type == 'table':
-                table_id = str(uuid.uuid4())[:8]
-                is_complex = self._is_complex_table(html)
+                html = _block_html(block)
+                table_id = secrets.token_hex(4)
+                is_complex = _is_complex_table(block['element'], html)
                 tables.append({
                     'id': table_id,
                     'html': html,
@@ -228,9 +395,10 @@ class DOCXParser:
                 })
             else:
                 # Check for images in this block
-                for img_info in images:
-                    img_marker = f"__IMAGE__{img_info['id']}__"
-                    if img_marker in html:
+                for img_id in _block_image_ids(block):
+                    img_info = images_by_id.get(img_id)
+                    if img_info is not None and img_id not in seen_images:
+                        seen_images.add(img_id)
                         question_images.append(img_info)
                 
                 # Check if this is an option
@@ -260,13 +428,8 @@ class DOCXParser:
         text = text.strip()
         
         # Check common option patterns
-        patterns = [
-            r'^\s*[\(\[]?\s*([A-Da-d])\s*[\)\]\.]\s*(.+)$',
-            r'^\s*([1-4])\s*[\)\]\.]\s*(.+)$',
-        ]
-        
-        for pattern in patterns:
-            match = re.match(pattern, text)
+        for pattern in (_OPTION_LETTER_RE, _OPTION_NUMBER_RE):
+            match = pattern.match(text)
             if match:
                 label = match.group(1).upper()
                 # Convert numeric to letter
@@ -281,55 +444,28 @@ class DOCXParser:
     
     def _normalize_options(self, options: List[Dict[str, str]]) -> List[Dict[str, str]]:
         """Normalize option labels to A, B, C, D."""
-        normalized = []
-        label_map = {'A': 0, 'B': 1, 'C': 2, 'D': 3, '1': 0, '2': 1, '3': 2, '4': 3}
+        # Slot each option by label; options sharing a label keep their order
+        slots = ([], [], [], [])
         
         for opt in options:
-            label = opt['label'].upper()
-            if label in label_map or label in ['A', 'B', 'C', 'D']:
-                normalized.append(opt)
-        
-        # Sort by label
-        normalized.sort(key=lambda x: x['label'])
+            slot = _OPTION_SLOTS.get(opt['label'].upper())
+            if slot is not None:
+                slots[slot].append(opt)
         
-        return normalized
+        return [opt for slot in slots for opt in slot]
     
     def _clean_question_text(self, text: str, q_num: Optional[int]) -> str:
         """Remove question number prefix and clean up text."""
-        # Remove question number patterns
-        for pattern in self.QUESTION_PATTERNS:
-            text = re.sub(pattern, '', text, count=1)
+        # Remove the question number prefix
+        match = _QUESTION_NUMBER_RE.match(text)
+        if match:
+            text = text[match.end():]
         
         # Clean up whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = ' '.join(text.split())
         
         return text
     
-    def _is_complex_table(self, html: str) -> bool:
-        """Determine if a table is complex (merged cells, nested tables, etc.)."""
-        soup = BeautifulSoup(html, 'lxml')
-        table = soup.find('table')
-        
-        if not table:
-            return False
-        
-        # Check for colspan/rowspan
-        if table.find(attrs={'colspan': True}) or table.find(attrs={'rowspan': True}):
-            return True
-        
-        # Check for nested tables
-        if len(table.find_all('table')) > 0:
-            return True
-        
-        # Check for irregular row lengths
-        rows = table.find_all('tr')
-        if rows:
-            cell_counts = [len(row.find_all(['td', 'th'])) for row in rows]
-            if len(set(cell_counts)) > 1:
-                return True
-        
-        return False
-    
     def parse_file_to_questions(
         self, 
         file_path: str, 
@@ -342,11 +478,11 @@ class DOCXParser:
         # Parse DOCX to HTML
         html, images = self.parse_docx(file_path, job_id)
         
-        # Normalize HTML
-        html = self.normalize_html(html)
+        # Parse and normalize the HTML once; later stages share the tree
+        root = self._normalize_tree(_parse_html(html))
         
         # Detect questions
-        question_blocks = self.detect_questions(html)
+        question_blocks = self.detect_questions(root)
         
         # Extract structured content
         questions = []
@@ -356,6 +492,22 @@ class DOCXParser:
             questions.append(q_content)
         
         return questions
+    
+    def parse_many(self, jobs: List[Tuple[str, str, str]]) -> List[List[Dict[str, Any]]]:
+        """
+        Run parse_file_to_questions for each (file_path, job_id, language) job.
+        Several jobs are parsed in parallel worker processes; results keep job order.
+        """
+        if len(jobs) < 2:
+            return [self.parse_file_to_questions(*job) for job in jobs]
+        
+        file_paths, job_ids, languages = zip(*jobs)
+        return map_in_processes(_parse_one, repeat(self.upload_dir), file_paths, job_ids, languages)
+
+
+def _parse_one(upload_dir: str, file_path: str, job_id: str, language: str) -> List[Dict[str, Any]]:
+    """Worker entry point for DOCXParser.parse_many."""
+    return DOCXParser(upload_dir).parse_file_to_questions(file_path, job_id, language)
 
 
 class QuestionExtractor:
@@ -373,22 +525,23 @@ class QuestionExtractor:
         if images is None:
             images = []
         
-        soup = BeautifulSoup(html, 'lxml')
+        # Parsed once and shared, read-only, by both strategies
+        root = _parse_html_cached(html)
         
         # Strategy 1: Look for <ol> lists where each item might be a question
-        questions = self._extract_from_ordered_list(soup, images)
+        questions = self._extract_from_ordered_list(root, images)
         
         if questions:
             return questions
         
         # Strategy 2: Look for paragraph-based questions
-        questions = self._extract_from_paragraphs(soup, images)
+        questions = self._extract_from_paragraphs(root, images)
         
         return questions
     
     def _extract_from_ordered_list(
         self, 
-        soup: BeautifulSoup, 
+        root: HtmlElement, 
         images: List[Dict[str, Any]]
     ) -> List[Dict[str, Any]]:
         """Extract questions from ordered lists."""
@@ -396,21 +549,14 @@ class QuestionExtractor:
         current_question = None
         question_num = 0
         
-        # Get all top-level elements
-        elements = list(soup.body.children) if soup.body else list(soup.children)
-        
-        i = 0
-        while i < len(elements):
-            element = elements[i]
-            
-            if isinstance(element, NavigableString):
-                i += 1
-                continue
+        # Walk the top-level elements
+        for element in _body(root):
+            tag = element.tag
             
-            if element.name == 'ol':
+            if tag == 'ol':
                 # Process list items
-                for li in element.find_all('li', recursive=False):
-                    text = li.get_text(' ', strip=True)
+                for li in element.iterchildren('li'):
+                    text = _element_text(li)
                     
                     # Check if this looks like a question start
                     if self._looks_like_question_start(text):
@@ -425,7 +571,7 @@ class QuestionExtractor:
                             'options': [],
                             'tables': [],
                             'images': [],
-                            'raw_html': str(li)
+                            'raw_html': _element_html(li)
                         }
                     elif self._looks_like_option(text):
                         if current_question:
@@ -436,17 +582,17 @@ class QuestionExtractor:
                         # Append to current question text
                         current_question['text'] += ' ' + self._clean_text(text)
             
-            elif element.name == 'table':
+            elif tag == 'table':
                 if current_question:
-                    table_html = str(element)
+                    table_html = _element_html(element)
                     current_question['tables'].append({
-                        'id': str(uuid.uuid4())[:8],
+                        'id': secrets.token_hex(4),
                         'html': table_html,
-                        'is_complex': self._is_complex_table(element)
+                        'is_complex': _is_complex_table(element, table_html)
                     })
             
-            elif element.name == 'p':
-                text = element.get_text(' ', strip=True)
+            elif tag == 'p':
+                text = _element_text(element)
                 
                 if self._looks_like_question_start(text):
                     if current_question:
@@ -473,8 +619,6 @@ class QuestionExtractor:
                             current_question['options'].extend(inline_opts)
                         else:
                             current_question['text'] += ' ' + self._clean_text(text)
-            
-            i += 1
         
         # Don't forget last question
         if current_question:
@@ -484,7 +628,7 @@ class QuestionExtractor:
     
     def _extract_from_paragraphs(
         self, 
-        soup: BeautifulSoup, 
+        root: HtmlElement, 
         images: List[Dict[str, Any]]
     ) -> List[Dict[str, Any]]:
         """Extract questions from paragraph-based content."""
@@ -492,20 +636,21 @@ class QuestionExtractor:
         current_question = None
         question_num = 0
         
-        for element in soup.find_all(['p', 'table', 'ol', 'ul']):
-            if element.name == 'table':
+        for element in root.iter('p', 'table', 'ol', 'ul'):
+            if element.tag == 'table':
                 if current_question:
+                    table_html = _element_html(element)
                     current_question['tables'].append({
-                        'id': str(uuid.uuid4())[:8],
-                        'html': str(element),
-                        'is_complex': self._is_complex_table(element)
+                        'id': secrets.token_hex(4),
+                        'html': table_html,
+                        'is_complex': _is_complex_table(element, table_html)
                     })
                 continue
             
-            text = element.get_text(' ', strip=True)
+            text = _element_text(element)
             
             # Check for question number pattern
-            q_match = re.match(r'^\s*(?:Q\.?\s*)?(\d{1,3})[\.\)]\s*(.+)', text)
+            q_match = _NUMBERED_QUESTION_RE.match(text)
             
             if q_match:
                 if current_question:
@@ -540,40 +685,17 @@ class QuestionExtractor:
         if len(text) < 10:
             return False
         
-        # Check for question patterns
-        patterns = [
-            r'^(?:Q\.?\s*)?\d{1,3}[\.\)]\s*.+',
-            r'^(?:Question|प्रश्न)\s*\d+',
-            r'^.+\?$',  # Ends with question mark
-            r'^.+(?:consider|which|what|who|when|where|how|why|select|choose)',
-        ]
-        
-        for pattern in patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                return True
-        
-        # Check for common question indicators
-        indicators = [
-            'consider the following',
-            'निम्नलिखित',
-            'which of the',
-            'select the correct',
-            'choose the',
-            'with reference to',
-            'के संदर्भ में',
-        ]
-        
-        text_lower = text.lower()
-        return any(ind in text_lower for ind in indicators)
+        # Check for question patterns and common question indicators
+        return _QUESTION_START_RE.search(text) is not None
     
     def _looks_like_option(self, text: str) -> bool:
         """Check if text looks like an option."""
         text = text.strip()
-        return bool(re.match(r'^\s*[\(\[]?\s*[A-Da-d1-4]\s*[\)\]\.]\s*.+', text))
+        return bool(_OPTION_START_RE.match(text))
     
     def _parse_option(self, text: str) -> Optional[Dict[str, str]]:
         """Parse option text into label and content."""
-        match = re.match(r'^\s*[\(\[]?\s*([A-Da-d1-4])\s*[\)\]\.]\s*(.+)$', text.strip())
+        match = _OPTION_RE.match(text.strip())
         if match:
             label = match.group(1).upper()
             if label.isdigit():
@@ -587,31 +709,28 @@ class QuestionExtractor:
     def _extract_inline_options(self, text: str) -> List[Dict[str, str]]:
         """Extract options that are inline (A. x B. y C. z D. w)."""
         options = []
-        # Pattern to match inline options
-        pattern = r'[\(\[]?\s*([A-Da-d])\s*[\)\]\.]\s*([^A-D\(\[\]\)]+?)(?=\s*[\(\[]?\s*[A-Da-d]\s*[\)\]\.]\s*|$)'
-        
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        for label, content in matches:
-            options.append({
-                'label': label.upper(),
-                'text': content.strip()
-            })
+        
+        # Linear scan: content runs cannot contain a label, so a failed
+        # candidate is never rescanned from inside its content
+        pos = 0
+        while True:
+            label = _INLINE_OPTION_LABEL_RE.search(text, pos)
+            if label is None:
+                break
+            
+            content = _INLINE_OPTION_CONTENT_RE.match(text, label.end())
+            if content and (content.end() == len(text)
+                            or _INLINE_OPTION_LABEL_RE.match(text, content.end())):
+                options.append({
+                    'label': label.group(1).upper(),
+                    'text': content.group().strip()
+                })
+                pos = content.end()
+            else:
+                pos = label.start() + 1
         
         return options
     
     def _clean_text(self, text: str) -> str:
         """Clean up text by removing extra whitespace."""
-        return re.sub(r'\s+', ' ', text).strip()
-    
-    def _is_complex_table(self, table) -> bool:
-        """Check if table is complex."""
-        if table.find(attrs={'colspan': True}) or table.find(attrs={'rowspan': True}):
-            return True
-        if len(table.find_all('table')) > 0:
-            return True
-        rows = table.find_all('tr')
-        if rows:
-            cell_counts = [len(row.find_all(['td', 'th'])) for row in rows]
-            if len(set(cell_counts)) > 1:
-                return True
-        return False
+        return ' '.join(text.split())
@@ -2,12 +2,131 @@
 Improved DOCX Parser - Better question/option detection for messy documents.
 """
 import re
-import uuid
+import secrets
 import os
+import shutil
+from functools import lru_cache
+from itertools import repeat
 from typing import List, Tuple, Optional, Dict, Any
 from io import BytesIO
 import mammoth
-from bs4 import BeautifulSoup, NavigableString
+from lxml.html import HtmlElement
+
+from .html_blocks import (
+    parse_body, iter_blocks, element_text, element_html, is_complex_table
+)
+from .parallel import map_in_processes
+
+
+# File extensions for embedded image content types; anything else is saved as png
+_EXT_MAP = {
+    'image/jpeg': 'jpg',
+    'image/jpg': 'jpg',
+    'image/pjpeg': 'jpg',
+}
+
+# Q1. style question paragraphs: (number, text) groups
+_Q_NUMBERED_RE = re.compile(r'^\s*Q\.?\s*(\d+)[\.\)]\s*(.+)', re.IGNORECASE)
+_Q_NUMBER_PREFIX_RE = re.compile(r'^\s*Q\.?\s*\d+[\.\)]\s*')
+_NUMBER_PREFIX_RE = re.compile(r'^\s*\d+[\.\)]\s*')
+
+# Question start heuristics
+_OPTION_PREFIX_RE = re.compile(r'^\s*[\(\[]?\s*[A-Da-d1-4]\s*[\)\]\.]\s*')
+_SHORT_OPTION_RE = re.compile(r'^\s*[A-Da-d]\s*[\.\)]\s*.{1,30}$')
+_NUMBERED_STATEMENTS_RE = re.compile(r'[12345]\s+\w')
+
+# First characters an option line can start with, checked before any regex:
+# a bracket, a letter A-D, केवल's first letter, or a digit (str.isdecimal)
+_OPTION_PREFIX_CHARS = frozenset('([ABCDabcd1234')
+_OPTION_LINE_CHARS = frozenset('([ABCDabcdक')
+
+# Question indicators, all plain substrings of the lowercased text, so they
+# are checked with str 'in' rather than the regex engine. Besides these, text
+# ending with a question mark counts as a question.
+_QUESTION_INDICATORS = (
+    'consider the following',
+    'which of the',
+    'select the correct',
+    'choose the',
+    'with reference to',
+    'given below',
+    'statement',
+    'निम्नलिखित',
+    'के संदर्भ में',
+    'विचार कीजिए',
+    'कथन',
+    'कौन',
+)
+
+# Option lines
+_OPTION_LINE_RE = re.compile('|'.join(f'(?:{p})' for p in (
+    r'^\s*[\(\[]?\s*[A-Da-d]\s*[\)\]\.]\s*.+',
+    r'^\s*[\(\[]?\s*[1-4]\s*[\)\]\.]\s*.+',
+    r'^\s*केवल\s+[0-9]',  # Hindi "only X"
+    r'^\s*\d+\s+(?:और|and)\s+\d+',  # "X and Y"
+)), re.IGNORECASE)
+
+# Option lines: (label, content) groups
+_OPTION_PARTS = tuple(re.compile(p, re.DOTALL) for p in (
+    r'^\s*[\(\[]?\s*([A-Da-d])\s*[\)\]\.]\s*(.+)$',
+    r'^\s*[\(\[]?\s*([1-4])\s*[\)\]\.]\s*(.+)$',
+))
+
+# Options written on one line: A. x B. y C. z D. w. An option is a label and
+# the run of non-label characters after it, up to the next label or the end
+_INLINE_OPTION_LABEL_RE = re.compile(r'(?:[\(\[]\s*)?([A-Da-d])\s*[\)\]\.]')
+_INLINE_OPTION_CONTENT_RE = re.compile(r'[^A-Da-d\(\[\]\)]+')
+
+
+@lru_cache(maxsize=4096)
+def _split_option(text: str) -> Optional[Tuple[str, str]]:
+    """
+    (label, content) of a stripped option line, with 1-4 mapped to A-D, or None.
+    Option lines like 'Only 1' repeat across questions, so results are cached.
+    """
+    for pattern in _OPTION_PARTS:
+        match = pattern.match(text)
+        if match:
+            label = match.group(1).upper()
+            # Convert numeric to letter
+            if label.isdigit():
+                label = chr(ord('A') + int(label) - 1)
+            return label, match.group(2).strip()
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _collapse_whitespace(text: str) -> str:
+    """Collapse whitespace runs to single spaces and strip."""
+    return ' '.join(text.split())
+
+
+class _Element:
+    """One entry of the element stream: a list item or a top-level block."""
+    
+    __slots__ = ('kind', 'content', 'element', 'content_lower')
+    
+    def __init__(self, kind: str, content: str, element: HtmlElement,
+                 content_lower: Optional[str] = None):
+        self.kind = kind
+        self.content = content
+        self.element = element
+        # Lowercased content, kept for list items' question checks
+        self.content_lower = content_lower
+
+
+class _ExtractState:
+    """Progress of ImprovedQuestionExtractor through one element stream."""
+    
+    __slots__ = ('questions', 'current', 'number', 'collecting')
+    
+    def __init__(self):
+        self.questions: List[Dict] = []
+        self.current: Optional[Dict] = None
+        self.number = 0
+        # Set by the first list item question. From then on, options, tables
+        # and paragraphs are gathered into the current question.
+        self.collecting = False
 
 
 class ImprovedQuestionExtractor:
@@ -18,40 +137,42 @@ class ImprovedQuestionExtractor:
     
     def __init__(self, upload_dir: str = "/tmp/qs-formatter"):
         self.upload_dir = upload_dir
+        self._created_dirs: set[str] = set()
     
     def parse_docx_to_html(self, file_path: str, job_id: str) -> Tuple[str, List[Dict]]:
         """Parse DOCX to HTML and extract images."""
         images = []
         image_dir = os.path.join(self.upload_dir, job_id, "images")
-        os.makedirs(image_dir, exist_ok=True)
+        if image_dir not in self._created_dirs:
+            os.makedirs(image_dir, exist_ok=True)
+            self._created_dirs.add(image_dir)
         
         def handle_image(image):
-            with image.open() as img_stream:
-                img_data = img_stream.read()
-                img_id = str(uuid.uuid4())[:8]
-                ext = "png"
-                if "jpeg" in image.content_type or "jpg" in image.content_type:
-                    ext = "jpg"
-                
-                filename = f"img_{img_id}.{ext}"
-                filepath = os.path.join(image_dir, filename)
-                
-                with open(filepath, "wb") as f:
-                    f.write(img_data)
-                
-                images.append({
-                    "id": img_id,
-                    "filename": filename,
-                    "path": filepath,
-                    "content_type": image.content_type
-                })
-                
-                return {"src": f"__IMAGE__{img_id}__"}
+            img_id = secrets.token_hex(4)
+            ext = _EXT_MAP.get(image.content_type, "png")
+            
+            filename = f"img_{img_id}.{ext}"
+            filepath = os.path.join(image_dir, filename)
+            
+            # Stream to disk in 64 KiB chunks instead of holding the whole image
+            with image.open() as img_stream, open(filepath, "wb") as f:
+                shutil.copyfileobj(img_stream, f, 64 * 1024)
+            
+            images.append({
+                "id": img_id,
+                "filename": filename,
+                "path": filepath,
+                "content_type": image.content_type
+            })
+            
+            return {"src": f"__IMAGE__{img_id}__"}
         
+        # Skip mammoth's extra pass over the zip for an embedded style map
         with open(file_path, "rb") as f:
             result = mammoth.convert_to_html(
                 f,
-                convert_image=mammoth.images.img_element(handle_image)
+                convert_image=mammoth.images.img_element(handle_image),
+                include_embedded_style_map=False
             )
         
         return result.value, images
@@ -64,153 +185,109 @@ class ImprovedQuestionExtractor:
         if images is None:
             images = []
         
-        soup = BeautifulSoup(html, 'lxml')
-        questions = []
+        body = parse_body(html)
         
-        # Get all elements in order
+        # Get all elements in order. Elements keep their parsed element; HTML
+        # is only serialized for the ones a question takes. List item text is
+        # also kept lowercased for the question check.
         elements = []
-        for elem in soup.body.children if soup.body else soup.children:
-            if isinstance(elem, NavigableString):
-                text = str(elem).strip()
-                if text:
-                    elements.append({'type': 'text', 'content': text, 'html': text})
-            elif elem.name == 'ol':
+        for kind, elem, text in iter_blocks(body):
+            if kind == 'list':
                 # Flatten list items
-                for li in elem.find_all('li', recursive=False):
-                    text = li.get_text(' ', strip=True)
-                    elements.append({'type': 'li', 'content': text, 'html': str(li)})
-            elif elem.name == 'ul':
-                for li in elem.find_all('li', recursive=False):
-                    text = li.get_text(' ', strip=True)
-                    elements.append({'type': 'li', 'content': text, 'html': str(li)})
-            elif elem.name == 'table':
-                elements.append({
-                    'type': 'table',
-                    'content': elem.get_text(' ', strip=True),
-                    'html': str(elem)
-                })
-            elif elem.name == 'p':
-                text = elem.get_text(' ', strip=True)
-                if text:
-                    elements.append({'type': 'p', 'content': text, 'html': str(elem)})
-            elif elem.name in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
-                text = elem.get_text(' ', strip=True)
-                if text:
-                    elements.append({'type': 'heading', 'content': text, 'html': str(elem)})
+                for li in elem.iterchildren('li'):
+                    li_text = element_text(li)
+                    elements.append(_Element('li', li_text, li, li_text.lower()))
+            else:
+                elements.append(_Element(kind, text, elem))
         
-        # Now process elements to identify questions
-        current_question = None
-        question_num = 0
-        
-        i = 0
-        while i < len(elements):
-            elem = elements[i]
-            text = elem['content']
-            elem_type = elem['type']
-            
-            # Check if this looks like a question start
-            is_question_start = self._is_question_start(text)
-            
-            if is_question_start and elem_type == 'li':
-                # Save previous question
-                if current_question is not None:
-                    questions.append(current_question)
-                
-                question_num += 1
-                
-                # Extract question text (remove numbering if present)
-                q_text = self._clean_question_text(text)
-                
-                current_question = {
-                    'number': question_num,
-                    'text': q_text,
-                    'options': [],
-                    'tables': [],
-                    'images': []
-                }
-                
-                # Look ahead for options and content
-                i += 1
-                while i < len(elements):
-                    next_elem = elements[i]
-                    next_text = next_elem['content']
-                    next_type = next_elem['type']
-                    
-                    # Check if this is a new question
-                    if next_type == 'li' and self._is_question_start(next_text):
-                        break
-                    
-                    # Handle table
-                    if next_type == 'table':
-                        current_question['tables'].append({
-                            'id': str(uuid.uuid4())[:8],
-                            'html': next_elem['html'],
-                            'is_complex': self._is_complex_table(next_elem['html'])
-                        })
-                        i += 1
-                        continue
-                    
-                    # Check if this is an option
-                    if next_type == 'li' and self._is_option(next_text):
-                        opt = self._parse_option(next_text)
-                        if opt:
-                            current_question['options'].append(opt)
-                        i += 1
-                        continue
-                    
-                    # Check for paragraph that might be part of question or have options
-                    if next_type == 'p':
-                        # Check for inline options
-                        inline_opts = self._extract_inline_options(next_text)
-                        if inline_opts:
-                            current_question['options'].extend(inline_opts)
-                        elif self._is_option(next_text):
-                            opt = self._parse_option(next_text)
-                            if opt:
-                                current_question['options'].append(opt)
-                        else:
-                            # Append to question text
-                            current_question['text'] += ' ' + next_text
-                        i += 1
-                        continue
-                    
-                    i += 1
-                
-                continue
-            
-            # Handle paragraph-based questions (Q1. format)
-            if elem_type == 'p' and self._is_numbered_question(text):
-                if current_question is not None:
-                    questions.append(current_question)
-                
-                q_match = re.match(r'^\s*Q\.?\s*(\d+)[\.\)]\s*(.+)', text, re.IGNORECASE)
-                if q_match:
-                    question_num = int(q_match.group(1))
-                    q_text = q_match.group(2)
-                else:
-                    question_num += 1
-                    q_text = self._clean_question_text(text)
-                
-                current_question = {
-                    'number': question_num,
-                    'text': q_text,
-                    'options': [],
-                    'tables': [],
-                    'images': []
-                }
-            
-            i += 1
+        # Now process elements to identify questions, one handler per element type
+        handlers = {
+            'li': self._on_list_item,
+            'table': self._on_table,
+            'p': self._on_paragraph,
+        }
+        state = _ExtractState()
+        for elem in elements:
+            handler = handlers.get(elem.kind)
+            if handler is not None:
+                handler(state, elem)
         
         # Don't forget the last question
-        if current_question is not None:
-            questions.append(current_question)
+        if state.current is not None:
+            state.questions.append(state.current)
+        
+        return state.questions
+    
+    def _start_question(self, state: '_ExtractState', number: int, text: str):
+        """Save the current question, if any, and start a new one."""
+        if state.current is not None:
+            state.questions.append(state.current)
+        
+        state.number = number
+        state.current = {
+            'number': number,
+            'text': text,
+            'options': [],
+            'tables': [],
+            'images': []
+        }
+    
+    def _on_list_item(self, state: '_ExtractState', elem: '_Element'):
+        """A list item starts a question, or is an option of the current one."""
+        text = elem.content
         
-        return questions
+        if self._is_question_start(text, elem.content_lower):
+            # Extract question text (remove numbering if present)
+            self._start_question(state, state.number + 1, self._clean_question_text(text))
+            state.collecting = True
+        elif state.collecting and self._is_option(text):
+            opt = self._parse_option(text)
+            if opt:
+                state.current['options'].append(opt)
     
-    def _is_question_start(self, text: str) -> bool:
+    def _on_table(self, state: '_ExtractState', elem: '_Element'):
+        """Tables after a list item question belong to it."""
+        if state.collecting:
+            table = elem.element
+            state.current['tables'].append({
+                'id': secrets.token_hex(4),
+                'html': element_html(table),
+                'is_complex': self._is_complex_table(table)
+            })
+    
+    def _on_paragraph(self, state: '_ExtractState', elem: '_Element'):
+        """
+        After a list item question, a paragraph holds options or more question
+        text. Before one, only Q1. style paragraphs start questions.
+        """
+        text = elem.content
+        
+        if state.collecting:
+            # Check for inline options
+            inline_opts = self._extract_inline_options(text)
+            if inline_opts:
+                state.current['options'].extend(inline_opts)
+            elif self._is_option(text):
+                opt = self._parse_option(text)
+                if opt:
+                    state.current['options'].append(opt)
+            else:
+                # Append to question text
+                state.current['text'] += ' ' + text
+        
+        # Handle paragraph-based questions (Q1. format)
+        elif self._is_numbered_question(text):
+            q_match = _Q_NUMBERED_RE.match(text)
+            if q_match:
+                self._start_question(state, int(q_match.group(1)), q_match.group(2))
+            else:
+                self._start_question(state, state.number + 1, self._clean_question_text(text))
+    
+    def _is_question_start(self, text: str, text_lower: Optional[str] = None) -> bool:
         """
         Determine if text looks like the start of a question.
         Questions typically have substantial content and aren't just options.
+        Pass text_lower when the caller already holds the stripped text lowercased.
         """
         text = text.strip()
         
@@ -219,39 +296,24 @@ class ImprovedQuestionExtractor:
             return False
         
         # If it starts with option pattern, it's not a question
-        if re.match(r'^\s*[\(\[]?\s*[A-Da-d1-4]\s*[\)\]\.]\s*', text):
-            return False
-        
-        # If it looks like just an option letter with short text
-        if re.match(r'^\s*[A-Da-d]\s*[\.\)]\s*.{1,30}$', text):
-            return False
+        if text[0] in _OPTION_PREFIX_CHARS:
+            if _OPTION_PREFIX_RE.match(text):
+                return False
+            
+            # If it looks like just an option letter with short text
+            if _SHORT_OPTION_RE.match(text):
+                return False
         
         # Check for question indicators
-        question_indicators = [
-            r'consider the following',
-            r'which of the',
-            r'select the correct',
-            r'choose the',
-            r'with reference to',
-            r'given below',
-            r'statements?',
-            r'\?$',  # Ends with question mark
-            r'निम्नलिखित',
-            r'के संदर्भ में',
-            r'विचार कीजिए',
-            r'कथन',
-            r'कौन',
-        ]
-        
-        text_lower = text.lower()
-        for indicator in question_indicators:
-            if re.search(indicator, text_lower):
-                return True
+        if text_lower is None:
+            text_lower = text.lower()
+        if text_lower.endswith('?') or any(s in text_lower for s in _QUESTION_INDICATORS):
+            return True
         
         # If it's long enough and contains certain patterns
         if len(text) > 50:
             # Check if it contains numbered statements
-            if re.search(r'[12345]\s+\w', text):
+            if _NUMBERED_STATEMENTS_RE.search(text):
                 return True
         
         # Default: if it's reasonably long and not an option, consider it a question
@@ -264,95 +326,65 @@ class ImprovedQuestionExtractor:
         """Check if text is an option."""
         text = text.strip()
         
-        # Standard option patterns
-        patterns = [
-            r'^\s*[\(\[]?\s*[A-Da-d]\s*[\)\]\.]\s*.+',
-            r'^\s*[\(\[]?\s*[1-4]\s*[\)\]\.]\s*.+',
-            r'^\s*केवल\s+[0-9]',  # Hindi "only X"
-            r'^\s*\d+\s+(?:और|and)\s+\d+',  # "X and Y"
-        ]
-        
-        for pattern in patterns:
-            if re.match(pattern, text, re.IGNORECASE):
-                return True
+        first = text[:1]
+        if first not in _OPTION_LINE_CHARS and not first.isdecimal():
+            return False
         
-        return False
+        return bool(_OPTION_LINE_RE.match(text))
     
     def _is_numbered_question(self, text: str) -> bool:
         """Check if text is a Q1. style question."""
-        return bool(re.match(r'^\s*Q\.?\s*\d+[\.\)]\s*.+', text, re.IGNORECASE))
+        return bool(_Q_NUMBERED_RE.match(text))
     
     def _clean_question_text(self, text: str) -> str:
         """Clean up question text."""
         # Remove numbering patterns
-        text = re.sub(r'^\s*Q\.?\s*\d+[\.\)]\s*', '', text)
-        text = re.sub(r'^\s*\d+[\.\)]\s*', '', text)
-        text = re.sub(r'\s+', ' ', text)
-        return text.strip()
+        text = _Q_NUMBER_PREFIX_RE.sub('', text)
+        text = _NUMBER_PREFIX_RE.sub('', text)
+        return _collapse_whitespace(text)
     
     def _parse_option(self, text: str) -> Optional[Dict]:
         """Parse option text into label and content."""
-        text = text.strip()
+        parts = _split_option(text.strip())
+        if parts is None:
+            return None
         
-        # Try various patterns
-        patterns = [
-            r'^\s*[\(\[]?\s*([A-Da-d])\s*[\)\]\.]\s*(.+)$',
-            r'^\s*[\(\[]?\s*([1-4])\s*[\)\]\.]\s*(.+)$',
-        ]
-        
-        for pattern in patterns:
-            match = re.match(pattern, text, re.DOTALL)
-            if match:
-                label = match.group(1).upper()
-                # Convert numeric to letter
-                if label.isdigit():
-                    label = chr(ord('A') + int(label) - 1)
-                return {
-                    'label': label,
-                    'text': match.group(2).strip()
-                }
-        
-        return None
+        label, content = parts
+        return {
+            'label': label,
+            'text': content
+        }
     
     def _extract_inline_options(self, text: str) -> List[Dict]:
         """Extract inline options like 'A. x B. y C. z D. w'."""
         options = []
         
-        # Pattern for inline options
-        pattern = r'[\(\[]?\s*([A-Da-d])\s*[\)\]\.]\s*([^A-Da-d\(\[\]\)]+?)(?=\s*[\(\[]?\s*[A-Da-d]\s*[\)\]\.]\s*|$)'
-        
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        for label, content in matches:
-            content = content.strip()
-            if content:
-                options.append({
-                    'label': label.upper(),
-                    'text': content
-                })
+        # One left-to-right pass: a label is kept only if its content run ends
+        # at the next label or at the end of the text
+        pos = 0
+        while True:
+            label = _INLINE_OPTION_LABEL_RE.search(text, pos)
+            if label is None:
+                break
+            
+            content = _INLINE_OPTION_CONTENT_RE.match(text, label.end())
+            if content and (content.end() == len(text)
+                            or _INLINE_OPTION_LABEL_RE.match(text, content.end())):
+                option_text = content.group().strip()
+                if option_text:
+                    options.append({
+                        'label': label.group(1).upper(),
+                        'text': option_text
+                    })
+                pos = content.end()
+            else:
+                pos = label.start() + 1
         
         return options if len(options) >= 2 else []
     
-    def _is_complex_table(self, html: str) -> bool:
+    def _is_complex_table(self, table: HtmlElement) -> bool:
         """Check if table is complex."""
-        soup = BeautifulSoup(html, 'lxml')
-        table = soup.find('table')
-        
-        if not table:
-            return False
-        
-        if table.find(attrs={'colspan': True}) or table.find(attrs={'rowspan': True}):
-            return True
-        
-        if len(table.find_all('table')) > 0:
-            return True
-        
-        rows = table.find_all('tr')
-        if rows:
-            cell_counts = [len(row.find_all(['td', 'th'])) for row in rows]
-            if len(set(cell_counts)) > 1:
-                return True
-        
-        return False
+        return is_complex_table(table)
 
 
 def parse_document(file_path: str, job_id: str, upload_dir: str = "/tmp/qs-formatter") -> List[Dict]:
@@ -364,3 +396,13 @@ def parse_document(file_path: str, job_id: str, upload_dir: str = "/tmp/qs-forma
     questions = extractor.extract_questions(html, images)
     
     return questions
+
+
+def parse_documents(file_paths: List[str], job_ids: List[str], upload_dir: str = "/tmp/qs-formatter",
+                    max_workers: Optional[int] = None) -> List[List[Dict]]:
+    """
+    Run parse_document for each (file_path, job_id) pair.
+    Several documents are parsed in parallel worker processes; results keep input order.
+    """
+    return map_in_processes(parse_document, file_paths, job_ids, repeat(upload_dir),
+                            max_workers=max_workers)
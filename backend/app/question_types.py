@@ -0,0 +1,35 @@
+"""
+Question Types Module - keyword rules for classifying question texts.
+
+Kept free of document-format imports, so parsers can share it without
+loading mammoth or python-docx.
+"""
+from typing import Optional, Sequence, Tuple
+
+
+# Question types in priority order, each with the keywords that select it.
+# Longer forms ('matching', 'statements', 'कथनों') contain these keywords,
+# so they need no entries of their own
+QUESTION_TYPE_KEYWORDS = (
+    ('assertion-reason', ('assertion', 'reason')),
+    ('matching', ('match',)),
+    ('how-many', ('how many', 'कितने')),
+    ('statement-based', ('statement', 'कथन')),
+    ('figure-based', ('figure', 'image', 'diagram')),
+)
+
+
+def detect_question_type(text: str, text_lower: Optional[str] = None,
+                         keywords: Sequence[Tuple[str, Tuple[str, ...]]] = QUESTION_TYPE_KEYWORDS) -> str:
+    """
+    Detect question type from text patterns: the first type in keywords with
+    a keyword in the text wins. Pass text_lower when the caller has already
+    lowercased the text.
+    """
+    if text_lower is None:
+        text_lower = text.lower()
+    for question_type, type_keywords in keywords:
+        for keyword in type_keywords:
+            if keyword in text_lower:
+                return question_type
+    return 'single'
@@ -3,11 +3,123 @@ Final robust DOCX Parser for QS-Formatter.
 Handles the specific document format where questions, options, and tables are interleaved.
 """
 import re
-import uuid
+import secrets
 import os
+import shutil
+from functools import lru_cache
+from itertools import repeat
 from typing import List, Dict, Any, Optional, Tuple
 import mammoth
-from bs4 import BeautifulSoup, NavigableString, Tag
+from lxml.html import HtmlElement
+
+from .html_blocks import (
+    parse_body, iter_blocks, element_text, element_html, is_complex_table
+)
+from .parallel import map_in_processes
+
+
+# Question indicators in the lowercased text. Fixed strings are checked with
+# str 'in' first; only the patterns with variable spacing go to the regex.
+_QUESTION_INDICATOR_SUBSTRINGS = ('निम्नलिखित',)
+_QUESTION_INDICATOR_RE = re.compile('|'.join(f'(?:{p})' for p in (
+    r'consider\s+the\s+following',
+    r'with\s+reference\s+to',
+    r'which\s+of\s+the\s+following',
+    r'select\s+the\s+correct',
+    r'choose\s+the',
+    r'match\s+the\s+following',
+    r'given\s+below',
+    r'following\s+pairs',
+    r'following\s+statements',
+    # Hindi
+    r'के\s+संदर्भ\s+में',
+    r'विचार\s+कीजिए',
+    r'सही.*चुनिए',
+)))
+
+# Prompts like 'Which of the above...', matched at the start of the lowercased text
+_QUESTION_PROMPT_RE = re.compile('|'.join(f'(?:{p})' for p in (
+    r'^which\s+of\s+the',
+    r'^select\s+the\s+correct',
+    r'^choose\s+the\s+correct',
+    r'^the\s+correct\s+',
+    r'^ऊपर\s+दिए',
+    r'^उपर्युक्त',
+    r'^सही\s+उत्तर',
+)))
+
+_NUMBERED_STATEMENT_RE = re.compile(r'^\s*[1-9]\s+\w')
+_ASSERTION_REASON_RE = re.compile(r'^\s*(Assertion|Reason|अभिकथन|कारण)', re.IGNORECASE)
+_Q_PREFIX_RE = re.compile(r'^\s*Q\.?\s*\d+[\.\):]', re.IGNORECASE)
+_Q_PREFIX_STRIP_RE = re.compile(r'^\s*Q\.?\s*\d+[\.\):]\s*')
+
+# Option lines: (label, content) groups
+_OPTION_PARTS = tuple(re.compile(p, re.DOTALL) for p in (
+    r'^\s*[\(\[]?\s*([A-Da-d])\s*[\)\]\.:\-]\s*(.+)$',
+    r'^\s*([1-4])\s*[\)\]\.:\-]\s*(.+)$',
+))
+
+# Normalized option order: options left without a label sort before A
+_OPTION_ORDER = ('?', 'A', 'B', 'C', 'D', 'E', 'F')
+
+# First characters of a stripped option line, checked before any regex
+_OPTION_PREFIX_CHARS = frozenset('([ABCDabcd1234')
+_OPTION_CONTENT_CHARS = frozenset('0123456789ABCDabcdNnOoकदन')
+
+# Option text without a label
+_OPTION_CONTENT_RE = re.compile('|'.join(f'(?:{p})' for p in (
+    r'^only\s+[0-9]',
+    r'^[0-9]+\s*(?:and|&)\s*[0-9]+',
+    r'^(?:Both|Neither|All|None)',
+    r'^(?:केवल|दोनों|न\s+तो)',
+    r'^[A-D]-[0-9]',
+)), re.IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
+def _split_option(text: str) -> Optional[Tuple[str, str]]:
+    """
+    Label and content of a stripped option line ('1'-'4' become 'A'-'D'), or
+    None if it has no label. Cached: texts such as 'केवल 1' recur in every paper.
+    """
+    for pattern in _OPTION_PARTS:
+        match = pattern.match(text)
+        if match:
+            label = match.group(1).upper()
+            if label.isdigit():
+                label = chr(ord('A') + int(label) - 1)
+            return label, match.group(2).strip()
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _collapse_whitespace(text: str) -> str:
+    """Text with whitespace runs collapsed to single spaces, stripped."""
+    return ' '.join(text.split())
+
+
+class _Element:
+    """One entry of the element stream: a list item or a top-level block."""
+    
+    __slots__ = ('kind', 'content', 'element', 'is_only')
+    
+    def __init__(self, kind: str, content: str, element: HtmlElement, is_only: bool = False):
+        self.kind = kind
+        self.content = content
+        self.element = element
+        # For list items: whether this is the only item of its list
+        self.is_only = is_only
+
+
+class _ParseState:
+    """Progress of RobustDocumentParser through one element stream."""
+    
+    __slots__ = ('questions', 'current_q', 'q_num')
+    
+    def __init__(self):
+        self.questions: List[Dict] = []
+        self.current_q: Optional[Dict] = None
+        self.q_num = 0
 
 
 class RobustDocumentParser:
@@ -17,6 +129,7 @@ class RobustDocumentParser:
     
     def __init__(self, upload_dir: str = "/tmp/qs-formatter"):
         self.upload_dir = upload_dir
+        self._created_dirs: set[str] = set()
     
     def parse_file(self, file_path: str, job_id: str) -> List[Dict[str, Any]]:
         """Parse a DOCX file and extract questions."""
@@ -28,41 +141,43 @@ class RobustDocumentParser:
         """Convert DOCX to HTML with image extraction."""
         images = []
         image_dir = os.path.join(self.upload_dir, job_id, "images")
-        os.makedirs(image_dir, exist_ok=True)
+        if image_dir not in self._created_dirs:
+            os.makedirs(image_dir, exist_ok=True)
+            self._created_dirs.add(image_dir)
         
         def handle_image(image):
-            with image.open() as img_stream:
-                img_data = img_stream.read()
-                img_id = str(uuid.uuid4())[:8]
-                ext = "png" if "png" in image.content_type else "jpg"
-                
-                filename = f"img_{img_id}.{ext}"
-                filepath = os.path.join(image_dir, filename)
-                
-                with open(filepath, "wb") as f:
-                    f.write(img_data)
-                
-                images.append({
-                    "id": img_id,
-                    "filename": filename,
-                    "path": filepath,
-                    "content_type": image.content_type
-                })
-                
-                return {"src": f"__IMAGE__{img_id}__"}
+            img_id = secrets.token_hex(4)
+            ext = "png" if "png" in image.content_type else "jpg"
+            
+            filename = f"img_{img_id}.{ext}"
+            filepath = os.path.join(image_dir, filename)
+            
+            # Stream to disk in 64 KiB chunks instead of holding the whole image
+            with image.open() as img_stream, open(filepath, "wb") as f:
+                shutil.copyfileobj(img_stream, f, 64 * 1024)
+            
+            images.append({
+                "id": img_id,
+                "filename": filename,
+                "path": filepath,
+                "content_type": image.content_type
+            })
+            
+            return {"src": f"__IMAGE__{img_id}__"}
         
+        # Skip mammoth's extra pass over the zip for an embedded style map
         with open(file_path, "rb") as f:
             result = mammoth.convert_to_html(
                 f,
-                convert_image=mammoth.images.img_element(handle_image)
+                convert_image=mammoth.images.img_element(handle_image),
+                include_embedded_style_map=False
             )
         
         return result.value, images
     
     def _extract_questions(self, html: str, images: List[Dict]) -> List[Dict]:
         """Extract questions from HTML."""
-        soup = BeautifulSoup(html, 'lxml')
-        body = soup.body if soup.body else soup
+        body = parse_body(html)
         
         # Convert to element stream
         elements = self._get_elements(body)
@@ -72,157 +187,106 @@ class RobustDocumentParser:
         
         return questions
     
-    def _get_elements(self, body) -> List[Dict]:
-        """Convert HTML body to a list of typed elements."""
+    def _get_elements(self, body: HtmlElement) -> List['_Element']:
+        """
+        Convert HTML body to a list of typed elements.
+        Elements keep their parsed element; HTML is only serialized for the
+        tables a question takes. Each list item is its own 'li' element,
+        flagged is_only when it is the only item of its list.
+        """
         elements = []
         
-        for elem in body.children:
-            if isinstance(elem, NavigableString):
-                text = str(elem).strip()
-                if text:
-                    elements.append({'type': 'text', 'content': text, 'html': text})
-                continue
-            
-            if not hasattr(elem, 'name') or not elem.name:
-                continue
-            
-            if elem.name == 'ol' or elem.name == 'ul':
-                lis = elem.find_all('li', recursive=False)
-                li_texts = [li.get_text(' ', strip=True) for li in lis]
-                elements.append({
-                    'type': 'list',
-                    'items': li_texts,
-                    'count': len(lis),
-                    'html': str(elem)
-                })
-            elif elem.name == 'table':
-                elements.append({
-                    'type': 'table',
-                    'content': elem.get_text(' ', strip=True),
-                    'html': str(elem),
-                    'is_complex': self._is_complex_table(elem)
-                })
-            elif elem.name == 'p':
-                text = elem.get_text(' ', strip=True)
-                if text:
-                    elements.append({
-                        'type': 'paragraph',
-                        'content': text,
-                        'html': str(elem)
-                    })
-            elif elem.name in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
-                text = elem.get_text(' ', strip=True)
-                if text:
-                    elements.append({
-                        'type': 'heading',
-                        'content': text,
-                        'html': str(elem)
-                    })
+        for kind, elem, text in iter_blocks(body):
+            if kind == 'list':
+                lis = list(elem.iterchildren('li'))
+                is_only = len(lis) == 1
+                for li in lis:
+                    elements.append(_Element('li', element_text(li), li, is_only))
+            else:
+                elements.append(_Element('paragraph' if kind == 'p' else kind, text, elem))
         
         return elements
     
-    def _process_elements(self, elements: List[Dict]) -> List[Dict]:
-        """Process elements to extract questions."""
-        questions = []
-        current_q = None
-        q_num = 0
-        
-        i = 0
-        while i < len(elements):
-            elem = elements[i]
-            elem_type = elem['type']
-            
-            # Check for question start patterns
-            if elem_type == 'list' and elem['count'] == 1:
-                # Single-item list is usually a question start
-                text = elem['items'][0]
-                if self._looks_like_question(text):
-                    # Save previous question
-                    if current_q:
-                        questions.append(self._finalize_question(current_q))
-                    
-                    q_num += 1
-                    current_q = {
-                        'number': q_num,
-                        'text': text,
-                        'options': [],
-                        'tables': [],
-                        'images': []
-                    }
-                    i += 1
-                    continue
-            
-            # Table - add to current question
-            if elem_type == 'table' and current_q:
-                current_q['tables'].append({
-                    'id': str(uuid.uuid4())[:8],
-                    'html': elem['html'],
-                    'is_complex': elem.get('is_complex', False)
-                })
-                i += 1
-                continue
-            
-            # Paragraph - could be continuation, "which of" question, or numbered statement
-            if elem_type == 'paragraph':
-                text = elem['content']
-                
-                # Check if it's a "which of the following" type question part
-                if self._is_question_prompt(text) and current_q:
-                    current_q['text'] += ' ' + text
-                # Numbered statement (1, 2, 3...)
-                elif self._is_numbered_statement(text) and current_q:
-                    current_q['text'] += ' ' + text
-                # Assertion/Reason pattern
-                elif self._is_assertion_reason(text) and current_q:
-                    current_q['text'] += ' ' + text
-                # Standalone question with Q prefix
-                elif self._is_q_prefixed(text):
-                    if current_q:
-                        questions.append(self._finalize_question(current_q))
-                    q_num += 1
-                    current_q = {
-                        'number': q_num,
-                        'text': self._clean_q_prefix(text),
-                        'options': [],
-                        'tables': [],
-                        'images': []
-                    }
-                i += 1
-                continue
-            
-            # Multi-item list - these are options (and sometimes next question mixed in)
-            if elem_type == 'list' and elem['count'] > 1 and current_q:
-                items = elem['items']
-                
-                for item_text in items:
-                    # Check if this item is actually a new question
-                    if self._looks_like_question(item_text) and len(item_text) > 50:
-                        # Save current question first
-                        questions.append(self._finalize_question(current_q))
-                        q_num += 1
-                        current_q = {
-                            'number': q_num,
-                            'text': item_text,
-                            'options': [],
-                            'tables': [],
-                            'images': []
-                        }
-                    else:
-                        # It's an option
-                        opt = self._parse_option(item_text)
-                        if opt:
-                            current_q['options'].append(opt)
-                
-                i += 1
-                continue
-            
-            i += 1
+    def _process_elements(self, elements: List['_Element']) -> List[Dict]:
+        """Process elements to extract questions, one handler per element type."""
+        handlers = {
+            'li': self._on_list_item,
+            'table': self._on_table,
+            'paragraph': self._on_paragraph,
+        }
+        state = _ParseState()
+        for elem in elements:
+            handler = handlers.get(elem.kind)
+            if handler is not None:
+                handler(state, elem)
         
         # Don't forget last question
-        if current_q:
-            questions.append(self._finalize_question(current_q))
+        if state.current_q:
+            state.questions.append(self._finalize_question(state.current_q))
         
-        return questions
+        return state.questions
+    
+    def _start_question(self, state: '_ParseState', text: str):
+        """Finalize the current question, if any, and start the next one."""
+        if state.current_q:
+            state.questions.append(self._finalize_question(state.current_q))
+        
+        state.q_num += 1
+        state.current_q = {
+            'number': state.q_num,
+            'text': text,
+            'options': [],
+            'tables': [],
+            'images': []
+        }
+    
+    def _on_list_item(self, state: '_ParseState', elem: '_Element'):
+        """The item of a single-item list may start a question; items of longer lists are options."""
+        text = elem.content
+        
+        if elem.is_only:
+            # Single-item list is usually a question start
+            if self._looks_like_question(text):
+                self._start_question(state, text)
+        
+        # Multi-item list - these are options (and sometimes next question mixed in)
+        elif state.current_q:
+            # Check if this item is actually a new question
+            if len(text) > 50 and self._looks_like_question(text):
+                self._start_question(state, text)
+            else:
+                # It's an option
+                opt = self._parse_option(text)
+                if opt:
+                    state.current_q['options'].append(opt)
+    
+    def _on_table(self, state: '_ParseState', elem: '_Element'):
+        """Table - add to current question."""
+        if state.current_q:
+            table = elem.element
+            state.current_q['tables'].append({
+                'id': secrets.token_hex(4),
+                'html': element_html(table),
+                'is_complex': self._is_complex_table(table)
+            })
+    
+    def _on_paragraph(self, state: '_ParseState', elem: '_Element'):
+        """Paragraph - could be continuation, "which of" question, or numbered statement."""
+        text = elem.content
+        current_q = state.current_q
+        
+        # Check if it's a "which of the following" type question part
+        if self._is_question_prompt(text) and current_q:
+            current_q['text'] += ' ' + text
+        # Numbered statement (1, 2, 3...)
+        elif self._is_numbered_statement(text) and current_q:
+            current_q['text'] += ' ' + text
+        # Assertion/Reason pattern
+        elif self._is_assertion_reason(text) and current_q:
+            current_q['text'] += ' ' + text
+        # Standalone question with Q prefix
+        elif self._is_q_prefixed(text):
+            self._start_question(state, self._clean_q_prefix(text))
     
     def _looks_like_question(self, text: str) -> bool:
         """Check if text looks like a question."""
@@ -231,90 +295,49 @@ class RobustDocumentParser:
         if len(text) < 15:
             return False
         
-        # Question indicators
-        patterns = [
-            r'consider\s+the\s+following',
-            r'with\s+reference\s+to',
-            r'which\s+of\s+the\s+following',
-            r'select\s+the\s+correct',
-            r'choose\s+the',
-            r'match\s+the\s+following',
-            r'given\s+below',
-            r'following\s+pairs',
-            r'following\s+statements',
-            r'\?$',
-            # Hindi
-            r'निम्नलिखित',
-            r'के\s+संदर्भ\s+में',
-            r'विचार\s+कीजिए',
-            r'सही.*चुनिए',
-        ]
-        
+        # Question indicators; the text is stripped, so a final '?' is the last character
         text_lower = text.lower()
-        for pattern in patterns:
-            if re.search(pattern, text_lower):
-                return True
-        
-        return False
+        if text_lower.endswith('?') or any(s in text_lower for s in _QUESTION_INDICATOR_SUBSTRINGS):
+            return True
+        return bool(_QUESTION_INDICATOR_RE.search(text_lower))
     
     def _is_question_prompt(self, text: str) -> bool:
         """Check if text is a question prompt like 'Which of the above...'"""
-        prompts = [
-            r'^which\s+of\s+the',
-            r'^select\s+the\s+correct',
-            r'^choose\s+the\s+correct',
-            r'^the\s+correct\s+',
-            r'^ऊपर\s+दिए',
-            r'^उपर्युक्त',
-            r'^सही\s+उत्तर',
-        ]
-        
         text_lower = text.lower().strip()
-        for pattern in prompts:
-            if re.match(pattern, text_lower):
-                return True
-        
-        return False
+        return bool(_QUESTION_PROMPT_RE.match(text_lower))
     
     def _is_numbered_statement(self, text: str) -> bool:
         """Check if text is a numbered statement like '1 statement...'"""
-        return bool(re.match(r'^\s*[1-9]\s+\w', text))
+        return bool(_NUMBERED_STATEMENT_RE.match(text))
     
     def _is_assertion_reason(self, text: str) -> bool:
         """Check if text is Assertion/Reason pattern."""
-        return bool(re.match(r'^\s*(Assertion|Reason|अभिकथन|कारण)', text, re.IGNORECASE))
+        return bool(_ASSERTION_REASON_RE.match(text))
     
     def _is_q_prefixed(self, text: str) -> bool:
         """Check if text starts with Q1. or similar."""
-        return bool(re.match(r'^\s*Q\.?\s*\d+[\.\):]', text, re.IGNORECASE))
+        return bool(_Q_PREFIX_RE.match(text))
     
     def _clean_q_prefix(self, text: str) -> str:
         """Remove Q1. prefix from text."""
-        return re.sub(r'^\s*Q\.?\s*\d+[\.\):]\s*', '', text).strip()
+        return _Q_PREFIX_STRIP_RE.sub('', text).strip()
     
     def _parse_option(self, text: str) -> Optional[Dict]:
         """Parse option text."""
         text = text.strip()
+        first = text[:1]
         
         # Standard option patterns
-        patterns = [
-            r'^\s*[\(\[]?\s*([A-Da-d])\s*[\)\]\.:\-]\s*(.+)$',
-            r'^\s*([1-4])\s*[\)\]\.:\-]\s*(.+)$',
-        ]
-        
-        for pattern in patterns:
-            match = re.match(pattern, text, re.DOTALL)
-            if match:
-                label = match.group(1).upper()
-                if label.isdigit():
-                    label = chr(ord('A') + int(label) - 1)
-                return {
-                    'label': label,
-                    'text': match.group(2).strip()
-                }
+        parts = _split_option(text) if first in _OPTION_PREFIX_CHARS else None
+        if parts is not None:
+            label, content = parts
+            return {
+                'label': label,
+                'text': content
+            }
         
         # Handle text that looks like an option but no clear prefix
-        if self._looks_like_option_content(text):
+        if first in _OPTION_CONTENT_CHARS and self._looks_like_option_content(text):
             return {
                 'label': '?',
                 'text': text
@@ -324,19 +347,7 @@ class RobustDocumentParser:
     
     def _looks_like_option_content(self, text: str) -> bool:
         """Check if text content looks like an option."""
-        patterns = [
-            r'^only\s+[0-9]',
-            r'^[0-9]+\s*(?:and|&)\s*[0-9]+',
-            r'^(?:Both|Neither|All|None)',
-            r'^(?:केवल|दोनों|न\s+तो)',
-            r'^[A-D]-[0-9]',
-        ]
-        
-        for pattern in patterns:
-            if re.match(pattern, text, re.IGNORECASE):
-                return True
-        
-        return False
+        return bool(_OPTION_CONTENT_RE.match(text))
     
     def _finalize_question(self, q: Dict) -> Dict:
         """Finalize a question - normalize options, clean up text."""
@@ -344,7 +355,7 @@ class RobustDocumentParser:
         q['options'] = self._normalize_options(q['options'])
         
         # Clean up question text
-        q['text'] = re.sub(r'\s+', ' ', q['text']).strip()
+        q['text'] = _collapse_whitespace(q['text'])
         
         return q
     
@@ -353,35 +364,33 @@ class RobustDocumentParser:
         if not options:
             return []
         
-        # Separate labeled and unlabeled
-        labeled = [o for o in options if o.get('label') != '?']
-        unlabeled = [o for o in options if o.get('label') == '?']
-        
-        # Assign labels to unlabeled
-        used = set(o['label'] for o in labeled)
-        available = [l for l in ['A', 'B', 'C', 'D', 'E', 'F'] if l not in used]
+        # One pass: labeled options (always A-D) go straight into their
+        # label's slot, and a bitmask records the labels taken (bit 0 = 'A')
+        slots = {label: [] for label in _OPTION_ORDER}
+        unlabeled = []
+        used = 0
+        for o in options:
+            label = o['label']
+            if label == '?':
+                unlabeled.append(o)
+            else:
+                slots[label].append(o)
+                used |= 1 << (ord(label) - 65)
         
-        for i, opt in enumerate(unlabeled):
-            if i < len(available):
-                opt['label'] = available[i]
+        # Assign free labels among A-F, in order, to unlabeled options. Any left
+        # over keep '?', which sorts before A; within a label, labeled options
+        # come first
+        free = (b for b in range(6) if not used >> b & 1)
+        for opt, b in zip(unlabeled, free):
+            opt['label'] = chr(65 + b)
+        for o in unlabeled:
+            slots[o['label']].append(o)
         
-        all_opts = labeled + unlabeled
-        all_opts.sort(key=lambda x: x.get('label', 'Z'))
-        
-        return all_opts[:6]
+        return [o for label in _OPTION_ORDER for o in slots[label]][:6]
     
-    def _is_complex_table(self, table: Tag) -> bool:
+    def _is_complex_table(self, table: HtmlElement) -> bool:
         """Check if table is complex."""
-        if table.find(attrs={'colspan': True}) or table.find(attrs={'rowspan': True}):
-            return True
-        if table.find_all('table'):
-            return True
-        rows = table.find_all('tr')
-        if rows:
-            counts = [len(r.find_all(['td', 'th'])) for r in rows]
-            if len(set(counts)) > 1:
-                return True
-        return False
+        return is_complex_table(table)
 
 
 # Convenience function
@@ -389,3 +398,13 @@ def parse_document(file_path: str, job_id: str, upload_dir: str = "/tmp/qs-forma
     """Parse a DOCX document and return list of questions."""
     parser = RobustDocumentParser(upload_dir)
     return parser.parse_file(file_path, job_id)
+
+
+def parse_documents(file_paths: List[str], job_ids: List[str], upload_dir: str = "/tmp/qs-formatter",
+                    max_workers: Optional[int] = None) -> List[List[Dict]]:
+    """
+    Parse several DOCX documents, in parallel worker processes when there is more than one.
+    Returns one list of questions per document, in input order.
+    """
+    return map_in_processes(parse_document, file_paths, job_ids, repeat(upload_dir),
+                            max_workers=max_workers)
@@ -12,78 +12,211 @@ Flags questions/options that contain "(Image)" for manual review.
 """
 import os
 import re
-import uuid
+import secrets
 import base64
-from typing import Optional, List, Dict, Any, Tuple
-from bs4 import BeautifulSoup, Tag, NavigableString
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from typing import Optional, List, Dict, Any, Set, Tuple
+from lxml import etree
+from lxml.html import HtmlElement
 import mammoth
 
+from .html_blocks import parse_body, element_html
+from .question_types import detect_question_type
+from .parallel import map_in_processes
 
-def extract_text_and_html(element: Tag) -> tuple[str, str]:
-    """Extract plain text and inner HTML from an element."""
-    text = element.get_text(strip=True)
-    html = ''.join(str(c) for c in element.children)
-    return text, html
 
+# Compiled XPath lookups, evaluated by libxml2 instead of walking the tree in Python
+_ALL_OLS = etree.XPath('.//ol')
+_CHILD_LIS = etree.XPath('./li')
+_MOCK_ITEMS = etree.XPath('./ol/li|./p')
+# src of every <img> holding a base64 data: URL
+_DATA_IMG_SRCS = etree.XPath(".//img/@src[starts-with(., 'data:image')]", smart_strings=False)
+_TABLES = etree.XPath('.//table')
+# Table size in one XPath call each: all rows, and the cells of the first row
+_TABLE_ROW_COUNT = etree.XPath('count(.//tr)')
+_FIRST_ROW_CELL_COUNT = etree.XPath('count((.//tr)[1]//*[self::td or self::th])')
 
-def check_needs_image(text: str) -> bool:
-    """Check if text contains (Image) marker indicating manual image insertion needed."""
-    return '(Image)' in text or '(image)' in text.lower()
+# Words and marks that make a longer text look like a question, matched in
+# one scan of the lowercased text rather than one substring search each
+_QUESTION_PATTERNS = (
+    'which', 'what', 'who', 'when', 'where', 'how', 'why',
+    'select', 'choose', 'find', 'identify', 'consider',
+    'following', 'statement', 'assertion', 'match',
+    '?', 'निम्न', 'कौन', 'क्या', 'किस', 'चुनें', 'चयन'
+)
+_QUESTION_PATTERN_RE = re.compile('|'.join(map(re.escape, _QUESTION_PATTERNS)))
+# The same without the Hindi words, for ASCII-only text (which is most
+# English text); str.isascii() is a constant-time flag check in CPython
+_ASCII_QUESTION_PATTERN_RE = re.compile(
+    '|'.join(re.escape(p) for p in _QUESTION_PATTERNS if p.isascii())
+)
 
+# "(image)" in any letter case, without making a lowercase copy of the text.
+# Spelled out instead of re.IGNORECASE, which would also accept a Turkish
+# dotted or dotless i that str.lower() leaves alone
+_IMAGE_MARKER_RE = re.compile(r'\([Ii][Mm][Aa][Gg][Ee]\)')
 
-def extract_images(element: Tag, job_id: str, upload_dir: str) -> List[Dict]:
-    """Extract images from an element and save them."""
-    images = []
-    for img in element.find_all('img'):
-        src = img.get('src', '')
-        if src.startswith('data:image'):
-            # Base64 encoded image
+# Bare option labels (numbers and letters)
+_OPTION_LABELS = frozenset('1234ABCDabcd')
+
+
+def extract_text(element: HtmlElement) -> str:
+    """Extract the plain text of an element, each text piece stripped."""
+    return ''.join(s.strip() for s in element.itertext())
+
+
+def check_needs_image(text: str, text_lower: Optional[str] = None) -> bool:
+    """
+    Check if text contains (Image) marker indicating manual image insertion needed.
+    text_lower, when given, is text.lower() already computed by the caller.
+    """
+    if '(Image)' in text:
+        return True
+    if text_lower is not None:
+        return '(image)' in text_lower
+    return _IMAGE_MARKER_RE.search(text) is not None
+
+
+def _write_image(item: Tuple[str, bytes]) -> bool:
+    """Write one decoded image to its path. Returns False if the write failed."""
+    path, data = item
+    try:
+        with open(path, 'wb') as f:
+            f.write(data)
+        return True
+    except OSError as e:
+        print(f"Warning: Failed to write image {path}: {e}")
+        return False
+
+
+class ImageWriter:
+    """
+    Queue of decoded images for one job, written to disk together by flush().
+    Image directories are created once per flush instead of once per image,
+    and the files are written from a small thread pool.
+    """
+    
+    MAX_WORKERS = 8
+    
+    def __init__(self):
+        self._pending: List[Tuple[str, bytes]] = []
+    
+    def add(self, path: str, data: bytes) -> None:
+        """Queue image bytes to be written to path."""
+        self._pending.append((path, data))
+    
+    def flush(self) -> Set[str]:
+        """
+        Write every queued image and empty the queue.
+        Returns the paths that could not be written.
+        """
+        pending, self._pending = self._pending, []
+        if not pending:
+            return set()
+        
+        for img_dir in {os.path.dirname(path) for path, _ in pending}:
             try:
-                # Parse data URL
-                header, data = src.split(',', 1)
-                # Get mime type
-                mime_match = re.search(r'data:(image/[^;]+)', header)
-                mime_type = mime_match.group(1) if mime_match else 'image/png'
-                ext = mime_type.split('/')[-1]
-                
-                # Generate filename
-                img_id = str(uuid.uuid4())[:8]
-                filename = f"{img_id}.{ext}"
-                
-                # Save image
-                img_dir = os.path.join(upload_dir, job_id, 'images')
                 os.makedirs(img_dir, exist_ok=True)
-                img_path = os.path.join(img_dir, filename)
-                
-                with open(img_path, 'wb') as f:
-                    f.write(base64.b64decode(data))
-                
-                images.append({
-                    'id': img_id,
-                    'path': img_path,
-                    'content_type': mime_type,
-                    'filename': filename
-                })
-            except Exception as e:
-                print(f"Warning: Failed to extract image: {e}")
+            except OSError as e:
+                # The writes into it fail too, and are reported below
+                print(f"Warning: Failed to create image directory {img_dir}: {e}")
+        
+        if len(pending) == 1:
+            written = [_write_image(pending[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.MAX_WORKERS, len(pending))) as pool:
+                written = list(pool.map(_write_image, pending))
+        
+        return {path for (path, _), ok in zip(pending, written) if not ok}
+
+
+def _drop_images(questions: List[Dict], paths: Set[str]) -> None:
+    """Remove the image entries of questions and options whose files are at paths."""
+    if not paths:
+        return
+    for q in questions:
+        q['images'] = [img for img in q['images'] if img['path'] not in paths]
+        for opt in q['options']:
+            opt['images'] = [img for img in opt['images'] if img['path'] not in paths]
+
+
+def extract_images(element: HtmlElement, job_id: str, upload_dir: str,
+                   writer: Optional[ImageWriter] = None) -> List[Dict]:
+    """
+    Extract images from an element and save them.
+    With a writer, the decoded images are only queued on it and are on disk
+    after writer.flush(), which reports the ones that failed; otherwise they
+    are written before returning, and images that fail to write are left out.
+    """
+    # Most items have no embedded image; skip them before any other work
+    srcs = _DATA_IMG_SRCS(element)
+    if not srcs:
+        return []
     
+    own_writer = writer is None
+    if own_writer:
+        writer = ImageWriter()
+    images = []
+    for src in srcs:
+        # Base64 encoded image
+        try:
+            # Parse data URL
+            header, data = src.split(',', 1)
+            # Get mime type
+            mime_match = re.search(r'data:(image/[^;]+)', header)
+            mime_type = mime_match.group(1) if mime_match else 'image/png'
+            ext = mime_type.split('/')[-1]
+            
+            # Generate filename
+            img_id = secrets.token_hex(4)
+            filename = f"{img_id}.{ext}"
+            
+            # Queue the decoded image for saving
+            img_path = os.path.join(upload_dir, job_id, 'images', filename)
+            writer.add(img_path, base64.b64decode(data))
+            
+            images.append({
+                'id': img_id,
+                'path': img_path,
+                'content_type': mime_type,
+                'filename': filename
+            })
+        except Exception as e:
+            print(f"Warning: Failed to extract image: {e}")
+    
+    if own_writer:
+        failed = writer.flush()
+        if failed:
+            images = [img for img in images if img['path'] not in failed]
     return images
 
 
+def extract_tables(element: HtmlElement) -> List[Dict]:
+    """Serialize the tables inside an element, with their row and column counts."""
+    return [
+        {
+            'id': secrets.token_hex(4),
+            'html': element_html(table),
+            'rows': int(_TABLE_ROW_COUNT(table)),
+            'cols': int(_FIRST_ROW_CELL_COUNT(table))
+        }
+        for table in _TABLES(element)
+    ]
+
+
 def is_question_text(text: str) -> bool:
     """Check if text looks like a question (long, has question patterns)."""
     if len(text) < 30:
         return False
     
-    question_patterns = [
-        'which', 'what', 'who', 'when', 'where', 'how', 'why',
-        'select', 'choose', 'find', 'identify', 'consider',
-        'following', 'statement', 'assertion', 'match',
-        '?', 'निम्न', 'कौन', 'क्या', 'किस', 'चुनें', 'चयन'
-    ]
+    if len(text) > 60:
+        return True
     
     text_lower = text.lower()
-    return any(p in text_lower for p in question_patterns) or len(text) > 60
+    if text_lower.isascii():
+        return _ASCII_QUESTION_PATTERN_RE.search(text_lower) is not None
+    return _QUESTION_PATTERN_RE.search(text_lower) is not None
 
 
 def is_option_text(text: str) -> bool:
@@ -91,178 +224,121 @@ def is_option_text(text: str) -> bool:
     text = text.strip()
     if len(text) == 0:
         return True  # Empty items are likely image placeholders
-    if len(text) <= 3 and text in ['1', '2', '3', '4', 'A', 'B', 'C', 'D', 'a', 'b', 'c', 'd']:
+    if text in _OPTION_LABELS:
         return True
     if len(text) < 100:
         return True
     return False
 
 
-def detect_question_type(text: str) -> str:
-    """Detect question type from text patterns."""
-    text_lower = text.lower()
-    if 'assertion' in text_lower or 'reason' in text_lower:
-        return 'assertion-reason'
-    elif 'match' in text_lower or 'matching' in text_lower:
-        return 'matching'
-    elif 'how many' in text_lower or 'कितने' in text:
-        return 'how-many'
-    elif any(x in text_lower for x in ['statement', 'statements', 'कथन', 'कथनों']):
-        return 'statement-based'
-    elif 'figure' in text_lower or 'image' in text_lower or 'diagram' in text_lower:
-        return 'figure-based'
-    return 'single'
-
-
-def parse_standard_ol(items: List[Tag], start_q_id: int, job_id: str, upload_dir: str) -> List[Dict]:
+def _make_option(label: str, text: str, images: List[Dict]) -> Dict:
+    """Build an option record, marking it when its text asks for an image."""
+    return {
+        'label': label,
+        'english_text': text,
+        'hindi_text': '',
+        'is_correct': False,
+        'images': images,
+        'needs_image': check_needs_image(text)
+    }
+
+
+def _make_question(q_id: int, text: str, options: List[Dict], tables: List[Dict],
+                   images: List[Dict], question_type: Optional[str] = None) -> Dict:
+    """
+    Build a question record with empty answer and solution fields.
+    The question type is detected from the text unless given. Flags note a
+    question or options that still need images inserted.
+    """
+    if question_type is None:
+        # Lowercase the text once for both checks
+        text_lower = text.lower()
+        needs_image = check_needs_image(text, text_lower)
+        question_type = detect_question_type(text, text_lower)
+    else:
+        needs_image = check_needs_image(text)
+    
+    flags = []
+    if needs_image:
+        flags.append('needs_image')
+    if any(opt['needs_image'] for opt in options):
+        flags.append('options_need_images')
+    
+    return {
+        'id': q_id,
+        'english_text': text,
+        'hindi_text': '',
+        'question_type': question_type,
+        'options': options,
+        'answer': '',
+        'solution_english': '',
+        'solution_hindi': '',
+        'grading': '',
+        'tables': tables,
+        'images': images,
+        'confidence': 1.0,
+        'flags': flags,
+        'needs_image': needs_image
+    }
+
+
+def parse_standard_ol(items: List[HtmlElement], start_q_id: int, job_id: str, upload_dir: str,
+                      writer: Optional[ImageWriter] = None) -> List[Dict]:
     """Parse OL with standard structure: Question + 4 options."""
     questions = []
-    num_items = len(items)
-    q_id = start_q_id
-    i = 0
+    option_labels = ['A', 'B', 'C', 'D']
     
-    while i + 4 < num_items:
-        q_li = items[i]
-        q_text, q_html = extract_text_and_html(q_li)
+    # Strided slices yield each (question, 4 options) group directly;
+    # zip stops before an incomplete group at the end
+    groups = zip(items[0::5], items[1::5], items[2::5], items[3::5], items[4::5])
+    for q_id, (q_li, *opt_lis) in enumerate(groups, start_q_id):
+        q_text = extract_text(q_li)
         
         # Get images from question
-        q_images = extract_images(q_li, job_id, upload_dir)
+        q_images = extract_images(q_li, job_id, upload_dir, writer)
         
         # Get the 4 options
         options = []
-        option_labels = ['A', 'B', 'C', 'D']
-        
-        for j in range(4):
-            opt_li = items[i + 1 + j]
-            opt_text, opt_html = extract_text_and_html(opt_li)
-            opt_images = extract_images(opt_li, job_id, upload_dir)
-            needs_img = check_needs_image(opt_text)
-            
-            options.append({
-                'label': option_labels[j],
-                'english_text': opt_text,
-                'hindi_text': '',
-                'is_correct': False,
-                'images': opt_images,
-                'needs_image': needs_img
-            })
+        for label, opt_li in zip(option_labels, opt_lis):
+            opt_text = extract_text(opt_li)
+            opt_images = extract_images(opt_li, job_id, upload_dir, writer)
+            options.append(_make_option(label, opt_text, opt_images))
         
         # Get tables from question
-        tables = []
-        for table in q_li.find_all('table'):
-            tables.append({
-                'id': str(uuid.uuid4())[:8],
-                'html': str(table),
-                'rows': len(table.find_all('tr')),
-                'cols': len(table.find('tr').find_all(['td', 'th'])) if table.find('tr') else 0
-            })
-        
-        # Check if question needs image
-        q_needs_image = check_needs_image(q_text)
-        flags = []
-        if q_needs_image:
-            flags.append('needs_image')
-        if any(opt.get('needs_image') for opt in options):
-            flags.append('options_need_images')
+        tables = extract_tables(q_li)
         
-        question = {
-            'id': q_id,
-            'english_text': q_text,
-            'hindi_text': '',
-            'question_type': detect_question_type(q_text),
-            'options': options,
-            'answer': '',
-            'solution_english': '',
-            'solution_hindi': '',
-            'grading': '',
-            'tables': tables,
-            'images': q_images,
-            'confidence': 1.0,
-            'flags': flags,
-            'needs_image': q_needs_image
-        }
-        
-        questions.append(question)
-        q_id += 1
-        i += 5
+        questions.append(_make_question(q_id, q_text, options, tables, q_images))
     
     return questions
 
 
-def parse_reversed_ol(items: List[Tag], start_q_id: int, job_id: str, upload_dir: str) -> List[Dict]:
+def parse_reversed_ol(items: List[HtmlElement], start_q_id: int, job_id: str, upload_dir: str,
+                      writer: Optional[ImageWriter] = None) -> List[Dict]:
     """Parse OL with reversed structure: 4 options + Question (for figure questions)."""
     questions = []
-    num_items = len(items)
-    q_id = start_q_id
-    i = 0
+    option_labels = ['A', 'B', 'C', 'D']
     
-    while i + 4 < num_items:
-        # In reversed structure: items[0-3] are options, items[4] is question
-        option_labels = ['A', 'B', 'C', 'D']
+    # In reversed structure each group of 5 is 4 options, then the question
+    groups = zip(items[0::5], items[1::5], items[2::5], items[3::5], items[4::5])
+    for q_id, (*opt_lis, q_li) in enumerate(groups, start_q_id):
         options = []
-        
-        for j in range(4):
-            opt_li = items[i + j]
-            opt_text, opt_html = extract_text_and_html(opt_li)
-            opt_images = extract_images(opt_li, job_id, upload_dir)
-            needs_img = check_needs_image(opt_text)
-            
-            options.append({
-                'label': option_labels[j],
-                'english_text': opt_text,
-                'hindi_text': '',
-                'is_correct': False,
-                'images': opt_images,
-                'needs_image': needs_img
-            })
+        for label, opt_li in zip(option_labels, opt_lis):
+            opt_text = extract_text(opt_li)
+            opt_images = extract_images(opt_li, job_id, upload_dir, writer)
+            options.append(_make_option(label, opt_text, opt_images))
         
         # Question is the 5th item
-        q_li = items[i + 4]
-        q_text, q_html = extract_text_and_html(q_li)
-        q_images = extract_images(q_li, job_id, upload_dir)
+        q_text = extract_text(q_li)
+        q_images = extract_images(q_li, job_id, upload_dir, writer)
         
-        tables = []
-        for table in q_li.find_all('table'):
-            tables.append({
-                'id': str(uuid.uuid4())[:8],
-                'html': str(table),
-                'rows': len(table.find_all('tr')),
-                'cols': len(table.find('tr').find_all(['td', 'th'])) if table.find('tr') else 0
-            })
-        
-        # Check if question needs image
-        q_needs_image = check_needs_image(q_text)
-        flags = []
-        if q_needs_image:
-            flags.append('needs_image')
-        if any(opt.get('needs_image') for opt in options):
-            flags.append('options_need_images')
-        
-        question = {
-            'id': q_id,
-            'english_text': q_text,
-            'hindi_text': '',
-            'question_type': 'figure-based',
-            'options': options,
-            'answer': '',
-            'solution_english': '',
-            'solution_hindi': '',
-            'grading': '',
-            'tables': tables,
-            'images': q_images,
-            'confidence': 1.0,
-            'flags': flags,
-            'needs_image': q_needs_image
-        }
+        tables = extract_tables(q_li)
         
-        questions.append(question)
-        q_id += 1
-        i += 5
+        questions.append(_make_question(q_id, q_text, options, tables, q_images, 'figure-based'))
     
     return questions
 
 
-def detect_ol_structure(items: List[Tag]) -> str:
+def detect_ol_structure(items: List[HtmlElement]) -> str:
     """
     Detect whether OL has standard (Q+4opts) or reversed (4opts+Q) structure.
     Returns 'standard', 'reversed', or 'mixed'.
@@ -270,23 +346,23 @@ def detect_ol_structure(items: List[Tag]) -> str:
     if len(items) < 5:
         return 'unknown'
     
-    # Check first 5 items
-    first_5_lengths = [len(items[i].get_text().strip()) for i in range(min(5, len(items)))]
-    
     # Standard: first item is long (question), next 4 are short (options)
     # Reversed: first 4 are short (options), 5th is long (question)
+    # Item texts are measured only as far as the decision needs them
+    def length(i: int) -> int:
+        return len(items[i].text_content().strip())
     
-    if first_5_lengths[0] > 50 and all(l < 100 for l in first_5_lengths[1:5]):
+    # A long first item always means standard, whatever the options look like
+    first_len = length(0)
+    if first_len > 50:
         return 'standard'
-    elif all(l < 50 for l in first_5_lengths[:4]) and first_5_lengths[4] > 30:
+    
+    # If item[0] is short and item[4] is long, likely reversed
+    fifth_len = length(4)
+    if first_len < 30 and fifth_len > 40:
+        return 'reversed'
+    if first_len < 50 and fifth_len > 30 and all(length(i) < 50 for i in range(1, 4)):
         return 'reversed'
-    else:
-        # Check more items to determine
-        # If item[0] is short and item[4] is long, likely reversed
-        if first_5_lengths[0] < 30 and first_5_lengths[4] > 40:
-            return 'reversed'
-        elif first_5_lengths[0] > 40:
-            return 'standard'
     
     return 'standard'  # Default
 
@@ -304,28 +380,26 @@ def parse_docx_smart(file_path: str, job_id: str, upload_dir: str) -> list[dict]
         result = mammoth.convert_to_html(f)
         html = result.value
     
-    soup = BeautifulSoup(html, 'html.parser')
-    all_ols = soup.find_all('ol')
+    body = parse_body(html)
+    all_ols = _ALL_OLS(body)
     
     if not all_ols:
         print("Warning: No ordered lists found in document")
         return []
     
+    # Images found while parsing are queued here and written in one batch
+    writer = ImageWriter()
+    
     # First, try to detect MOCK format (flattened li + p structure)
     # MOCK format has many small OLs with <p> elements between them
-    # Count total <li> items and <p> items
-    all_items = []
-    for child in soup.body.children if soup.body else soup.children:
-        if isinstance(child, NavigableString):
-            continue
-        if child.name == 'ol':
-            for li in child.find_all('li', recursive=False):
-                all_items.append(('li', li.get_text().strip(), li))
-        elif child.name == 'p':
-            all_items.append(('p', child.get_text().strip(), child))
+    # Tags, texts and elements of every top-level <p> and every item of a
+    # top-level <ol>, as parallel lists in document order (one XPath query)
+    els = _MOCK_ITEMS(body)
+    tags = [el.tag for el in els]
+    texts = [el.text_content().strip() for el in els]
     
-    li_count = len([x for x in all_items if x[0] == 'li'])
-    p_count = len([x for x in all_items if x[0] == 'p'])
+    li_count = tags.count('li')
+    p_count = len(tags) - li_count
     
     # MOCK format detection: 
     # - Has <p> elements interspersed with <li> elements (p_count >= 5)
@@ -334,41 +408,53 @@ def parse_docx_smart(file_path: str, job_id: str, upload_dir: str) -> list[dict]
     # - li_count % 5 should be 0-4 (close to divisible)
     if p_count >= 5 and li_count >= 50 and (li_count % 5) <= 4:
         # Likely MOCK format - try parsing it
-        mock_questions = parse_mock_format(all_items, job_id, upload_dir)
+        mock_questions = parse_mock_format(tags, texts, els, job_id, upload_dir, writer)
         if mock_questions:
+            _drop_images(mock_questions, writer.flush())
             print(f"Parsed {len(mock_questions)} questions using MOCK format parser")
             return mock_questions
     
-    # Fall back to original OL-based parsing
-    # Categorize OLs by size
-    ol_sizes = [(ol, len(ol.find_all('li', recursive=False))) for ol in all_ols]
-    
-    # All OLs with 5+ items can contain questions
-    parseable_ols = [(ol, size) for ol, size in ol_sizes if size >= 5]
+    # Fall back to original OL-based parsing. Items of top-level OLs were
+    # already collected above; only nested OLs need their own lookup
+    ol_items = {}
+    for el, tag in zip(els, tags):
+        if tag == 'li':
+            ol_items.setdefault(el.getparent(), []).append(el)
     
     questions = []
     q_id = 1
+    parseable_count = 0
     
-    for ol, size in parseable_ols:
-        items = ol.find_all('li', recursive=False)
+    for ol in all_ols:
+        items = ol_items.get(ol)
+        if items is None:
+            items = _CHILD_LIS(ol)
+        
+        # Only OLs with 5+ items can contain questions
+        if len(items) < 5:
+            continue
+        parseable_count += 1
         
         # Detect structure based on content
         structure = detect_ol_structure(items)
         
         if structure == 'reversed':
-            parsed = parse_reversed_ol(items, q_id, job_id, upload_dir)
+            parsed = parse_reversed_ol(items, q_id, job_id, upload_dir, writer)
         else:
-            parsed = parse_standard_ol(items, q_id, job_id, upload_dir)
+            parsed = parse_standard_ol(items, q_id, job_id, upload_dir, writer)
         
         questions.extend(parsed)
         q_id += len(parsed)
     
-    print(f"Parsed {len(questions)} questions from {len(parseable_ols)} OLs")
+    _drop_images(questions, writer.flush())
+    print(f"Parsed {len(questions)} questions from {parseable_count} OLs")
     
     return questions
 
 
-def parse_mock_format(all_items: List[Tuple], job_id: str, upload_dir: str) -> List[Dict]:
+def parse_mock_format(tags: List[str], texts: List[str], els: List[HtmlElement],
+                      job_id: str, upload_dir: str,
+                      writer: Optional[ImageWriter] = None) -> List[Dict]:
     """
     Parse MOCK format where structure is:
     <li>Question text</li>
@@ -381,14 +467,16 @@ def parse_mock_format(all_items: List[Tuple], job_id: str, upload_dir: str) -> L
     ...
     
     Also handles edge case where options are split across OL blocks due to page breaks.
+    Items are given as parallel lists: tags ('li' or 'p'), texts and elements.
     """
     questions = []
+    num_items = len(tags)
     i = 0
     q_id = 1
     pending_question = None  # Store question that's waiting for options
     
-    while i < len(all_items):
-        tag, text, el = all_items[i]
+    while i < num_items:
+        tag, text, el = tags[i], texts[i], els[i]
         
         if tag == 'li':
             # Check if we have a pending question waiting for options
@@ -400,20 +488,11 @@ def parse_mock_format(all_items: List[Tuple], job_id: str, upload_dir: str) -> L
                 start_i = i
                 
                 for j in range(4):
-                    if i < len(all_items) and all_items[i][0] == 'li':
-                        opt_text = all_items[i][1]
-                        opt_el = all_items[i][2]
-                        opt_images = extract_images(opt_el, job_id, upload_dir) if isinstance(opt_el, Tag) else []
-                        needs_image = check_needs_image(opt_text)
-                        
-                        options.append({
-                            'label': option_labels[j],
-                            'english_text': opt_text,
-                            'hindi_text': '',
-                            'is_correct': False,
-                            'images': opt_images,
-                            'needs_image': needs_image
-                        })
+                    if i < num_items and tags[i] == 'li':
+                        opt_text = texts[i]
+                        opt_el = els[i]
+                        opt_images = extract_images(opt_el, job_id, upload_dir, writer) if isinstance(opt_el, HtmlElement) else []
+                        options.append(_make_option(option_labels[j], opt_text, opt_images))
                         i += 1
                     else:
                         break
@@ -421,29 +500,7 @@ def parse_mock_format(all_items: List[Tuple], job_id: str, upload_dir: str) -> L
                 if len(options) == 4:
                     # Successfully got 4 options for the pending question
                     pq = pending_question
-                    needs_image = check_needs_image(pq['question_text'])
-                    flags = []
-                    if needs_image:
-                        flags.append('needs_image')
-                    if any(opt.get('needs_image') for opt in options):
-                        flags.append('options_need_images')
-                    
-                    questions.append({
-                        'id': q_id,
-                        'english_text': pq['question_text'],
-                        'hindi_text': '',
-                        'question_type': detect_question_type(pq['question_text']),
-                        'options': options,
-                        'answer': '',
-                        'solution_english': '',
-                        'solution_hindi': '',
-                        'grading': '',
-                        'tables': [],
-                        'images': pq['images'],
-                        'confidence': 1.0,
-                        'flags': flags,
-                        'needs_image': needs_image
-                    })
+                    questions.append(_make_question(q_id, pq['question_text'], options, [], pq['images']))
                     q_id += 1
                     pending_question = None
                     continue
@@ -454,15 +511,15 @@ def parse_mock_format(all_items: List[Tuple], job_id: str, upload_dir: str) -> L
             
             # This should be a question
             question_text = text
-            q_images = extract_images(el, job_id, upload_dir) if isinstance(el, Tag) else []
+            q_images = extract_images(el, job_id, upload_dir, writer) if isinstance(el, HtmlElement) else []
             i += 1
             
             # Collect ALL consecutive <p> elements as supplementary text
-            while i < len(all_items) and all_items[i][0] == 'p':
-                question_text += "\n" + all_items[i][1]
+            while i < num_items and tags[i] == 'p':
+                question_text += "\n" + texts[i]
                 # Also extract images from <p> elements
-                if isinstance(all_items[i][2], Tag):
-                    q_images.extend(extract_images(all_items[i][2], job_id, upload_dir))
+                if isinstance(els[i], HtmlElement):
+                    q_images.extend(extract_images(els[i], job_id, upload_dir, writer))
                 i += 1
             
             # Next 4 items should be options
@@ -470,53 +527,18 @@ def parse_mock_format(all_items: List[Tuple], job_id: str, upload_dir: str) -> L
             option_labels = ['A', 'B', 'C', 'D']
             
             for j in range(4):
-                if i < len(all_items) and all_items[i][0] == 'li':
-                    opt_text = all_items[i][1]
-                    opt_el = all_items[i][2]
-                    opt_images = extract_images(opt_el, job_id, upload_dir) if isinstance(opt_el, Tag) else []
+                if i < num_items and tags[i] == 'li':
+                    opt_text = texts[i]
+                    opt_el = els[i]
+                    opt_images = extract_images(opt_el, job_id, upload_dir, writer) if isinstance(opt_el, HtmlElement) else []
                     
-                    # Check if option needs image
-                    needs_image = check_needs_image(opt_text)
-                    
-                    options.append({
-                        'label': option_labels[j],
-                        'english_text': opt_text,
-                        'hindi_text': '',
-                        'is_correct': False,
-                        'images': opt_images,
-                        'needs_image': needs_image
-                    })
+                    options.append(_make_option(option_labels[j], opt_text, opt_images))
                     i += 1
                 else:
                     break
             
             if len(options) == 4:
-                # Check if question needs image
-                needs_image = check_needs_image(question_text)
-                
-                # Build flags list
-                flags = []
-                if needs_image:
-                    flags.append('needs_image')
-                if any(opt.get('needs_image') for opt in options):
-                    flags.append('options_need_images')
-                
-                questions.append({
-                    'id': q_id,
-                    'english_text': question_text,
-                    'hindi_text': '',
-                    'question_type': detect_question_type(question_text),
-                    'options': options,
-                    'answer': '',
-                    'solution_english': '',
-                    'solution_hindi': '',
-                    'grading': '',
-                    'tables': [],
-                    'images': q_images,
-                    'confidence': 1.0,
-                    'flags': flags,
-                    'needs_image': needs_image
-                })
+                questions.append(_make_question(q_id, question_text, options, [], q_images))
                 q_id += 1
             elif len(options) == 0:
                 # No options found immediately after question
@@ -531,8 +553,8 @@ def parse_mock_format(all_items: List[Tuple], job_id: str, upload_dir: str) -> L
             if pending_question is not None:
                 # Add this <p> text to the pending question
                 pending_question['question_text'] += "\n" + text
-                if isinstance(el, Tag):
-                    pending_question['images'].extend(extract_images(el, job_id, upload_dir))
+                if isinstance(el, HtmlElement):
+                    pending_question['images'].extend(extract_images(el, job_id, upload_dir, writer))
             i += 1
     
     return questions
@@ -543,6 +565,16 @@ def parse_document(file_path: str, job_id: str, upload_dir: str) -> list[dict]:
     return parse_docx_smart(file_path, job_id, upload_dir)
 
 
+def parse_documents(file_paths: List[str], job_ids: List[str], upload_dir: str,
+                    max_workers: Optional[int] = None) -> List[List[Dict]]:
+    """
+    Parse several documents (e.g. the English and Hindi files of a job).
+    Each document is parsed in its own worker process; results keep input order.
+    """
+    return map_in_processes(parse_document, file_paths, job_ids, repeat(upload_dir),
+                            max_workers=max_workers)
+
+
 # Test
 if __name__ == "__main__":
     import json
@@ -551,12 +583,9 @@ if __name__ == "__main__":
     en_file = "/workspaces/QS-Formatter/files/MOCK 1 ENGLISH QUESTION.docx"
     hi_file = "/workspaces/QS-Formatter/files/MOCK 1 HINDI QUESTION.docx"
     
-    print("Parsing English file...")
-    en_questions = parse_docx_smart(en_file, "test", "/tmp")
+    print("Parsing English and Hindi files...")
+    en_questions, hi_questions = parse_documents([en_file, hi_file], ["test", "test"], "/tmp")
     print(f"Extracted {len(en_questions)} English questions")
-    
-    print("\nParsing Hindi file...")
-    hi_questions = parse_docx_smart(hi_file, "test", "/tmp")
     print(f"Extracted {len(hi_questions)} Hindi questions")
     
     # Show some questions with flags